@@ -0,0 +1,101 @@
+# ==============================================================================
+# BENCHMARK: ARRANQUE EN FRÍO (TIEMPO HASTA EL PRIMER MAPA Y MEMORIA MÁXIMA)
+# ==============================================================================
+# Cada medición corre en un proceso de Python nuevo, como un servidor recién creado al escalar.
+# Se mide desde antes de importar las librerías hasta tener el JSON del primer mapa (lo que
+# st.plotly_chart() envía al navegador), y la memoria máxima (RSS) del proceso.
+#   - antes:          las importaciones de la versión original (streamlit, geopandas, plotly.express, pandas)
+#                     + gpd.read_file() + px.choropleth_mapbox().
+#   - caché fría:     todas las importaciones actuales de riesgos_app.py (se leen del propio script, así que
+#                     incluyen shapely y scipy a través de escenarios.py y vecindad.py) + el primer mapa de
+#                     figuras.py, cuando la caché binaria todavía no existe.
+#   - caché caliente: lo mismo, con la caché ya construida (caso normal).
+#
+# Uso (desde la carpeta principal del repositorio):
+#     python benchmarks/bench_arranque.py [repeticiones]
+
+import ast
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Código que se ejecuta en cada proceso nuevo. Al final imprime el tiempo (s) y la memoria máxima (KB).
+MEDIR = '''
+import json, resource, time
+inicio = time.perf_counter()
+{codigo}
+print(json.dumps({{"segundos": time.perf_counter() - inicio,
+                  "rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}}))
+'''
+
+ANTES = '''
+import streamlit as st
+import pandas as pd
+import geopandas as gpd
+import plotly.express as px
+import plotly.io as pio
+gdf = gpd.read_file('lima_callao_distritos_simple.geojson')
+gdf['distrito'] = gdf['distrito'].str.upper().str.strip()
+gdf['valor'] = range(len(gdf))
+choropleth = getattr(px, 'choropleth_mapbox', None) or px.choropleth_map
+fig = choropleth(gdf, geojson=gdf.geometry, locations=gdf.index, color='valor', hover_name='distrito',
+                 center={"lat": -12.0464, "lon": -77.0428}, zoom=8.5, opacity=0.7)
+pio.to_json(fig.to_dict(), validate=False)
+'''
+
+DESPUES = '''
+{importaciones}
+import plotly.io as pio
+import figuras
+_, nombres = figuras.cargar_geometria()
+fig = figuras.figura_vista('valor', tuple(float(i) for i in range(len(nombres))))
+pio.to_json(fig.to_dict(), validate=False)
+'''
+
+
+def importaciones_app(ruta=os.path.join(RAIZ, 'riesgos_app.py')):
+    """Líneas 'import ...' del nivel superior de la aplicación, en el mismo orden (sin los datos de datos.py)."""
+    with open(ruta, encoding='utf-8') as archivo:
+        arbol = ast.parse(archivo.read())
+    return '\n'.join(ast.unparse(nodo) for nodo in arbol.body if isinstance(nodo, (ast.Import, ast.ImportFrom)))
+
+
+def _correr(codigo, entorno):
+    salida = subprocess.run(
+        [sys.executable, '-c', MEDIR.format(codigo=codigo)],
+        cwd=RAIZ, env=entorno, capture_output=True, text=True, check=True,
+    )
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def _mediana(valores):
+    return sorted(valores)[len(valores) // 2]
+
+
+if __name__ == '__main__':
+    import warnings
+    warnings.simplefilter('ignore')
+    repeticiones = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    entorno = dict(os.environ, PYTHONWARNINGS='ignore')
+    despues = DESPUES.format(importaciones=importaciones_app())
+    casos = {'antes (geopandas + px)': []}
+    casos['caché fría'] = []
+    casos['caché caliente'] = []
+    with tempfile.TemporaryDirectory() as directorio:
+        entorno_caliente = dict(entorno, RIESGOS_CACHE_GEOMETRIA=directorio)
+        _correr(despues, entorno_caliente)  # Construye la caché una vez.
+        for _ in range(repeticiones):
+            casos['antes (geopandas + px)'].append(_correr(ANTES, entorno))
+            with tempfile.TemporaryDirectory() as vacio:
+                casos['caché fría'].append(_correr(despues, dict(entorno, RIESGOS_CACHE_GEOMETRIA=vacio)))
+            casos['caché caliente'].append(_correr(despues, entorno_caliente))
+
+    for nombre, mediciones in casos.items():
+        segundos = _mediana([m['segundos'] for m in mediciones])
+        rss_mb = _mediana([m['rss_kb'] for m in mediciones]) / 1024
+        print(f"{nombre:24s} primer mapa={1000 * segundos:7.0f} ms  RSS máx.={rss_mb:6.1f} MB")
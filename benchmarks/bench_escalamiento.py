@@ -0,0 +1,163 @@
+# ==============================================================================
+# BENCHMARK: ESCALAMIENTO DE CADA ETAPA CON EL NÚMERO DE DISTRITOS
+# ==============================================================================
+# Genera conjuntos sintéticos de 50 a 50 000 polígonos (una cuadrícula de celdas con varios vértices por lado,
+# para que cada polígono tenga un número de coordenadas parecido al de un distrito real) con sus seis
+# diccionarios de indicadores, y pasa cada conjunto por las mismas etapas que una ejecución de la aplicación:
+#   - carga de geometría (fría): GeoJSON -> caché binaria (cache_geometria.py).
+#   - carga de geometría (caliente): apertura de la caché binaria ya construida.
+#   - nivel de detalle: simplificación conjunta de los polígonos (coverage_simplify) para el zoom inicial.
+#   - motor y normalización: MotorRiesgo.desde_datos() + tabla() (motor_riesgo.py).
+#   - unión con el mapa: merge de los nombres del mapa con la tabla del motor, como en load_and_process_data().
+#   - construcción de figura / serialización de figura: figuras.figura_vista() y su JSON.
+# Para cada etapa se estima el exponente de escalamiento entre los dos tamaños más grandes (pendiente en escala
+# log-log, donde ya no pesan los costos fijos): ~1 es lineal; un exponente claramente mayor que 1 marca una etapa
+# que crece más rápido que los datos. Antes de medir se hace una pasada pequeña para que las importaciones y la
+# primera figura de Plotly no se cuenten en el primer tamaño.
+#
+# Uso (desde la carpeta principal del repositorio):
+#     python benchmarks/bench_escalamiento.py [--tamanos 50 500 5000 50000] [--memoria] [--json resultados.json]
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+os.chdir(RAIZ)
+
+# La caché binaria de las geometrías sintéticas va a una carpeta temporal (se lee al importar cache_geometria).
+CARPETA_TEMPORAL = tempfile.TemporaryDirectory()
+os.environ['RIESGOS_CACHE_GEOMETRIA'] = CARPETA_TEMPORAL.name
+
+import cache_geometria  # noqa: E402
+import figuras  # noqa: E402
+import instrumentacion  # noqa: E402
+from motor_riesgo import MotorRiesgo  # noqa: E402
+
+# Vértices por lado de cada celda (4 lados -> 4 * VERTICES_POR_LADO coordenadas por polígono).
+VERTICES_POR_LADO = 25
+
+# Exponente a partir del cual una etapa se marca como no lineal.
+UMBRAL_NO_LINEAL = 1.2
+
+
+def distritos_sinteticos(n_distritos, semilla=0):
+    """GeoJSON de una cuadrícula de n_distritos celdas sobre Lima y los seis diccionarios de indicadores."""
+    columnas = int(np.ceil(np.sqrt(n_distritos)))
+    lado = 0.6 / columnas  # La cuadrícula ocupa ~0.6° x 0.6°, como Lima y Callao.
+    lon_0, lat_0 = figuras.CENTRO_MAPA['lon'] - 0.3, figuras.CENTRO_MAPA['lat'] - 0.3
+    paso = np.linspace(0, 1, VERTICES_POR_LADO, endpoint=False)
+    # Contorno de una celda de lado 1 en sentido antihorario (abajo, derecha, arriba, izquierda) y cerrado.
+    contorno = np.concatenate([
+        np.column_stack([paso, np.zeros_like(paso)]),
+        np.column_stack([np.ones_like(paso), paso]),
+        np.column_stack([1 - paso, np.ones_like(paso)]),
+        np.column_stack([np.zeros_like(paso), 1 - paso]),
+        [[0.0, 0.0]],
+    ])
+
+    nombres = [f'DISTRITO {i:05d}' for i in range(n_distritos)]
+    features = []
+    for i, nombre in enumerate(nombres):
+        fila, columna = divmod(i, columnas)
+        anillo = np.round((contorno + (columna, fila)) * lado + (lon_0, lat_0), 6)
+        features.append({
+            'type': 'Feature',
+            'properties': {'distrito': nombre},
+            'geometry': {'type': 'Polygon', 'coordinates': [anillo.tolist()]},
+        })
+
+    rng = np.random.default_rng(semilla)
+    datos = {
+        'poblacion': dict(zip(nombres, rng.integers(1_000, 1_000_000, n_distritos).tolist())),
+        'area': dict(zip(nombres, rng.uniform(1, 300, n_distritos).tolist())),
+        'peligrosidad': dict(zip(nombres, rng.integers(1, 11, n_distritos).tolist())),
+        'material': dict(zip(nombres, rng.integers(0, 20_000, n_distritos).tolist())),
+        'damnificados': dict(zip(nombres, rng.poisson(50, n_distritos).tolist())),
+        'viviendas': dict(zip(nombres, rng.poisson(5, n_distritos).tolist())),
+    }
+    return {'type': 'FeatureCollection', 'features': features}, datos
+
+
+def medir(n_distritos, medir_memoria=False):
+    """Pasa un conjunto sintético por todas las etapas y devuelve el registro de etapas."""
+    geojson, datos = distritos_sinteticos(n_distritos)
+    ruta = os.path.join(CARPETA_TEMPORAL.name, f'sintetico-{n_distritos}.geojson')
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        json.dump(geojson, archivo)
+    del geojson
+
+    registro = instrumentacion.RegistroEtapas(medir_memoria)
+    with registro.etapa('carga de geometría (fría)'):
+        geometria = cache_geometria.cargar(ruta)
+    cache_geometria.cargar.cache_clear()
+    with registro.etapa('carga de geometría (caliente)'):
+        geometria = cache_geometria.cargar(ruta)
+    with registro.etapa('nivel de detalle'):
+        cache_geometria.cargar(ruta, cache_geometria.tolerancia_para_zoom(figuras.ZOOM_INICIAL))
+
+    with registro.etapa('motor y normalización'):
+        motor = MotorRiesgo.desde_datos(datos['poblacion'], datos['area'], datos['peligrosidad'], datos['material'], datos['damnificados'], datos['viviendas'])
+        tabla = motor.tabla().reset_index()
+    with registro.etapa('unión con el mapa'):
+        merged_df = pd.DataFrame({'distrito': geometria.nombres}).merge(tabla, left_on='distrito', right_on='distrito_data', how='left')
+        merged_df['riesgo_combinado'] = merged_df['riesgo_combinado'].fillna(0)
+
+    with registro.etapa('construcción de figura'):
+        valores = figuras.valores_en_orden(merged_df.set_index('distrito'), 'riesgo_combinado', ruta)
+        fig = figuras.figura_vista('Riesgo Combinado', valores, figuras.ZOOM_INICIAL, ruta)
+    with registro.etapa('serialización de figura') as medicion:
+        medicion['bytes'] = len(fig.to_json())
+
+    # Se liberan las cachés en memoria para que el tamaño siguiente empiece igual que un proceso nuevo.
+    cache_geometria.cargar.cache_clear()
+    figuras.cargar_geometria.cache_clear()
+    figuras.figura_vista.cache_clear()
+    return registro
+
+
+def exponente(tamanos, segundos):
+    """Pendiente de log(segundos) contra log(tamaño) entre los dos últimos tamaños."""
+    segundos = np.maximum(segundos, 1e-6)
+    return float(np.log(segundos[-1] / segundos[-2]) / np.log(tamanos[-1] / tamanos[-2]))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Escalamiento de cada etapa con el número de distritos.")
+    parser.add_argument('--tamanos', type=int, nargs='+', default=[50, 500, 5_000, 50_000])
+    parser.add_argument('--memoria', action='store_true', help="Mide también el pico de memoria (más lento).")
+    parser.add_argument('--json', help="Guarda las mediciones en este archivo JSON.")
+    args = parser.parse_args()
+    args.tamanos = sorted(args.tamanos)
+
+    medir(10)  # Pasada de calentamiento (no se reporta).
+    mediciones = []
+    for n_distritos in args.tamanos:
+        registro = medir(n_distritos, args.memoria)
+        mediciones.extend({'distritos': n_distritos, **etapa} for etapa in registro.etapas)
+        print(f"{n_distritos:,} distritos listos.", file=sys.stderr)
+    tabla = pd.DataFrame(mediciones)
+
+    milisegundos = tabla.pivot(index='etapa', columns='distritos', values='segundos').reindex(tabla['etapa'].unique()) * 1000
+    if len(args.tamanos) > 1:
+        milisegundos['exponente'] = [exponente(args.tamanos, fila.to_numpy() / 1000) for _, fila in milisegundos[args.tamanos].iterrows()]
+        milisegundos['no lineal'] = np.where(milisegundos['exponente'] > UMBRAL_NO_LINEAL, '<--', '')
+    print("Tiempo por etapa (ms):")
+    print(milisegundos.round(2).to_string())
+
+    bytes_figura = tabla.dropna(subset=['bytes']).set_index('distritos')['bytes']
+    print("\nTamaño de la figura serializada (KB): " + ", ".join(f"{n:,}: {b / 1024:,.0f}" for n, b in bytes_figura.items()))
+    if args.memoria:
+        memoria = tabla.pivot(index='etapa', columns='distritos', values='pico_memoria_bytes').reindex(tabla['etapa'].unique()) / 1024 ** 2
+        print("\nPico de memoria por etapa (MB):")
+        print(memoria.round(2).to_string())
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as archivo:
+            json.dump(mediciones, archivo, ensure_ascii=False, indent=2)
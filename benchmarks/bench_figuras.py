@@ -0,0 +1,112 @@
+# ==============================================================================
+# BENCHMARK: TAMAÑO DEL PAYLOAD Y LATENCIA AL CAMBIAR DE VISTA
+# ==============================================================================
+# Compara la forma anterior de construir el mapa (px.choropleth_mapbox con la GeoDataFrame en cada clic)
+# contra la capa de figuras con geometría fija y caché (figuras.py).
+# Para cada cambio de vista se mide lo mismo que hace st.plotly_chart(): construir la figura,
+# convertirla a diccionario y serializarla a JSON. Ese JSON es lo que viaja al navegador.
+# La capa de figuras se mide en tres casos, porque la caché de figuras cambia mucho el resultado:
+#   - primera vista: proceso recién iniciado (hay que preparar la geometría desde la caché binaria).
+#   - cambio sin caché: la geometría ya está preparada, pero la figura de esa vista se construye desde cero.
+#   - cambio con caché: la figura de esa vista ya se construyó antes en el proceso (acierto de lru_cache).
+#
+# Uso (desde la carpeta principal del repositorio):
+#     python benchmarks/bench_figuras.py [repeticiones]
+
+import os
+import sys
+import time
+
+import geopandas as gpd
+import plotly.express as px
+import plotly.io as pio
+
+# Permite importar los módulos de la aplicación (datos.py, figuras.py) desde esta carpeta.
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+os.chdir(RAIZ)
+
+from datos import poblacion, area, peligrosidad_suelos, material_precario, damnificados_2000, viviendas_destruidas_2000  # noqa: E402
+import cache_geometria  # noqa: E402
+import figuras  # noqa: E402
+
+VISTAS = {
+    "Peligrosidad Suelos": peligrosidad_suelos,
+    "Densidad Poblacional": {d: poblacion[d] / area[d] for d in poblacion},
+    "Material Precario": material_precario,
+    "Damnificados": damnificados_2000,
+    "Viviendas Destruidas": viviendas_destruidas_2000,
+}
+
+
+def _tabla_con_geometria():
+    # Arma una GeoDataFrame equivalente a 'merged_gdf' de la aplicación (una columna por vista).
+    gdf = gpd.read_file(figuras.RUTA_GEOJSON)
+    gdf['distrito'] = gdf['distrito'].str.upper().str.strip()
+    for columna, datos_vista in VISTAS.items():
+        gdf[columna] = gdf['distrito'].map(datos_vista).fillna(0)
+    return gdf
+
+
+def _figura_antes(gdf, vista):
+    # Copia fiel de la sección 6 original de riesgos_app.py.
+    choropleth = getattr(px, 'choropleth_mapbox', None) or px.choropleth_map
+    return choropleth(
+        gdf, geojson=gdf.geometry, locations=gdf.index, color=vista,
+        center=figuras.CENTRO_MAPA, zoom=figuras.ZOOM_INICIAL, opacity=0.7,
+        color_continuous_scale=figuras.ESCALA_COLORES, labels={vista: vista},
+        hover_name='distrito', hover_data={vista: ':.2f'},
+    )
+
+
+def _figura_despues(gdf, vista):
+    valores = figuras.valores_en_orden(gdf.set_index('distrito'), vista)
+    return figuras.figura_vista(vista, valores)
+
+
+def _sin_figuras():
+    # Vacía solo la caché de figuras: la geometría preparada se conserva.
+    figuras.figura_vista.cache_clear()
+
+
+def _proceso_nuevo():
+    # Vacía todas las cachés en memoria, como al iniciar un proceso (la caché binaria en disco ya existe).
+    figuras.figura_vista.cache_clear()
+    figuras.cargar_geometria.cache_clear()
+    cache_geometria.cargar.cache_clear()
+
+
+def _medir(construir, gdf, repeticiones, preparar=None):
+    # Recorre las vistas varias veces, como un usuario que va cambiando de botón.
+    # 'preparar' se llama antes de cada cambio (fuera de la medición) para vaciar las cachés que correspondan.
+    tiempos, tamanos = [], []
+    for _ in range(repeticiones):
+        for vista in VISTAS:
+            if preparar is not None:
+                preparar()
+            inicio = time.perf_counter()
+            fig = construir(gdf, vista)
+            carga = pio.to_json(fig.to_dict(), validate=False)  # Igual que st.plotly_chart().
+            tiempos.append(time.perf_counter() - inicio)
+            tamanos.append(len(carga.encode('utf-8')))
+    tiempos.sort()
+    return {
+        'mediana_ms': 1000 * tiempos[len(tiempos) // 2],
+        'p95_ms': 1000 * tiempos[int(len(tiempos) * 0.95) - 1],
+        'payload_kb': sum(tamanos) / len(tamanos) / 1024,
+    }
+
+
+if __name__ == '__main__':
+    repeticiones = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    gdf = _tabla_con_geometria()
+    _medir(_figura_despues, gdf, 1)  # Calienta las importaciones y la primera figura de Plotly (no se reporta).
+    casos = (
+        ('antes (px + GeoDataFrame)', _figura_antes, None),
+        ('después, primera vista', _figura_despues, _proceso_nuevo),
+        ('después, cambio sin caché', _figura_despues, _sin_figuras),
+        ('después, cambio con caché', _figura_despues, None),  # Tras la primera pasada, todo son aciertos de la caché.
+    )
+    for nombre, construir, preparar in casos:
+        r = _medir(construir, gdf, repeticiones, preparar)
+        print(f"{nombre:28s} mediana={r['mediana_ms']:7.1f} ms  p95={r['p95_ms']:7.1f} ms  payload={r['payload_kb']:6.1f} KB")
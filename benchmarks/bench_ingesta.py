@@ -0,0 +1,55 @@
+# ==============================================================================
+# BENCHMARK: ASIGNACIÓN MASIVA DE PUNTOS A DISTRITOS (PUNTOS POR SEGUNDO)
+# ==============================================================================
+# Genera un inventario sintético de puntos dentro del área de Lima y Callao, lo guarda como CSV
+# (y como Parquet si pyarrow está instalado) y mide la ingesta completa de ingesta.py:
+# lectura por bloques + asignación con el STRtree + suma por distrito.
+#
+# Uso (desde la carpeta principal del repositorio):
+#     python benchmarks/bench_ingesta.py [número_de_puntos]
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+os.chdir(RAIZ)
+
+import cache_geometria  # noqa: E402
+import ingesta  # noqa: E402
+
+
+def inventario_sintetico(n_puntos, semilla=0):
+    # Puntos uniformes en el rectángulo que contiene a todos los distritos (algunos caen en el mar o fuera).
+    coordenadas = np.asarray(cache_geometria.cargar(ingesta.RUTA_GEOJSON).coordenadas)
+    (lon_min, lat_min), (lon_max, lat_max) = coordenadas.min(axis=0), coordenadas.max(axis=0)
+    rng = np.random.default_rng(semilla)
+    return pd.DataFrame({
+        'lon': rng.uniform(lon_min, lon_max, n_puntos),
+        'lat': rng.uniform(lat_min, lat_max, n_puntos),
+        'damnificados': rng.poisson(2, n_puntos),
+    })
+
+
+if __name__ == '__main__':
+    n_puntos = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    indice = ingesta.IndiceDistritos.desde_geojson()
+    tabla = inventario_sintetico(n_puntos)
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        archivos = {'csv': os.path.join(carpeta, 'puntos.csv')}
+        tabla.to_csv(archivos['csv'], index=False)
+        try:
+            archivos['parquet'] = os.path.join(carpeta, 'puntos.parquet')
+            tabla.to_parquet(archivos['parquet'], index=False)
+        except ImportError:
+            del archivos['parquet']
+
+        for formato, ruta in archivos.items():
+            _, estadisticas = ingesta.agregar_archivo(ruta, indice, columnas_suma=['damnificados'])
+            print(f"{formato:8s} {estadisticas['puntos']:,} puntos en {estadisticas['segundos']:.2f} s: "
+                  f"{estadisticas['puntos_por_segundo']:,.0f} puntos/s ({estadisticas['sin_distrito']:,} sin distrito)")
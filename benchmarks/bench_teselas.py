@@ -0,0 +1,140 @@
+# ==============================================================================
+# BENCHMARK: PRUEBA DE CARGA, TESELAS ESTÁTICAS CONTRA EJECUCIONES DE STREAMLIT
+# ==============================================================================
+# Varios clientes en paralelo (procesos) hacen visitas durante un tiempo fijo y se mide el rendimiento
+# (peticiones y visitas por segundo) y la latencia p50 / p95:
+#   - teselas:   el servidor de teselas.py (en su propio proceso) y clientes HTTP que piden lo mismo que el
+#                visor al abrir el mapa: metadatos.json + las teselas visibles en el zoom inicial.
+#   - streamlit: cada visita es una sesión nueva de la aplicación (AppTest) que ejecuta el script completo
+#                y arma el mapa, como pasa con cada persona que abre la página. No incluye la red ni el
+#                navegador, así que es una cota optimista del camino actual.
+# Ambos casos se corren con las cachés ya calientes (teselas exportadas, geometría y resultados en disco).
+#
+# Uso (desde la carpeta principal del repositorio):
+#     python benchmarks/bench_teselas.py [--clientes 4] [--segundos 10]
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+os.chdir(RAIZ)
+
+import teselas  # noqa: E402
+
+# Zoom con el que el visor abre el mapa.
+ZOOM_VISITA = 10
+
+# Mitad del tamaño de una pantalla típica en píxeles (ancho, alto), para saber qué teselas se ven al abrir.
+MEDIA_PANTALLA = (640, 400)
+
+
+def teselas_visibles(zoom=ZOOM_VISITA):
+    """Rutas 'z/x/y.geojson' que el visor pide al abrir el mapa centrado en Lima."""
+    n = 2 ** zoom
+    x_centro, y_centro = teselas.tesela_de(teselas.CENTRO_MAPA['lon'], teselas.CENTRO_MAPA['lat'], zoom)
+    dx, dy = (int(np.ceil(media / 256)) for media in MEDIA_PANTALLA)
+    return [f'{zoom}/{x}/{y}.geojson' for x in range(x_centro - dx, x_centro + dx + 1) for y in range(y_centro - dy, y_centro + dy + 1)
+            if 0 <= x < n and 0 <= y < n]
+
+
+def _cliente_teselas(url_base, rutas, segundos):
+    # Una visita = metadatos + todas las teselas visibles. Devuelve las latencias de cada petición y de cada visita.
+    peticiones, visitas = [], []
+    fin = time.perf_counter() + segundos
+    while time.perf_counter() < fin:
+        inicio_visita = time.perf_counter()
+        for ruta in ['metadatos.json', *rutas]:
+            inicio = time.perf_counter()
+            try:
+                with urllib.request.urlopen(url_base + ruta) as respuesta:
+                    respuesta.read()
+            except urllib.error.HTTPError:
+                pass  # Tesela en el mar (404): el visor también la ignora.
+            peticiones.append(time.perf_counter() - inicio)
+        visitas.append(time.perf_counter() - inicio_visita)
+    return peticiones, visitas
+
+
+def _cliente_streamlit(segundos):
+    # Una visita = una sesión nueva que ejecuta el script completo.
+    import logging
+    from streamlit.testing.v1 import AppTest
+    logging.getLogger('streamlit').setLevel(logging.CRITICAL)  # Sin advertencias de Streamlit en cada ejecución.
+    ruta_app = os.path.join(RAIZ, 'riesgos_app.py')
+    AppTest.from_file(ruta_app, default_timeout=120).run()  # Calienta las cachés de este proceso.
+    visitas = []
+    fin = time.perf_counter() + segundos
+    while time.perf_counter() < fin:
+        inicio = time.perf_counter()
+        AppTest.from_file(ruta_app, default_timeout=120).run()
+        visitas.append(time.perf_counter() - inicio)
+    return visitas, visitas
+
+
+def _puerto_libre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _reporte(nombre, peticiones, visitas, segundos):
+    p50, p95 = np.percentile(peticiones, [50, 95]) * 1000
+    print(f"{nombre:10s} {len(peticiones) / segundos:9,.1f} peticiones/s  {len(visitas) / segundos:8,.1f} visitas/s  "
+          f"p50={p50:8.2f} ms  p95={p95:8.2f} ms (por petición)  "
+          f"p95 visita={np.percentile(visitas, 95) * 1000:8.1f} ms")
+
+
+def _carga(funcion, argumentos, clientes):
+    # Corre 'clientes' procesos a la vez con la misma función y junta sus latencias.
+    with ProcessPoolExecutor(clientes) as ejecutor:
+        resultados = [ejecutor.submit(funcion, *argumentos) for _ in range(clientes)]
+        peticiones, visitas = [], []
+        for resultado in resultados:
+            p, v = resultado.result()
+            peticiones.extend(p)
+            visitas.extend(v)
+    return peticiones, visitas
+
+
+if __name__ == '__main__':
+    import warnings
+    warnings.simplefilter('ignore')
+    parser = argparse.ArgumentParser(description="Prueba de carga: teselas estáticas contra ejecuciones de Streamlit.")
+    parser.add_argument('--clientes', type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument('--segundos', type=float, default=10.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        destino = os.path.join(carpeta, 'teselas')
+        teselas.exportar(destino)
+        rutas = teselas_visibles()
+        puerto = _puerto_libre()
+        servidor = subprocess.Popen(
+            [sys.executable, 'teselas.py', '--destino', destino, 'servir', '--puerto', str(puerto)],
+            cwd=RAIZ, stdout=subprocess.DEVNULL,
+        )
+        try:
+            url_base = f'http://127.0.0.1:{puerto}/'
+            for _ in range(100):  # Espera a que el servidor acepte conexiones.
+                try:
+                    urllib.request.urlopen(url_base + 'metadatos.json').read()
+                    break
+                except OSError:
+                    time.sleep(0.1)
+            print(f"{args.clientes} clientes, {args.segundos:.0f} s por caso; una visita de teselas = metadatos + {len(rutas)} teselas.")
+            _reporte('teselas', *_carga(_cliente_teselas, (url_base, rutas, args.segundos), args.clientes), args.segundos)
+        finally:
+            servidor.terminate()
+            servidor.wait()
+
+    _reporte('streamlit', *_carga(_cliente_streamlit, (args.segundos,), args.clientes), args.segundos)
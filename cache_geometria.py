@@ -0,0 +1,210 @@
+# ==============================================================================
+# CACHÉ BINARIA DE LA GEOMETRÍA DE LOS DISTRITOS
+# ==============================================================================
+# Leer el GeoJSON con gpd.read_file() obliga a importar geopandas y a interpretar todo el texto del
+# archivo en cada proceso nuevo del servidor. Este módulo convierte el GeoJSON, una sola vez, en
+# arreglos binarios de NumPy (formato "ragged" de shapely / GeoArrow):
+#   - coordenadas.npy : todas las coordenadas (lon, lat) seguidas, forma (N, 2).
+#   - anillos.npy     : dónde empieza cada anillo dentro de 'coordenadas'.
+#   - poligonos.npy   : dónde empieza cada polígono dentro de 'anillos'.
+#   - distritos.npy   : dónde empieza cada distrito (multipolígono) dentro de 'poligonos'.
+#   - propiedades.json: las propiedades de cada distrito (nombre, etc.).
+# La carpeta de la caché se nombra con el hash SHA-256 del GeoJSON: si el archivo cambia, se construye
+# una caché nueva automáticamente. Los arreglos se abren con memoria mapeada (solo se leen del disco
+# las partes que se usan) y shapely solo se importa si se piden los polígonos.
+# Si la carpeta de la caché no se puede escribir (ej. un contenedor de solo lectura), la geometría se
+# construye igual en memoria y se usa sin guardarla: la caché acelera, pero la aplicación no depende de ella.
+#
+# Además de la geometría original se guardan versiones simplificadas (niveles de detalle) para los
+# niveles de zoom lejanos. Se simplifican con shapely.coverage_simplify(), que trata a los distritos
+# como una cobertura: cada borde compartido se simplifica una sola vez, así que no se abren huecos
+# ni se superponen distritos vecinos.
+#
+# Para construir la caché y todos los niveles por adelantado (por ejemplo, al preparar el servidor):
+#     python cache_geometria.py [archivo.geojson]
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+from functools import lru_cache
+
+import numpy as np
+
+# GeoJSON con los polígonos de los distritos. Está aquí (y no en figuras.py) para que los módulos de cálculo y
+# de la terminal lo usen sin importar Plotly.
+RUTA_GEOJSON = 'lima_callao_distritos_simple.geojson'
+CENTRO_MAPA = {"lat": -12.0464, "lon": -77.0428}   # Coordenadas para centrar el mapa en Lima.
+
+# Cantidad de decimales con la que se envían las coordenadas al navegador (figuras y teselas).
+# 5 decimales equivalen a ~1 metro, más que suficiente para un mapa a nivel de distrito.
+DECIMALES_COORDENADAS = 5
+
+# Carpeta donde se guardan las cachés (una subcarpeta por versión del GeoJSON).
+# Se puede cambiar con la variable de entorno RIESGOS_CACHE_GEOMETRIA (ej. una carpeta compartida entre servidores).
+DIRECTORIO_CACHE = os.environ.get('RIESGOS_CACHE_GEOMETRIA', os.path.join('.cache', 'geometria'))
+
+# Arreglos que forman la caché, en el orden de shapely.from_ragged_array().
+ARREGLOS = ('coordenadas', 'anillos', 'poligonos', 'distritos')
+
+# Tolerancias de simplificación (en grados) de los niveles de detalle; 0.0 es la geometría original.
+# La tolerancia es aproximadamente el lado de los triángulos que se eliminan (algoritmo de Visvalingam-Whyatt).
+# Con los zooms de la aplicación y de las teselas (7 a 12) se usan todos: 7 -> 0.005, 8 a 9 -> 0.002,
+# 10 -> 0.001, 11 y 12 -> original. Un nivel más simple solo serviría con zoom 6 o menos.
+TOLERANCIAS_NIVELES = (0.0, 0.001, 0.002, 0.005)
+
+# Se acepta perder detalles de hasta 3/4 de píxel: a ese tamaño la diferencia no se ve en pantalla.
+FRACCION_PIXEL = 0.75
+
+
+def hash_archivo(ruta):
+    """Hash SHA-256 (hexadecimal) del contenido del archivo."""
+    with open(ruta, 'rb') as archivo:
+        return hashlib.sha256(archivo.read()).hexdigest()
+
+
+def _a_arreglos(geojson):
+    # Recorre las geometrías (Polygon o MultiPolygon) y junta todas las coordenadas y sus desplazamientos.
+    coordenadas, anillos, poligonos, distritos = [], [0], [0], [0]
+    for feature in geojson['features']:
+        geometria = feature['geometry']
+        partes = [geometria['coordinates']] if geometria['type'] == 'Polygon' else geometria['coordinates']
+        for poligono in partes:
+            for anillo in poligono:
+                coordenadas.extend(punto[:2] for punto in anillo)
+                anillos.append(len(coordenadas))
+            poligonos.append(len(anillos) - 1)
+        distritos.append(len(poligonos) - 1)
+    return {
+        'coordenadas': np.array(coordenadas, dtype=np.float64).reshape(-1, 2),
+        'anillos': np.array(anillos, dtype=np.int64),
+        'poligonos': np.array(poligonos, dtype=np.int64),
+        'distritos': np.array(distritos, dtype=np.int64),
+    }
+
+
+def _escribir(destino, arreglos, propiedades):
+    # Se escribe primero en una carpeta temporal y luego se renombra, así otro proceso nunca ve una caché a medias.
+    # Devuelve False si no se pudo escribir (carpeta de solo lectura, ruta inválida, disco lleno).
+    temporal = None
+    try:
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        temporal = tempfile.mkdtemp(dir=os.path.dirname(destino), prefix='.construyendo-')
+        for nombre in ARREGLOS:
+            np.save(os.path.join(temporal, f'{nombre}.npy'), arreglos[nombre])
+        with open(os.path.join(temporal, 'propiedades.json'), 'w', encoding='utf-8') as archivo:
+            json.dump(propiedades, archivo, ensure_ascii=False)
+        os.rename(temporal, destino)
+    except OSError:
+        # Si otro proceso terminó primero, su caché es idéntica: se usa esa y se descarta la temporal.
+        if temporal is not None:
+            shutil.rmtree(temporal, ignore_errors=True)
+        return os.path.isdir(destino)
+    return True
+
+
+def construir_nivel(ruta_geojson, tolerancia=0.0, directorio=DIRECTORIO_CACHE):
+    """Geometría con la tolerancia dada (0.0 = original), leída de la caché o construida y guardada si falta.
+
+    Los niveles se guardan dentro de la carpeta de la geometría original, así que también cambian con el hash.
+    Si no se puede escribir en 'directorio', devuelve la geometría construida en memoria.
+    """
+    base = os.path.join(directorio, hash_archivo(ruta_geojson)[:16])
+    destino = base if tolerancia == 0 else os.path.join(base, f'simplificada-{tolerancia:g}')
+    if os.path.isdir(destino):
+        return GeometriaBinaria(destino)
+
+    if tolerancia == 0:
+        with open(ruta_geojson, encoding='utf-8') as archivo:
+            geojson = json.load(archivo)
+        arreglos, propiedades = _a_arreglos(geojson), [feature['properties'] for feature in geojson['features']]
+    else:
+        import shapely
+        original = cargar(ruta_geojson, 0.0, directorio)  # Compartida entre niveles (también si quedó en memoria).
+        simplificada = shapely.coverage_simplify(original.poligonos_shapely(), tolerancia)
+        tipo, coordenadas, desplazamientos = shapely.to_ragged_array(simplificada)
+        if tipo == shapely.GeometryType.POLYGON:
+            # Si todos los distritos quedaron como un solo polígono, cada distrito tiene exactamente uno.
+            desplazamientos = desplazamientos + (np.arange(len(simplificada) + 1),)
+        arreglos, propiedades = dict(zip(ARREGLOS, (coordenadas,) + tuple(desplazamientos))), original.propiedades
+
+    if _escribir(destino, arreglos, propiedades):
+        return GeometriaBinaria(destino)
+    return GeometriaBinaria(None, arreglos, propiedades)
+
+
+def tolerancia_para_zoom(zoom):
+    """Tolerancia del nivel de detalle más simple cuyo error no se nota en pantalla con ese zoom."""
+    # En los mapas web, con zoom z el mundo (360°) mide 256 * 2^z píxeles de ancho.
+    grados_por_pixel = 360 / (256 * 2 ** zoom)
+    return max(t for t in TOLERANCIAS_NIVELES if t <= FRACCION_PIXEL * grados_por_pixel)
+
+
+class GeometriaBinaria:
+    """Geometría de los distritos leída desde la caché binaria (arreglos en memoria mapeada).
+
+    Con carpeta=None usa los arreglos y propiedades dados (geometría construida en memoria, sin caché en disco).
+    """
+
+    def __init__(self, carpeta, arreglos=None, propiedades=None):
+        self.carpeta = carpeta
+        if carpeta is not None:
+            arreglos = {nombre: np.load(os.path.join(carpeta, f'{nombre}.npy'), mmap_mode='r') for nombre in ARREGLOS}
+            with open(os.path.join(carpeta, 'propiedades.json'), encoding='utf-8') as archivo:
+                propiedades = json.load(archivo)
+        for nombre in ARREGLOS:
+            setattr(self, nombre, arreglos[nombre])
+        self.propiedades = propiedades
+        # Nombres estandarizados (mayúsculas, sin espacios), en el mismo orden que las geometrías.
+        self.nombres = tuple(str(p['distrito']).upper().strip() for p in self.propiedades)
+
+    def __len__(self):
+        return len(self.propiedades)
+
+    def anillos_de(self, posicion, decimales=None):
+        """Lista de polígonos del distrito; cada polígono es una lista de anillos con coordenadas [lon, lat]."""
+        poligonos = []
+        for p in range(self.distritos[posicion], self.distritos[posicion + 1]):
+            anillos = []
+            for a in range(self.poligonos[p], self.poligonos[p + 1]):
+                coordenadas = self.coordenadas[self.anillos[a]:self.anillos[a + 1]]
+                anillos.append((coordenadas if decimales is None else np.round(coordenadas, decimales)).tolist())
+            poligonos.append(anillos)
+        return poligonos
+
+    def geojson(self, decimales=None):
+        """FeatureCollection mínima para Plotly: 'id' = posición del distrito, sin propiedades."""
+        features = []
+        for posicion in range(len(self)):
+            poligonos = self.anillos_de(posicion, decimales)
+            if len(poligonos) == 1:
+                geometria = {"type": "Polygon", "coordinates": poligonos[0]}
+            else:
+                geometria = {"type": "MultiPolygon", "coordinates": poligonos}
+            features.append({"type": "Feature", "id": posicion, "properties": {}, "geometry": geometria})
+        return {"type": "FeatureCollection", "features": features}
+
+    def poligonos_shapely(self):
+        """Arreglo de geometrías de shapely (MultiPolygon), una por distrito. Importa shapely solo aquí."""
+        import shapely
+        return shapely.from_ragged_array(
+            shapely.GeometryType.MULTIPOLYGON,
+            np.asarray(self.coordenadas),
+            (np.asarray(self.anillos), np.asarray(self.poligonos), np.asarray(self.distritos)),
+        )
+
+
+@lru_cache(maxsize=16)
+def cargar(ruta_geojson, tolerancia=0.0, directorio=DIRECTORIO_CACHE):
+    """Geometría binaria del GeoJSON (original o simplificada); construye la caché la primera vez que se usa."""
+    return construir_nivel(ruta_geojson, tolerancia, directorio)
+
+
+if __name__ == '__main__':
+    ruta = sys.argv[1] if len(sys.argv) > 1 else RUTA_GEOJSON
+    for tolerancia in TOLERANCIAS_NIVELES:
+        geometria = construir_nivel(ruta, tolerancia)
+        print(f"Nivel {tolerancia:g}: {len(geometria)} distritos, {len(geometria.coordenadas)} coordenadas "
+              f"({geometria.carpeta or 'en memoria: no se pudo escribir la caché'}).")
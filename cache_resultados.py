@@ -0,0 +1,159 @@
+# ==============================================================================
+# CACHÉ DE RESULTADOS EN DISCO, COMPARTIDA ENTRE PROCESOS
+# ==============================================================================
+# @st.cache_data vive dentro de un solo proceso y, para saber si los datos cambiaron, vuelve a
+# calcular el hash de todos los diccionarios en cada ejecución del script. Con varios procesos
+# (workers) cada uno recalcula y guarda su propia copia de los resultados.
+#
+# Esta caché usa en cambio:
+#   - Una versión explícita de los datos: un hash de los diccionarios y del GeoJSON que se calcula
+#     una sola vez por proceso (version_datos()).
+#   - Una carpeta en disco por resultado, con un archivo .npy por arreglo. Los arreglos se abren en
+#     memoria mapeada de solo lectura, así que todos los procesos comparten las mismas páginas del disco.
+#   - Un límite de tamaño: al superarlo se borran los resultados usados hace más tiempo (LRU), según
+#     la fecha de modificación de su carpeta, que se actualiza cada vez que se leen.
+#   - Contadores de aciertos y fallos por proceso, para ver si la caché está funcionando.
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from functools import lru_cache
+
+import numpy as np
+
+import cache_geometria
+
+# Carpeta de la caché; se puede cambiar con la variable de entorno RIESGOS_CACHE_RESULTADOS.
+DIRECTORIO_CACHE = os.environ.get('RIESGOS_CACHE_RESULTADOS', os.path.join('.cache', 'resultados'))
+
+# Tamaño máximo de la caché en disco (en bytes).
+LIMITE_BYTES = 256 * 1024 * 1024
+
+
+def version_datos(diccionarios, archivos=()):
+    """Hash corto que identifica una versión de los datos (diccionarios y contenido de archivos).
+
+    Los diccionarios se convierten a JSON con las claves ordenadas, así el hash no depende del orden.
+    """
+    sha = hashlib.sha256()
+    for diccionario in diccionarios:
+        sha.update(json.dumps(diccionario, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8'))
+    for ruta in archivos:
+        sha.update(cache_geometria.hash_archivo(ruta).encode('ascii'))
+    return sha.hexdigest()[:16]
+
+
+class CacheDisco:
+    """Caché de diccionarios de arreglos de NumPy, guardados en disco y leídos en memoria mapeada."""
+
+    def __init__(self, directorio=DIRECTORIO_CACHE, limite_bytes=LIMITE_BYTES):
+        self.directorio = directorio
+        self.limite_bytes = limite_bytes
+        self.aciertos = 0
+        self.fallos = 0
+
+    def _carpeta(self, clave):
+        # La clave puede tener cualquier texto; el nombre de la carpeta es su hash.
+        return os.path.join(self.directorio, hashlib.sha256(clave.encode('utf-8')).hexdigest()[:24])
+
+    def _leer(self, clave):
+        carpeta = self._carpeta(clave)
+        try:
+            with open(os.path.join(carpeta, 'nombres.json'), encoding='utf-8') as archivo:
+                nombres = json.load(archivo)
+            arreglos = {nombre: np.load(os.path.join(carpeta, f'{nombre}.npy'), mmap_mode='r') for nombre in nombres}
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(carpeta)  # Marca el resultado como recién usado (para el orden LRU).
+        except OSError:
+            pass  # Caché de solo lectura (ej. compartida y precalculada): el resultado sigue siendo válido.
+        return arreglos
+
+    def obtener(self, clave):
+        """Devuelve {nombre: arreglo de solo lectura} o None si la clave no está en la caché."""
+        arreglos = self._leer(clave)
+        if arreglos is None:
+            self.fallos += 1
+        else:
+            self.aciertos += 1
+        return arreglos
+
+    def guardar(self, clave, arreglos):
+        """Guarda {nombre: arreglo} bajo 'clave'. Si no se puede escribir en disco, simplemente no se guarda."""
+        destino = self._carpeta(clave)
+        temporal = None
+        try:
+            os.makedirs(self.directorio, exist_ok=True)
+            temporal = tempfile.mkdtemp(dir=self.directorio, prefix='.escribiendo-')
+            for nombre, arreglo in arreglos.items():
+                np.save(os.path.join(temporal, f'{nombre}.npy'), np.asarray(arreglo), allow_pickle=False)
+            with open(os.path.join(temporal, 'nombres.json'), 'w', encoding='utf-8') as archivo:
+                json.dump(list(arreglos), archivo)
+            # Renombrar es atómico: los demás procesos ven el resultado completo o no lo ven.
+            os.rename(temporal, destino)
+        except OSError:
+            if temporal is not None:
+                shutil.rmtree(temporal, ignore_errors=True)
+            return
+        self.recortar(conservar=destino)
+
+    def obtener_o_calcular(self, clave, calcular):
+        """Lee el resultado de la caché o, si no está, lo calcula con calcular() (que devuelve {nombre: arreglo}) y lo guarda."""
+        arreglos = self.obtener(clave)
+        if arreglos is None:
+            calculados = calcular()
+            self.guardar(clave, calculados)
+            # Se vuelve a leer desde el disco para que este proceso también use la copia compartida.
+            # Si no se pudo escribir (ej. disco de solo lectura), se usan los arreglos recién calculados.
+            arreglos = self._leer(clave) or calculados
+        return arreglos
+
+    def entradas(self):
+        """Lista de (carpeta, bytes, última vez usada) de los resultados guardados, del más antiguo al más reciente."""
+        if not os.path.isdir(self.directorio):
+            return []
+        resultado = []
+        for nombre in os.listdir(self.directorio):
+            carpeta = os.path.join(self.directorio, nombre)
+            if nombre.startswith('.') or not os.path.isdir(carpeta):
+                continue
+            try:
+                tamano = sum(entrada.stat().st_size for entrada in os.scandir(carpeta))
+                resultado.append((carpeta, tamano, os.stat(carpeta).st_mtime))
+            except OSError:
+                continue  # Otro proceso la borró mientras se recorría.
+        return sorted(resultado, key=lambda entrada: entrada[2])
+
+    def recortar(self, conservar=None):
+        """Borra los resultados menos usados hasta que la caché ocupe como máximo limite_bytes."""
+        entradas = self.entradas()
+        total = sum(tamano for _, tamano, _ in entradas)
+        for carpeta, tamano, _ in entradas:
+            if total <= self.limite_bytes:
+                break
+            if carpeta == conservar:
+                continue
+            # Los procesos que ya tienen los arreglos mapeados pueden seguir leyéndolos aunque se borren.
+            shutil.rmtree(carpeta, ignore_errors=True)
+            total -= tamano
+
+    def estado(self):
+        """Contadores de este proceso y tamaño actual de la caché en disco."""
+        entradas = self.entradas()
+        return {
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'entradas': len(entradas),
+            'bytes': sum(tamano for _, tamano, _ in entradas),
+            'limite_bytes': self.limite_bytes,
+            'directorio': os.path.abspath(self.directorio),
+        }
+
+
+@lru_cache(maxsize=1)
+def cache_por_defecto():
+    """Instancia única por proceso (así los contadores se acumulan entre ejecuciones del script)."""
+    return CacheDisco()
@@ -0,0 +1,88 @@
+# ==============================================================================
+# DATOS DE LOS DISTRITOS DE LIMA METROPOLITANA Y CALLAO
+# ==============================================================================
+# Este módulo solo contiene los datos brutos. Se separó de riesgos_app.py para que otros
+# scripts (por ejemplo, los benchmarks) puedan usar los mismos datos sin ejecutar la aplicación de Streamlit.
+
+# Aquí se almacenan todos los datos brutos en diccionarios de Python.
+# Cada diccionario representa una variable diferente.
+# Las claves (nombres de los distritos) están en mayúsculas y sin tildes para estandarizar y facilitar la unión de datos.
+# Todos los diccionarios fueron filtrados con anterioridad para centrarse en Lima Metropolitana y Callao. Además nos hemos centrado desde los 2000 hasta la actualidad. Y con la información del último censo de INEI del 2017.
+
+poblacion = {
+    'ANCON': 43400, 'ATE': 594529, 'BARRANCO': 36721, 'BRENA': 80912, 'CARABAYLLO': 360718, 'CHACLACAYO': 46225, 'CHORRILLOS': 342505, 'CIENEGUILLA': 34090, 'COMAS': 510828, 'EL AGUSTINO': 193319, 'INDEPENDENCIA': 227136, 'JESUS MARIA': 75359, 'LA MOLINA': 140679, 'LA VICTORIA': 192721, 'LIMA': 241783, 'LINCE': 58077, 'LOS OLIVOS': 326604, 'LURIGANCHO': 232730, 'LURIN': 83620, 'MAGDALENA DEL MAR': 60296, 'MIRAFLORES': 85065, 'PACHACAMAC': 90007, 'PUCUSANA': 13619, 'PUEBLO LIBRE': 82355, 'PUENTE PIEDRA': 234341, 'PUNTA HERMOSA': 15684, 'PUNTA NEGRA': 7702, 'RIMAC': 174789, 'SAN BARTOLO': 7746, 'SAN BORJA': 118490, 'SAN ISIDRO': 68966, 'SAN JUAN DE LURIGANCHO': 1038495, 'SAN JUAN DE MIRAFLORES': 404000, 'SAN LUIS': 58001, 'SAN MARTIN DE PORRES': 699492, 'SAN MIGUEL': 150367, 'SANTA ANITA': 205816, 'SANTA MARIA DEL MAR': 1294, 'SANTA ROSA': 15113, 'SANTIAGO DE SURCO': 354270, 'SURQUILLO': 92100, 'VILLA EL SALVADOR': 378472, 'VILLA MARIA DEL TRIUNFO': 398423,
+    'CALLAO': 477743, 'BELLAVISTA': 78936, 'CARMEN DE LA LEGUA REYNOSO': 48331, 'LA PERLA': 61698, 'LA PUNTA': 4014, 'VENTANILLA': 424467, 'MI PERU': 51522
+}
+area = {
+    'ANCON': 299, 'ATE': 78, 'BARRANCO': 3, 'BRENA': 3, 'CARABAYLLO': 347, 'CHACLACAYO': 39, 'CHORRILLOS': 38, 'CIENEGUILLA': 241, 'COMAS': 48, 'EL AGUSTINO': 13, 'INDEPENDENCIA': 15, 'JESUS MARIA': 5, 'LA MOLINA': 66, 'LA VICTORIA': 9, 'LIMA': 22, 'LINCE': 3, 'LOS OLIVOS': 19, 'LURIGANCHO': 236, 'LURIN': 181, 'MAGDALENA DEL MAR': 4, 'MIRAFLORES': 10, 'PACHACAMAC': 160, 'PUEBLO LIBRE': 5, 'PUCUSANA': 38, 'PUENTE PIEDRA': 71, 'PUNTA HERMOSA': 13, 'PUNTA NEGRA': 13, 'RIMAC': 12, 'SAN BARTOLO': 45, 'SAN BORJA': 10, 'SAN ISIDRO': 12, 'SAN JUAN DE LURIGANCHO': 131, 'SAN JUAN DE MIRAFLORES': 26, 'SAN LUIS': 4, 'SAN MARTIN DE PORRES': 41, 'SAN MIGUEL': 10, 'SANTA ANITA': 11, 'SANTA MARIA DEL MAR': 1, 'SANTA ROSA': 21, 'SANTIAGO DE SURCO': 35, 'SURQUILLO': 3, 'VILLA EL SALVADOR': 36, 'VILLA MARIA DEL TRIUNFO': 71,
+    'CALLAO': 47, 'BELLAVISTA': 5, 'CARMEN DE LA LEGUA REYNOSO': 2, 'LA PERLA': 3, 'LA PUNTA': 0.75, 'VENTANILLA': 74, 'MI PERU': 3
+}
+suelos = {
+    'ANCON': 'Mixto: Roca (S1) en cerros y Suelo Arenoso (S3) en pampas',
+    'ATE': 'Mixto: Conglomerado (S2) en el oeste, transita a Roca (S1) al este',
+    'BARRANCO': 'Suelo Rígido (Conglomerado S2)',
+    'BRENA': 'Suelo Rígido (Conglomerado S2)',
+    'CARABAYLLO': 'Mixto: Roca (S1) en laderas y Suelo Aluvial/Arenoso (S2-S3) en zonas bajas',
+    'CHACLACAYO': 'Suelo Muy Rígido (Roca S1 y grava densa)',
+    'CHORRILLOS': 'Mixto: Roca (S1 Morro Solar), Suelo Blando (S4 Pantanos), Conglomerado (S2 zona alta)',
+    'CIENEGUILLA': 'Suelo Muy Rígido (Roca S1 y grava densa)',
+    'COMAS': 'Mixto: Roca (S1) en laderas y Conglomerado (S2) en zonas planas',
+    'EL AGUSTINO': 'Mixto: Roca (S1) en laderas y suelos de menor calidad en zonas bajas',
+    'INDEPENDENCIA': 'Mixto: Roca (S1) en cerros y Conglomerado (S2) en la base',
+    'JESUS MARIA': 'Suelo Rígido (Conglomerado S2)',
+    'LA MOLINA': 'Suelo Muy Rígido (Roca S1 en cerros y suelo firme S1-S2 en valle)',
+    'LA VICTORIA': 'Suelo Rígido (Conglomerado S2)',
+    'LIMA': 'Suelo Rígido (Conglomerado S2), posibles rellenos en zona histórica',
+    'LINCE': 'Suelo Rígido (Conglomerado S2)',
+    'LOS OLIVOS': 'Suelo Rígido (Conglomerado S2 y suelo aluvial denso)',
+    'LURIGANCHO': 'Suelo Muy Rígido (Roca S1 y conglomerados densos)',
+    'LURIN': 'Mixto: Suelo Arenoso (S3) y suelo aluvial en el valle',
+    'MAGDALENA DEL MAR': 'Suelo Rígido (Conglomerado S2)',
+    'MIRAFLORES': 'Suelo Rígido (Conglomerado S2)',
+    'PACHACAMAC': 'Mixto: Suelo aluvial en valle, zonas rocosas (S1) y arenosas (S3)',
+    'PUEBLO LIBRE': 'Suelo Rígido (Conglomerado S2)',
+    'PUCUSANA': 'Mixto: Roca (S1) en laderas y Suelo Arenoso (S3) en zonas bajas',
+    'PUENTE PIEDRA': 'Predominantemente Suelo Arenoso y gravoso (S3)',
+    'PUNTA HERMOSA': 'Mixto: Roca (S1) en laderas y Suelo Arenoso (S3)',
+    'PUNTA NEGRA': 'Mixto: Roca (S1) en laderas y Suelo Arenoso (S3)',
+    'RIMAC': 'Mixto: Roca (S1 Cerro San Cristóbal) y suelo aluvial (S2-S3) cerca al río',
+    'SAN BARTOLO': 'Mixto: Roca (S1) en laderas y Suelo Arenoso (S3)',
+    'SAN BORJA': 'Suelo Rígido (Conglomerado S2)',
+    'SAN ISIDRO': 'Suelo Rígido (Conglomerado S2)',
+    'SAN JUAN DE LURIGANCHO': 'Mixto: Roca (S1) en cerros y Conglomerado (S2) en zonas planas',
+    'SAN JUAN DE MIRAFLORES': 'Mixto: Suelo Arenoso (S3) en zonas bajas y Roca (S1) en laderas',
+    'SAN LUIS': 'Suelo Rígido (Conglomerado S2)',
+    'SAN MARTIN DE PORRES': 'Suelo Rígido (Conglomerado S2 y suelo aluvial denso)',
+    'SAN MIGUEL': 'Suelo Rígido (Conglomerado S2), con zonas arenosas hacia la costa',
+    'SANTA ANITA': 'Suelo Rígido (Conglomerado S2)',
+    'SANTA MARIA DEL MAR': 'Mixto: Roca (S1) en laderas y Suelo Arenoso (S3)',
+    'SANTA ROSA': 'Predominantemente Suelo Arenoso (S3)',
+    'SANTIAGO DE SURCO': 'Predominantemente Suelo Rígido (Conglomerado S2), con zonas de Roca (S1) al este',
+    'SURQUILLO': 'Suelo Rígido (Conglomerado S2)',
+    'VILLA EL SALVADOR': 'Predominantemente Suelo Arenoso de densidad media a suelta (S3/S4)',
+    'VILLA MARIA DEL TRIUNFO': 'Mixto: Suelo Arenoso (S3) en zonas bajas y Roca (S1) en laderas',
+    'CALLAO': 'Suelo Blando (S4) y rellenos artificiales',
+    'BELLAVISTA': 'Suelo Blando (S4) y rellenos artificiales',
+    'CARMEN DE LA LEGUA REYNOSO': 'Suelo Blando (S4) y rellenos artificiales',
+    'LA PERLA': 'Suelo Blando (S4) y rellenos artificiales',
+    'LA PUNTA': 'Suelo Arenoso y de grava (S3)',
+    'VENTANILLA': 'Predominantemente Suelo Arenoso (S3)',
+    'MI PERU': 'Predominantemente Suelo Arenoso (S3)'
+}
+# Se pidió a la IA determinar de una escala de 0 a 10 que tan riesgosa es el suelo predominante del distrito. Además se pidió agregar información de los distritos de CALLAO a la IA
+peligrosidad_suelos = {
+    'ANCON': 7, 'ATE': 3, 'BARRANCO': 3, 'BRENA': 3, 'CARABAYLLO': 7, 'CHACLACAYO': 2, 'CHORRILLOS': 9, 'CIENEGUILLA': 2, 'COMAS': 6, 'EL AGUSTINO': 6, 'INDEPENDENCIA': 6, 'JESUS MARIA': 3, 'LA MOLINA': 2, 'LA VICTORIA': 3, 'LIMA': 5, 'LINCE': 3, 'LOS OLIVOS': 4, 'LURIGANCHO': 2, 'LURIN': 7, 'MAGDALENA DEL MAR': 3, 'MIRAFLORES': 3, 'PACHACAMAC': 7, 'PUEBLO LIBRE': 3, 'PUCUSANA': 7, 'PUENTE PIEDRA': 8, 'PUNTA HERMOSA': 7, 'PUNTA NEGRA': 7, 'RIMAC': 7, 'SAN BARTOLO': 7, 'SAN BORJA': 3, 'SAN ISIDRO': 3, 'SAN JUAN DE LURIGANCHO': 6, 'SAN JUAN DE MIRAFLORES': 8, 'SAN LUIS': 3, 'SAN MARTIN DE PORRES': 4, 'SAN MIGUEL': 5, 'SANTA ANITA': 3, 'SANTA MARIA DEL MAR': 7, 'SANTA ROSA': 8, 'SANTIAGO DE SURCO': 4, 'SURQUILLO': 3, 'VILLA EL SALVADOR': 10, 'VILLA MARIA DEL TRIUNFO': 8,
+    'CALLAO': 9, 'BELLAVISTA': 8, 'CARMEN DE LA LEGUA REYNOSO': 9, 'LA PERLA': 8, 'LA PUNTA': 7, 'VENTANILLA': 9, 'MI PERU': 8
+}
+material_precario = {
+    'ANCON': 429, 'ATE': 4276, 'BARRANCO': 117, 'BRENA': 584, 'CARABAYLLO': 2118, 'CHACLACAYO': 84, 'CHORRILLOS': 2175, 'CIENEGUILLA': 475, 'COMAS': 2618, 'EL AGUSTINO': 564, 'INDEPENDENCIA': 1954, 'JESUS MARIA': 138, 'LA MOLINA': 101, 'LA VICTORIA': 869, 'LIMA': 3930, 'LINCE': 183, 'LOS OLIVOS': 389, 'LURIGANCHO': 1890, 'LURIN': 1212, 'MAGDALENA DEL MAR': 114, 'MIRAFLORES': 99, 'PACHACAMAC': 1254, 'PUEBLO LIBRE': 99, 'PUCUSANA': 1022, 'PUENTE PIEDRA': 2703, 'PUNTA HERMOSA': 982, 'PUNTA NEGRA': 76, 'RIMAC': 2442, 'SAN BARTOLO': 66, 'SAN BORJA': 27, 'SAN ISIDRO': 11, 'SAN JUAN DE LURIGANCHO': 11906, 'SAN JUAN DE MIRAFLORES': 3590, 'SAN LUIS': 78, 'SAN MARTIN DE PORRES': 1297, 'SAN MIGUEL': 145, 'SANTA ANITA': 406, 'SANTA MARIA DEL MAR': 9, 'SANTA ROSA': 188, 'SANTIAGO DE SURCO': 461, 'SURQUILLO': 176, 'VILLA EL SALVADOR': 3166, 'VILLA MARIA DEL TRIUNFO': 9506,
+    'CALLAO': 8500, 'BELLAVISTA': 1500, 'CARMEN DE LA LEGUA REYNOSO': 1200, 'LA PERLA': 900, 'LA PUNTA': 50, 'VENTANILLA': 15000, 'MI PERU': 2500
+}
+damnificados_2000 = {
+    'ANCON': 0, 'ATE': 117, 'BARRANCO': 8, 'BRENA': 0, 'CARABAYLLO': 4, 'CHACLACAYO': 0, 'CHORRILLOS': 0, 'CIENEGUILLA': 0, 'COMAS': 30, 'EL AGUSTINO': 68, 'INDEPENDENCIA': 10, 'JESUS MARIA': 0, 'LA MOLINA': 0, 'LA VICTORIA': 8, 'LIMA': 56, 'LINCE': 0, 'LOS OLIVOS': 0, 'LURIGANCHO': 0, 'LURIN': 0, 'MAGDALENA DEL MAR': 0, 'MIRAFLORES': 0, 'PACHACAMAC': 0, 'PUEBLO LIBRE': 0, 'PUCUSANA': 0, 'PUENTE PIEDRA': 5, 'PUNTA HERMOSA': 55, 'PUNTA NEGRA': 0, 'RIMAC': 4, 'SAN BARTOLO': 0, 'SAN BORJA': 0, 'SAN ISIDRO': 0, 'SAN JUAN DE LURIGANCHO': 4, 'SAN JUAN DE MIRAFLORES': 88, 'SAN LUIS': 0, 'SAN MARTIN DE PORRES': 0, 'SAN MIGUEL': 0, 'SANTA ANITA': 0, 'SANTA MARIA DEL MAR': 0, 'SANTA ROSA': 0, 'SANTIAGO DE SURCO': 0, 'SURQUILLO': 0, 'VILLA EL SALVADOR': 94, 'VILLA MARIA DEL TRIUNFO': 0,
+    'CALLAO': 0, 'BELLAVISTA': 0, 'CARMEN DE LA LEGUA REYNOSO': 0, 'LA PERLA': 0, 'LA PUNTA': 0, 'VENTANILLA': 0, 'MI PERU': 0
+}
+viviendas_destruidas_2000 = {
+    'ANCON': 0, 'ATE': 27, 'BARRANCO': 1, 'BRENA': 0, 'CARABAYLLO': 1, 'CHACLACAYO': 0, 'CHORRILLOS': 0, 'CIENEGUILLA': 0, 'COMAS': 4, 'EL AGUSTINO': 9, 'INDEPENDENCIA': 1, 'JESUS MARIA': 0, 'LA MOLINA': 0, 'LA VICTORIA': 1, 'LIMA': 9, 'LINCE': 0, 'LOS OLIVOS': 0, 'LURIGANCHO': 0, 'LURIN': 0, 'MAGDALENA DEL MAR': 0, 'MIRAFLORES': 0, 'PACHACAMAC': 0, 'PUEBLO LIBRE': 0, 'PUCUSANA': 0, 'PUENTE PIEDRA': 1, 'PUNTA HERMOSA': 18, 'PUNTA NEGRA': 0, 'RIMAC': 1, 'SAN BARTOLO': 0, 'SAN BORJA': 0, 'SAN ISIDRO': 0, 'SAN JUAN DE LURIGANCHO': 1, 'SAN JUAN DE MIRAFLORES': 22, 'SAN LUIS': 0, 'SAN MARTIN DE PORRES': 0, 'SAN MIGUEL': 0, 'SANTA ANITA': 0, 'SANTA MARIA DEL MAR': 0, 'SANTA ROSA': 0, 'SANTIAGO DE SURCO': 0, 'SURQUILLO': 0, 'VILLA EL SALVADOR': 52, 'VILLA MARIA DEL TRIUNFO': 0,
+    'CALLAO': 0, 'BELLAVISTA': 0, 'CARMEN DE LA LEGUA REYNOSO': 0, 'LA PERLA': 0, 'LA PUNTA': 0, 'VENTANILLA': 0, 'MI PERU': 0
+}
@@ -0,0 +1,214 @@
+# ==============================================================================
+# ESCENARIOS SÍSMICOS: SACUDIMIENTO Y DAÑOS ESPERADOS POR DISTRITO
+# ==============================================================================
+# A partir de un sismo (epicentro, profundidad y magnitud) se estima, para cada distrito:
+#   1. La distancia del hipocentro al polígono del distrito (0 km en planta si el epicentro cae dentro).
+#   2. La aceleración máxima del suelo (PGA) en roca con una ley de atenuación para sismos de subducción.
+#   3. La PGA en el sitio, multiplicando por un factor de amplificación según los suelos S1–S4 del distrito.
+#   4. Las viviendas dañadas esperadas con curvas de fragilidad (material precario vs. resto de viviendas)
+#      y las personas afectadas a partir de la población.
+#
+# Con un catálogo sintético de miles de sismos (cada uno con su tasa anual) se calcula la pérdida
+# anual esperada por distrito. Los sismos se procesan por lotes (sismos x distritos) con NumPy y
+# los resultados se van sumando, sin guardar el detalle de cada sismo.
+#
+# IMPORTANTE: los parámetros (fragilidad, amplificación, tasas) son valores ilustrativos de referencia,
+# no un estudio de peligro sísmico. Sirven para comparar distritos y escenarios entre sí.
+#
+# Uso desde la terminal (desde la carpeta principal del repositorio):
+#     python escenarios.py --eventos 10000
+
+import argparse
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import shapely
+from scipy.special import ndtr                 # Función de distribución acumulada de la normal estándar.
+
+import cache_geometria
+from cache_geometria import RUTA_GEOJSON
+
+# --- Proyección local ---
+# Para medir distancias en km se usa una proyección equirectangular centrada en Lima
+# (el error es pequeño en la escala de la región de Lima y Callao y su zona costera).
+LATITUD_REFERENCIA = -12.0464
+LONGITUD_REFERENCIA = -77.0428
+KM_POR_GRADO_LATITUD = 110.574
+KM_POR_GRADO_LONGITUD = 111.320 * np.cos(np.radians(LATITUD_REFERENCIA))
+
+# --- Amplificación de sitio ---
+# Factor que multiplica la PGA en roca según el tipo de suelo (clasificación de la Norma E.030).
+# Si el distrito tiene varios tipos de suelo (ej. "Mixto: Roca (S1) ... Arenoso (S3)"), se promedian.
+FACTOR_SUELO = {'S0': 0.8, 'S1': 1.0, 'S2': 1.2, 'S3': 1.4, 'S4': 1.7}
+
+# --- Curvas de fragilidad (log-normales) ---
+# Probabilidad de daño severo = Φ(ln(PGA / mediana) / beta), con la PGA en g.
+FRAGILIDAD_PRECARIA = {'mediana': 0.25, 'beta': 0.6}    # Adobe, quincha y otros materiales precarios.
+FRAGILIDAD_RESTO = {'mediana': 0.90, 'beta': 0.6}       # Albañilería confinada y concreto.
+
+# Habitantes por vivienda (aproximación del Censo 2017) para pasar de población a viviendas y viceversa.
+PERSONAS_POR_VIVIENDA = 3.5
+
+# --- Catálogo sintético ---
+# Zona fuente de subducción frente a la costa central del Perú y relación de Gutenberg-Richter.
+ZONA_FUENTE = {'lat_min': -14.0, 'lat_max': -10.0, 'lon_min': -78.8, 'lon_max': -76.8}
+PROFUNDIDAD_KM = (15.0, 60.0)
+MAGNITUD_MINIMA = 6.0
+MAGNITUD_MAXIMA = 9.0
+VALOR_B = 1.0
+TASA_ANUAL_MAGNITUD_MINIMA = 0.25                 # Sismos por año con M >= MAGNITUD_MINIMA en la zona fuente.
+
+# Sismo de referencia: Lima, 3 de octubre de 1974 (Mw 8.1).
+SISMO_REFERENCIA = {'latitud': -12.39, 'longitud': -77.66, 'profundidad': 13.0, 'magnitud': 8.1}
+
+# Sismos procesados a la vez al evaluar un catálogo.
+EVENTOS_POR_LOTE = 2_000
+
+
+def _a_km(longitud, latitud):
+    # Convierte coordenadas geográficas a km respecto al centro de Lima.
+    x = (np.asarray(longitud) - LONGITUD_REFERENCIA) * KM_POR_GRADO_LONGITUD
+    y = (np.asarray(latitud) - LATITUD_REFERENCIA) * KM_POR_GRADO_LATITUD
+    return x, y
+
+
+def factor_sitio(descripcion_suelo):
+    """Promedio de FACTOR_SUELO de las clases S0–S4 mencionadas en la descripción del suelo (1.0 si no hay ninguna)."""
+    clases = re.findall(r'S[0-4]', descripcion_suelo)
+    return float(np.mean([FACTOR_SUELO[clase] for clase in clases])) if clases else 1.0
+
+
+def pga_roca(magnitud, distancia_hipocentral, profundidad, intraplaca=False):
+    """PGA mediana en roca (g) con la ley de atenuación de Youngs et al. (1997) para subducción.
+
+    Acepta arreglos de cualquier forma compatible (ej. sismos x distritos).
+    """
+    ln_pga = (
+        0.2418 + 1.414 * magnitud
+        - 2.552 * np.log(distancia_hipocentral + 1.7818 * np.exp(0.554 * magnitud))
+        + 0.00607 * profundidad
+        + 0.3846 * intraplaca
+    )
+    return np.exp(ln_pga)
+
+
+def probabilidad_dano(pga, fragilidad):
+    """Probabilidad de daño severo para una PGA (g) según una curva de fragilidad log-normal."""
+    with np.errstate(divide='ignore'):
+        return ndtr(np.log(pga / fragilidad['mediana']) / fragilidad['beta'])
+
+
+class ModeloEscenarios:
+    """Geometría (en km) y exposición de cada distrito, en el orden del GeoJSON."""
+
+    def __init__(self, nombres, poligonos_km, factores_sitio, viviendas_precarias, viviendas_resto):
+        self.nombres = tuple(nombres)
+        self.poligonos_km = poligonos_km
+        self.factores_sitio = np.asarray(factores_sitio, dtype=float)
+        self.viviendas_precarias = np.asarray(viviendas_precarias, dtype=float)
+        self.viviendas_resto = np.asarray(viviendas_resto, dtype=float)
+
+    @classmethod
+    def desde_datos(cls, suelos_data, poblacion_data, material_data, ruta=RUTA_GEOJSON):
+        geometria = cache_geometria.cargar(ruta)
+        nombres = geometria.nombres
+        poligonos_km = shapely.transform(geometria.poligonos_shapely(), lambda xy: np.column_stack(_a_km(xy[:, 0], xy[:, 1])))
+
+        factores = [factor_sitio(suelos_data.get(nombre, '')) for nombre in nombres]
+        precarias = np.array([material_data.get(nombre, 0) for nombre in nombres], dtype=float)
+        totales = np.array([poblacion_data.get(nombre, 0) for nombre in nombres], dtype=float) / PERSONAS_POR_VIVIENDA
+        return cls(nombres, poligonos_km, factores, precarias, np.maximum(totales - precarias, 0))
+
+    def evaluar(self, latitud, longitud, profundidad, magnitud, intraplaca=False):
+        """PGA en sitio y viviendas dañadas esperadas para un lote de sismos: arreglos (sismos x distritos)."""
+        latitud, longitud, profundidad, magnitud = (np.atleast_1d(np.asarray(v, dtype=float)) for v in (latitud, longitud, profundidad, magnitud))
+        epicentros = shapely.points(*_a_km(longitud, latitud))
+        # Distancia en planta del epicentro a cada polígono (0 si cae dentro) y luego distancia al hipocentro.
+        distancia_epicentral = shapely.distance(epicentros[:, np.newaxis], self.poligonos_km[np.newaxis, :])
+        distancia = np.sqrt(distancia_epicentral ** 2 + profundidad[:, np.newaxis] ** 2)
+
+        pga = pga_roca(magnitud[:, np.newaxis], distancia, profundidad[:, np.newaxis], intraplaca) * self.factores_sitio
+        viviendas = (
+            self.viviendas_precarias * probabilidad_dano(pga, FRAGILIDAD_PRECARIA)
+            + self.viviendas_resto * probabilidad_dano(pga, FRAGILIDAD_RESTO)
+        )
+        return pga, viviendas
+
+    def escenario(self, latitud, longitud, profundidad, magnitud, intraplaca=False):
+        """Resultados por distrito de un solo sismo."""
+        pga, viviendas = self.evaluar(latitud, longitud, profundidad, magnitud, intraplaca)
+        return pd.DataFrame({
+            'pga_g': pga[0],
+            'viviendas_danadas': viviendas[0],
+            'personas_afectadas': viviendas[0] * PERSONAS_POR_VIVIENDA,
+        }, index=pd.Index(self.nombres, name='distrito'))
+
+    def perdida_anual(self, catalogo, eventos_por_lote=EVENTOS_POR_LOTE):
+        """Viviendas dañadas y personas afectadas esperadas por año, sumando todo el catálogo por lotes.
+
+        'catalogo' es un DataFrame con columnas latitud, longitud, profundidad, magnitud y tasa_anual.
+        """
+        columnas = [catalogo[c].to_numpy(dtype=float) for c in ('latitud', 'longitud', 'profundidad', 'magnitud', 'tasa_anual')]
+        viviendas_anuales = np.zeros(len(self.nombres))
+        for inicio in range(0, len(catalogo), eventos_por_lote):
+            lat, lon, prof, mag, tasa = (c[inicio:inicio + eventos_por_lote] for c in columnas)
+            _, viviendas = self.evaluar(lat, lon, prof, mag)
+            viviendas_anuales += tasa @ viviendas            # Suma ponderada por la tasa anual de cada sismo.
+        return pd.DataFrame({
+            'viviendas_danadas_anual': viviendas_anuales,
+            'personas_afectadas_anual': viviendas_anuales * PERSONAS_POR_VIVIENDA,
+        }, index=pd.Index(self.nombres, name='distrito'))
+
+
+def firma_modelo():
+    """Texto con todos los parámetros del modelo; sirve como parte de la clave de los resultados en caché."""
+    return repr((FACTOR_SUELO, FRAGILIDAD_PRECARIA, FRAGILIDAD_RESTO, PERSONAS_POR_VIVIENDA, ZONA_FUENTE,
+                 PROFUNDIDAD_KM, MAGNITUD_MINIMA, MAGNITUD_MAXIMA, VALOR_B, TASA_ANUAL_MAGNITUD_MINIMA))
+
+
+def catalogo_sintetico(n_eventos, semilla=0):
+    """Catálogo de sismos con epicentros uniformes en ZONA_FUENTE y magnitudes de Gutenberg-Richter truncada.
+
+    Cada sismo representa la misma fracción de la tasa anual total, así que la suma de 'tasa_anual'
+    es igual a TASA_ANUAL_MAGNITUD_MINIMA.
+    """
+    rng = np.random.default_rng(semilla)
+    # Muestreo por transformada inversa de la distribución exponencial truncada de magnitudes.
+    beta = VALOR_B * np.log(10)
+    u = rng.random(n_eventos)
+    magnitud = MAGNITUD_MINIMA - np.log(1 - u * (1 - np.exp(-beta * (MAGNITUD_MAXIMA - MAGNITUD_MINIMA)))) / beta
+    return pd.DataFrame({
+        'latitud': rng.uniform(ZONA_FUENTE['lat_min'], ZONA_FUENTE['lat_max'], n_eventos),
+        'longitud': rng.uniform(ZONA_FUENTE['lon_min'], ZONA_FUENTE['lon_max'], n_eventos),
+        'profundidad': rng.uniform(*PROFUNDIDAD_KM, n_eventos),
+        'magnitud': magnitud,
+        'tasa_anual': np.full(n_eventos, TASA_ANUAL_MAGNITUD_MINIMA / n_eventos),
+    })
+
+
+@lru_cache(maxsize=1)
+def _modelo_por_defecto():
+    from datos import suelos, poblacion, material_precario
+    return ModeloEscenarios.desde_datos(suelos, poblacion, material_precario)
+
+
+if __name__ == '__main__':
+    import time
+
+    parser = argparse.ArgumentParser(description="Pérdida anual esperada por distrito con un catálogo sintético de sismos.")
+    parser.add_argument('--eventos', type=int, default=10_000)
+    parser.add_argument('--semilla', type=int, default=0)
+    args = parser.parse_args()
+
+    modelo = _modelo_por_defecto()
+    catalogo = catalogo_sintetico(args.eventos, args.semilla)
+    inicio = time.perf_counter()
+    perdida = modelo.perdida_anual(catalogo)
+    duracion = time.perf_counter() - inicio
+
+    print(modelo.escenario(**SISMO_REFERENCIA).sort_values('viviendas_danadas', ascending=False).head(10).round(2))
+    print()
+    print(perdida.sort_values('viviendas_danadas_anual', ascending=False).head(10).round(2))
+    print(f"\n{len(catalogo)} sismos en {duracion:.2f} s ({len(catalogo) / duracion:,.0f} sismos/s)")
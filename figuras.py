@@ -0,0 +1,100 @@
+# ==============================================================================
+# CAPA DE CONSTRUCCIÓN DE FIGURAS DEL MAPA
+# ==============================================================================
+# Antes, cada clic en un botón volvía a llamar a px.choropleth_mapbox() con toda la GeoDataFrame,
+# lo que convertía de nuevo los 50 polígonos (shapely -> GeoJSON) y armaba una figura nueva desde cero.
+# Este módulo separa las dos partes de la figura:
+#   - La geometría de los distritos: se lee y se prepara UNA sola vez por proceso y siempre es el mismo objeto.
+#   - Los datos de cada vista: solo cambian el arreglo de colores (z), los valores del hover y la barra de colores.
+# Las figuras ya construidas se guardan en una caché con tamaño máximo, así que volver a una vista ya vista no cuesta nada.
+
+from functools import lru_cache      # Caché en memoria con un límite de elementos (por proceso).
+
+import plotly.graph_objects as go    # Para construir la figura trazo por trazo, sin pasar por plotly.express.
+
+import cache_geometria               # Geometría de los distritos en formato binario (sin geopandas).
+# Archivo con los polígonos, centro del mapa y decimales de las coordenadas (definidos junto a la geometría).
+from cache_geometria import RUTA_GEOJSON, CENTRO_MAPA, DECIMALES_COORDENADAS
+
+# Parámetros fijos del mapa.
+ZOOM_INICIAL = 8.5
+ESTILO_MAPA = "carto-positron"                     # Estilo del mapa base (minimalista).
+ESCALA_COLORES = "YlOrRd"                          # Escala de colores (Amarillo -> Naranja -> Rojo).
+
+# Número máximo de figuras guardadas en la caché de cada proceso.
+# Con las vistas de la aplicación alcanza de sobra; el límite evita que la memoria crezca si los valores cambian mucho (ej. con filtros).
+MAX_FIGURAS_EN_CACHE = 32
+
+
+@lru_cache(maxsize=16)
+def cargar_geometria(ruta=RUTA_GEOJSON, tolerancia=0.0):
+    """Prepara la geometría una sola vez y devuelve (geojson_minimo, nombres_distritos).
+
+    La geometría se lee desde la caché binaria (cache_geometria.py), sin interpretar el texto del GeoJSON.
+    'tolerancia' elige el nivel de detalle (0.0 = geometría original); los nombres no cambian entre niveles.
+    El GeoJSON devuelto solo tiene lo que el navegador necesita para dibujar: un 'id' numérico
+    por distrito (su posición en el archivo) y las coordenadas redondeadas. Los nombres se
+    devuelven aparte, estandarizados en mayúsculas y sin espacios, en el mismo orden que los ids.
+    """
+    geometria = cache_geometria.cargar(ruta, tolerancia)
+    return geometria.geojson(DECIMALES_COORDENADAS), geometria.nombres
+
+
+def _escala_discreta(colores):
+    # Escala por tramos: cada categoría ocupa un tramo del mismo ancho pintado con un solo color.
+    n = len(colores)
+    return [[posicion, color] for i, color in enumerate(colores) for posicion in (i / n, (i + 1) / n)]
+
+
+@lru_cache(maxsize=MAX_FIGURAS_EN_CACHE)
+def figura_vista(titulo, valores, zoom=ZOOM_INICIAL, ruta=RUTA_GEOJSON, categorias=None):
+    """Devuelve la figura del mapa para una vista.
+
+    'valores' es una tupla con un valor por distrito, en el mismo orden que cargar_geometria(ruta).
+    Se usa una tupla (y no una lista o una Serie) para que pueda ser la llave de la caché: si los
+    valores de una vista no cambian, la figura se reutiliza tal cual.
+    Con 'zoom' se elige el nivel de detalle de los polígonos: con el mapa alejado se envían
+    polígonos simplificados (menos coordenadas), y con el mapa cercano la geometría original.
+    Con 'categorias' (tupla de pares (etiqueta, color)) la vista es categórica: cada valor es la posición
+    de su categoría, el mapa usa un color fijo por categoría y la leyenda y el hover muestran las etiquetas.
+    """
+    geojson, nombres = cargar_geometria(ruta, cache_geometria.tolerancia_para_zoom(zoom))
+
+    if categorias is None:
+        escala = {"colorscale": ESCALA_COLORES, "hovertemplate": "<b>%{text}</b><br>" + titulo + ": %{z:.2f}<extra></extra>"}
+    else:
+        etiquetas = [etiqueta for etiqueta, _ in categorias]
+        escala = {
+            "colorscale": _escala_discreta([color for _, color in categorias]),
+            "zmin": -0.5, "zmax": len(categorias) - 0.5,   # Cada código entero cae en el centro de su tramo.
+            "colorbar_tickvals": list(range(len(categorias))),
+            "colorbar_ticktext": etiquetas,
+            "customdata": [etiquetas[int(valor)] for valor in valores],
+            "hovertemplate": "<b>%{text}</b><br>" + titulo + ": %{customdata}<extra></extra>",
+        }
+
+    trazo = go.Choroplethmap(
+        geojson=geojson,                      # Siempre el mismo objeto de geometría (se lee una sola vez).
+        locations=list(range(len(nombres))),  # Cada valor se asocia al 'id' del distrito en el GeoJSON.
+        z=list(valores),                      # Lo único que cambia entre vistas: el color de cada distrito.
+        text=list(nombres),                   # Nombre que se muestra como título al pasar el mouse.
+        marker_opacity=0.7,                   # Transparencia de los colores.
+        colorbar_title_text=titulo,           # Etiqueta para la leyenda de colores.
+        **escala,
+    )
+    fig = go.Figure(trazo)
+    fig.update_layout(
+        map_style=ESTILO_MAPA,
+        map_center=CENTRO_MAPA,
+        map_zoom=zoom,
+        margin={"r": 0, "t": 40, "l": 0, "b": 0},  # Para que el mapa ocupe todo el espacio posible.
+    )
+    return fig
+
+
+def valores_en_orden(df, columna, ruta=RUTA_GEOJSON):
+    """Extrae una columna de 'df' (indexado por nombre de distrito) en el orden del GeoJSON, como tupla."""
+    # Solo se necesitan los nombres: se leen de la caché binaria sin armar el GeoJSON de la geometría original.
+    nombres = cache_geometria.cargar(ruta).nombres
+    # Los distritos sin dato quedan en 0, igual que en load_and_process_data().
+    return tuple(float(valor) for valor in df[columna].reindex(list(nombres)).fillna(0))
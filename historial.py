@@ -0,0 +1,281 @@
+# ==============================================================================
+# HISTORIAL DE DAÑOS POR EVENTO SÍSMICO CON SUMAS ACUMULADAS
+# ==============================================================================
+# damnificados_2000 y viviendas_destruidas_2000 (datos.py) resumen 25 años de sismos en un solo número
+# por distrito. Este módulo guarda en cambio una tabla con un registro por evento y, a partir de ella,
+# una matriz de sumas acumuladas por año para cada distrito:
+#     acumulado[d, k] = total del distrito d desde anio_inicio hasta el año anio_inicio + k - 1
+# Así, el total de cualquier rango de años sale de una resta (acumulado[:, fin] - acumulado[:, inicio]),
+# sin volver a recorrer los eventos. Al agregar un evento nuevo solo se suman sus valores a las
+# columnas de los años siguientes.
+#
+# El historial se lee de un CSV con las columnas: distrito, fecha (AAAA-MM-DD), damnificados, viviendas_destruidas.
+# Los eventos nuevos se agregan al final del CSV (guardar_evento o el comando 'agregar'). Un historial ya
+# cargado los incorpora con actualizar(): si el archivo es el mismo contenido ya leído más filas al final
+# (se comprueba con el hash de los bytes ya leídos), lee solo las filas nuevas y las suma con agregar_evento(),
+# sin reconstruir la matriz. Cualquier otro cambio (una fila corregida a mano, un archivo reemplazado) vuelve a
+# construir todo desde el archivo. Así los demás procesos del servidor ven los eventos registrados en cualquiera de ellos.
+#
+# Uso desde la terminal (desde la carpeta principal del repositorio):
+#     python historial.py consultar 2007 2010
+#     python historial.py agregar "VILLA EL SALVADOR" 2024-05-31 12 3
+
+import argparse
+import csv
+import datetime
+import hashlib
+import io
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Archivo por defecto con el historial de eventos.
+RUTA_HISTORIAL = 'historial_sismos.csv'
+
+# Primer año del historial (los datos de la aplicación cubren desde el año 2000).
+ANIO_INICIO = 2000
+
+# Columnas con valores que se suman por distrito.
+METRICAS = ('damnificados', 'viviendas_destruidas')
+
+# Columnas del CSV, en el orden en que guardar_evento() las escribe.
+COLUMNAS = ('distrito', 'fecha', *METRICAS)
+
+
+class HistorialDanos:
+    """Eventos de daño por distrito y sumas acumuladas por año para consultas de rangos en O(1)."""
+
+    def __init__(self, distritos, anio_inicio=ANIO_INICIO, anio_fin=None):
+        self.distritos = tuple(distritos)
+        self._posicion = {distrito: i for i, distrito in enumerate(self.distritos)}
+        self.anio_inicio = anio_inicio
+        # Archivo de origen; bytes ya leídos y su hash; tamaño, fecha de modificación e inodo vistos (para actualizar()).
+        self.ruta = None
+        self._leido = None
+        self._firma = None
+        self._columnas = None
+        # El mismo historial se comparte entre las sesiones de un proceso: las actualizaciones no se mezclan.
+        self._candado = threading.Lock()
+        self._reiniciar(anio_fin)
+
+    def _reiniciar(self, anio_fin):
+        # Historial vacío entre anio_inicio y anio_fin (por defecto, el año actual).
+        self.anio_fin = anio_fin if anio_fin is not None else datetime.date.today().year
+        n_anios = self.anio_fin - self.anio_inicio + 1
+        # Una matriz (distritos x años + 1) por métrica; la primera columna es siempre 0.
+        self.acumulado = {metrica: np.zeros((len(self.distritos), n_anios + 1)) for metrica in METRICAS}
+        self.eventos = []
+        # Filas ignoradas (distrito desconocido, fecha inválida o fuera de anio_inicio .. anio_fin).
+        self.descartados = 0
+
+    @classmethod
+    def desde_eventos(cls, eventos, distritos, anio_inicio=ANIO_INICIO, anio_fin=None):
+        """Construye el historial desde un DataFrame de eventos, de una sola vez (sin recorrerlos uno por uno)."""
+        historial = cls(distritos, anio_inicio, anio_fin)
+        historial._cargar_eventos(eventos, anio_fin)
+        return historial
+
+    def _cargar_eventos(self, eventos, anio_fin=None):
+        # Reemplaza todo el contenido por estos eventos. Si no se indica anio_fin, llega hasta el evento más reciente.
+        anios = pd.to_datetime(eventos['fecha'], errors='coerce').dt.year.to_numpy(dtype=float)
+        if anio_fin is None and not np.isnan(anios).all():
+            anio_fin = max(int(np.nanmax(anios)), datetime.date.today().year)
+        self._reiniciar(anio_fin)
+
+        nombres = eventos['distrito'].astype(str).str.upper().str.strip()
+        fila = nombres.map(self._posicion).to_numpy()
+        # Los eventos posteriores a anio_fin se descartan: caerían en la fila del distrito siguiente.
+        validos = ~pd.isna(fila) & (anios >= self.anio_inicio) & (anios <= self.anio_fin)
+        fila = fila[validos].astype(np.int64)
+        columna = anios[validos].astype(np.int64) - self.anio_inicio
+
+        n_anios = self.anio_fin - self.anio_inicio + 1
+        for metrica in METRICAS:
+            valores = eventos[metrica].fillna(0).to_numpy(dtype=float)[validos]
+            # Total por (distrito, año) y luego suma acumulada a lo largo de los años.
+            por_anio = np.bincount(fila * n_anios + columna, weights=valores, minlength=len(self.distritos) * n_anios)
+            self.acumulado[metrica][:, 1:] = np.cumsum(por_anio.reshape(len(self.distritos), n_anios), axis=1)
+
+        self.eventos = eventos[validos].to_dict('records')
+        self.descartados = int((~validos).sum())
+
+    def totales_cubren(self, totales):
+        """True si el historial completo suma al menos 'totales' ({métrica: arreglo por distrito}) en cada distrito."""
+        completo = self.consultar(self.anio_inicio, self.anio_fin)
+        return all((completo[metrica] >= np.asarray(totales[metrica], dtype=float)).all() for metrica in METRICAS)
+
+    def _columna(self, anio):
+        # Posición en la matriz acumulada del total hasta el año 'anio' (inclusive), limitada al rango disponible.
+        return int(np.clip(anio - self.anio_inicio + 1, 0, self.anio_fin - self.anio_inicio + 1))
+
+    def consultar(self, anio_desde, anio_hasta):
+        """Totales por distrito entre anio_desde y anio_hasta (ambos inclusive): {métrica: arreglo (distritos,)}."""
+        inicio, fin = self._columna(anio_desde - 1), self._columna(anio_hasta)
+        return {metrica: acumulado[:, fin] - acumulado[:, inicio] for metrica, acumulado in self.acumulado.items()}
+
+    def tabla(self, anio_desde, anio_hasta):
+        """Lo mismo que consultar(), como DataFrame indexado por distrito."""
+        return pd.DataFrame(self.consultar(anio_desde, anio_hasta), index=pd.Index(self.distritos, name='distrito'))
+
+    def agregar_evento(self, distrito, fecha, damnificados=0, viviendas_destruidas=0):
+        """Registra un evento y actualiza las sumas acumuladas de ese distrito (solo los años desde el evento)."""
+        distrito = str(distrito).upper().strip()
+        if distrito not in self._posicion:
+            raise ValueError(f"Distrito desconocido: {distrito}")
+        fecha = pd.Timestamp(fecha)
+        if pd.isna(fecha):
+            raise ValueError("El evento no tiene fecha.")
+        anio = fecha.year
+        if anio < self.anio_inicio:
+            raise ValueError(f"El historial empieza en {self.anio_inicio}; el evento es de {anio}.")
+        if anio > self.anio_fin:
+            # Se agregan columnas para los años nuevos, repitiendo el último total acumulado.
+            extra = anio - self.anio_fin
+            for metrica, acumulado in self.acumulado.items():
+                self.acumulado[metrica] = np.hstack([acumulado, np.repeat(acumulado[:, -1:], extra, axis=1)])
+            self.anio_fin = anio
+
+        fila, desde = self._posicion[distrito], self._columna(anio)
+        valores = {'damnificados': damnificados, 'viviendas_destruidas': viviendas_destruidas}
+        for metrica in METRICAS:
+            self.acumulado[metrica][fila, desde:] += valores[metrica]
+        self.eventos.append({'distrito': distrito, 'fecha': str(fecha.date()), **valores})
+
+    def actualizar(self):
+        """Incorpora los cambios del CSV desde la última lectura. Devuelve cuántos eventos se sumaron.
+
+        Si el archivo no cambió (mismo tamaño, fecha de modificación e inodo) no se lee nada. Si es el contenido
+        ya leído con filas nuevas al final, solo se suman esas filas; si no, se vuelve a construir todo.
+        """
+        if self.ruta is None:
+            return 0
+        with self._candado:
+            try:
+                estado = os.stat(self.ruta)
+            except FileNotFoundError:
+                return 0
+            firma = (estado.st_size, estado.st_mtime_ns, estado.st_ino)
+            if firma == self._firma:
+                return 0
+            with open(self.ruta, 'rb') as archivo:
+                contenido = archivo.read()
+
+            if self._leido is not None and self._columnas is not None and _solo_agregado(contenido, *self._leido):
+                # Solo filas completas: una fila a medio escribir se lee en la próxima actualización.
+                inicio = self._leido[0]
+                fin = inicio + contenido[inicio:].rfind(b'\n') + 1
+                nuevas, sin_leer = _leer_eventos(contenido[inicio:fin], self._columnas)
+                self.descartados += sin_leer
+                sumados = 0
+                for evento in nuevas.to_dict('records'):
+                    try:
+                        self.agregar_evento(evento['distrito'], evento['fecha'],
+                                            *(0 if pd.isna(evento[m]) else evento[m] for m in METRICAS))
+                        sumados += 1
+                    except ValueError:
+                        self.descartados += 1
+            else:
+                fin = len(contenido)
+                eventos, sin_leer = _leer_eventos(contenido)
+                # Sin encabezado válido no se sabe qué es cada columna: cada cambio vuelve a leer el archivo completo.
+                self._columnas = None if sin_leer else list(eventos.columns)
+                self._cargar_eventos(eventos)
+                self.descartados += sin_leer
+                sumados = len(self.eventos)
+            self._leido = (fin, _hash(contenido[:fin]))
+            self._firma = firma
+            return sumados
+
+
+def _hash(contenido):
+    return hashlib.blake2b(contenido, digest_size=16).digest()
+
+
+def _solo_agregado(contenido, leidos, hash_leido):
+    # True si 'contenido' empieza con los bytes ya leídos (no vacíos y terminados en una fila completa).
+    return (0 < leidos <= len(contenido) and contenido[leidos - 1:leidos] == b'\n'
+            and _hash(contenido[:leidos]) == hash_leido)
+
+
+def _leer_eventos(contenido, columnas=None):
+    """DataFrame de eventos de un trozo del CSV y número de filas que no se pudieron leer.
+
+    Con 'columnas', el trozo no tiene encabezado (filas agregadas al final). Un archivo vacío es un historial
+    vacío; uno sin las columnas distrito y fecha en el encabezado se ignora completo.
+    """
+    vacio = pd.DataFrame(columns=list(COLUMNAS))
+    try:
+        eventos = pd.read_csv(io.BytesIO(contenido), header=None if columnas else 'infer', names=columnas,
+                              skip_blank_lines=True)
+    except pd.errors.EmptyDataError:
+        return vacio, 0
+    if not {'distrito', 'fecha'} <= set(eventos.columns):
+        return vacio, len(eventos) + 1  # Sin encabezado: la primera fila se leyó como nombres de columnas.
+    for metrica in METRICAS:
+        if metrica not in eventos.columns:
+            eventos[metrica] = 0
+    return eventos, 0
+
+
+def cargar_historial(distritos, ruta=RUTA_HISTORIAL, anio_inicio=ANIO_INICIO):
+    """HistorialDanos leído desde el CSV, o None si el archivo no existe. Un archivo vacío es un historial vacío."""
+    if not os.path.exists(ruta):
+        return None
+    historial = HistorialDanos(distritos, anio_inicio)
+    historial.ruta = ruta
+    historial.actualizar()
+    return historial
+
+
+def guardar_evento(ruta, distrito, fecha, damnificados, viviendas_destruidas):
+    """Agrega una fila al CSV del historial (lo crea con encabezados si no existe o está vacío)."""
+    nuevo = not os.path.exists(ruta) or os.path.getsize(ruta) == 0
+    sin_salto_final = False
+    if not nuevo:
+        # Un archivo editado a mano puede no terminar en salto de línea: la fila nueva no debe pegarse a la última.
+        with open(ruta, 'rb') as archivo:
+            archivo.seek(-1, os.SEEK_END)
+            sin_salto_final = archivo.read(1) != b'\n'
+    with open(ruta, 'a', newline='', encoding='utf-8') as archivo:
+        escritor = csv.writer(archivo)
+        if nuevo:
+            escritor.writerow(COLUMNAS)
+        elif sin_salto_final:
+            archivo.write('\r\n')
+        escritor.writerow([str(distrito).upper().strip(), str(pd.Timestamp(fecha).date()), damnificados, viviendas_destruidas])
+
+
+if __name__ == '__main__':
+    from datos import poblacion
+
+    parser = argparse.ArgumentParser(description="Historial de daños por evento sísmico.")
+    parser.add_argument('--archivo', default=RUTA_HISTORIAL)
+    subcomandos = parser.add_subparsers(dest='comando', required=True)
+    consulta = subcomandos.add_parser('consultar', help="Totales por distrito en un rango de años.")
+    consulta.add_argument('desde', type=int)
+    consulta.add_argument('hasta', type=int)
+    nuevo_evento = subcomandos.add_parser('agregar', help="Agrega un evento al historial.")
+    nuevo_evento.add_argument('distrito')
+    nuevo_evento.add_argument('fecha')
+    nuevo_evento.add_argument('damnificados', type=int)
+    nuevo_evento.add_argument('viviendas_destruidas', type=int)
+    args = parser.parse_args()
+
+    distritos = sorted(poblacion)
+    if args.comando == 'agregar':
+        if str(args.distrito).upper().strip() not in distritos:
+            parser.error(f"Distrito desconocido: {args.distrito}")
+        if pd.Timestamp(args.fecha).year < ANIO_INICIO:
+            parser.error(f"El historial empieza en {ANIO_INICIO}.")
+        guardar_evento(args.archivo, args.distrito, args.fecha, args.damnificados, args.viviendas_destruidas)
+        print(f"Evento agregado a {args.archivo}.")
+    else:
+        historial = cargar_historial(distritos, args.archivo)
+        if historial is None:
+            parser.error(f"No existe el archivo {args.archivo}")
+        tabla = historial.tabla(args.desde, args.hasta)
+        print(tabla[tabla.sum(axis=1) > 0].sort_values('damnificados', ascending=False).to_string())
+        if historial.descartados:
+            print(f"{historial.descartados} filas ignoradas (distrito desconocido, fecha inválida o anterior a {ANIO_INICIO}).")
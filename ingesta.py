@@ -0,0 +1,159 @@
+# ==============================================================================
+# INGESTA DE INVENTARIOS GEORREFERENCIADOS (EDIFICACIONES, INCIDENTES)
+# ==============================================================================
+# Los totales por distrito de datos.py (material precario, damnificados, viviendas destruidas) se
+# ingresaron a mano. Con inventarios reales (cientos de miles de puntos con longitud y latitud) hay que
+# asignar cada punto a su distrito y sumar. Este módulo:
+#   1. Construye un índice espacial STRtree sobre los polígonos de los distritos (una sola vez).
+#   2. Lee el archivo CSV o Parquet por bloques, sin cargarlo entero en memoria.
+#   3. Asigna cada bloque de puntos con una consulta vectorizada al índice y una prueba punto-en-polígono vectorizada
+#      (los puntos sobre un borde también se asignan).
+#   4. Suma por distrito (conteo de registros y columnas numéricas) con np.bincount.
+# El resultado se puede pasar directamente al motor del índice de riesgo (motor_riesgo.py).
+#
+# Uso desde la terminal (desde la carpeta principal del repositorio):
+#     python ingesta.py edificaciones.csv --indicador material_precario=registros
+#     python ingesta.py incidentes.parquet --sumar damnificados viviendas --indicador damnificados=damnificados
+
+import argparse
+import os
+import time
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import shapely
+
+import cache_geometria
+from cache_geometria import RUTA_GEOJSON
+
+# Número de filas que se leen y asignan a la vez.
+FILAS_POR_BLOQUE = 200_000
+
+# Valor de asignación para los puntos que no caen dentro de ningún distrito.
+SIN_DISTRITO = -1
+
+
+class IndiceDistritos:
+    """Índice espacial (STRtree) sobre los polígonos de los distritos, en el orden del GeoJSON."""
+
+    def __init__(self, nombres, poligonos):
+        self.nombres = tuple(nombres)
+        self.poligonos = poligonos
+        self.arbol = shapely.STRtree(poligonos)
+        # Prepara los polígonos para que las pruebas de punto-en-polígono sean más rápidas.
+        shapely.prepare(poligonos)
+
+    @classmethod
+    def desde_geojson(cls, ruta=RUTA_GEOJSON):
+        geometria = cache_geometria.cargar(ruta)
+        return cls(geometria.nombres, geometria.poligonos_shapely())
+
+    def asignar(self, longitud, latitud):
+        """Posición del distrito de cada punto (SIN_DISTRITO si no cae en ninguno)."""
+        longitud = np.asarray(longitud, dtype=float)
+        latitud = np.asarray(latitud, dtype=float)
+        # 1) El índice devuelve pares candidatos (posición del punto, posición del distrito) cuyos rectángulos se tocan.
+        punto, distrito = self.arbol.query(shapely.points(longitud, latitud))
+        # 2) Solo se conservan los pares donde el punto está dentro del polígono (ya preparado) o sobre su borde.
+        #    Se usa intersects_xy y no contains_xy, porque contains_xy descarta los puntos sobre el borde.
+        dentro = shapely.intersects_xy(self.poligonos[distrito], longitud[punto], latitud[punto])
+        punto, distrito = punto[dentro], distrito[dentro]
+        # Un punto justo sobre un borde compartido toca dos distritos: se queda con el de menor posición en el GeoJSON.
+        # np.minimum.at acumula el mínimo de los pares repetidos (una asignación con índices repetidos no garantiza
+        # cuál escritura queda). Los puntos sin ningún par conservan el valor inicial y pasan a SIN_DISTRITO.
+        sin_asignar = len(self.nombres)
+        asignacion = np.full(len(longitud), sin_asignar, dtype=np.int64)
+        np.minimum.at(asignacion, punto, distrito)
+        asignacion[asignacion == sin_asignar] = SIN_DISTRITO
+        return asignacion
+
+
+def leer_por_bloques(ruta, columnas, filas_por_bloque=FILAS_POR_BLOQUE):
+    """Genera DataFrames con las 'columnas' pedidas, de a 'filas_por_bloque' filas, desde un CSV o un Parquet."""
+    if ruta.lower().endswith(('.parquet', '.pq')):
+        import pyarrow.parquet as pq     # Dependencia opcional: solo se necesita para leer Parquet.
+        for lote in pq.ParquetFile(ruta).iter_batches(batch_size=filas_por_bloque, columns=list(columnas)):
+            yield lote.to_pandas()
+    else:
+        yield from pd.read_csv(ruta, usecols=list(columnas), chunksize=filas_por_bloque)
+
+
+def agregar_archivo(ruta, indice, columna_lon='lon', columna_lat='lat', columnas_suma=(), filas_por_bloque=FILAS_POR_BLOQUE):
+    """Asigna todos los puntos del archivo a los distritos y devuelve (agregados, estadisticas).
+
+    - agregados: DataFrame indexado por distrito con la columna 'registros' (número de puntos) y
+      la suma de cada columna de 'columnas_suma'.
+    - estadisticas: puntos leídos, puntos sin distrito, segundos y puntos por segundo.
+    """
+    n_distritos = len(indice.nombres)
+    conteo = np.zeros(n_distritos, dtype=np.int64)
+    sumas = {columna: np.zeros(n_distritos) for columna in columnas_suma}
+    puntos = sin_distrito = 0
+
+    inicio = time.perf_counter()
+    for bloque in leer_por_bloques(ruta, [columna_lon, columna_lat, *columnas_suma], filas_por_bloque):
+        asignacion = indice.asignar(bloque[columna_lon].to_numpy(), bloque[columna_lat].to_numpy())
+        dentro = asignacion != SIN_DISTRITO
+        conteo += np.bincount(asignacion[dentro], minlength=n_distritos)
+        for columna in columnas_suma:
+            valores = bloque[columna].to_numpy(dtype=float)[dentro]
+            sumas[columna] += np.bincount(asignacion[dentro], weights=np.nan_to_num(valores), minlength=n_distritos)
+        puntos += len(bloque)
+        sin_distrito += int((~dentro).sum())
+    segundos = time.perf_counter() - inicio
+
+    agregados = pd.DataFrame({'registros': conteo, **sumas}, index=pd.Index(indice.nombres, name='distrito'))
+    estadisticas = {
+        'puntos': puntos,
+        'sin_distrito': sin_distrito,
+        'segundos': segundos,
+        'puntos_por_segundo': puntos / segundos if segundos > 0 else float('inf'),
+    }
+    return agregados, estadisticas
+
+
+def aplicar_a_motor(motor, agregados, indicadores):
+    """Devuelve un motor con los indicadores reemplazados por columnas de 'agregados'.
+
+    'indicadores' es un diccionario {indicador del motor: columna de agregados}, por ejemplo
+    {'material_precario': 'registros'}.
+    """
+    for indicador, columna in indicadores.items():
+        motor = motor.con_indicador(indicador, agregados[columna])
+    return motor
+
+
+@lru_cache(maxsize=1)
+def _indice_por_defecto():
+    return IndiceDistritos.desde_geojson()
+
+
+if __name__ == '__main__':
+    from datos import poblacion, area, peligrosidad_suelos, material_precario, damnificados_2000, viviendas_destruidas_2000
+    from motor_riesgo import MotorRiesgo
+
+    parser = argparse.ArgumentParser(description="Asigna puntos de un CSV/Parquet a los distritos y agrega por distrito.")
+    parser.add_argument('archivo')
+    parser.add_argument('--lon', default='lon', help="Columna con la longitud.")
+    parser.add_argument('--lat', default='lat', help="Columna con la latitud.")
+    parser.add_argument('--sumar', nargs='*', default=[], help="Columnas numéricas a sumar por distrito.")
+    parser.add_argument('--indicador', nargs='*', default=[], metavar='INDICADOR=COLUMNA',
+                        help="Reemplaza un indicador del índice de riesgo por una columna agregada.")
+    parser.add_argument('--filas-por-bloque', type=int, default=FILAS_POR_BLOQUE)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.archivo):
+        parser.error(f"No existe el archivo {args.archivo}")
+
+    agregados, estadisticas = agregar_archivo(args.archivo, _indice_por_defecto(), args.lon, args.lat, args.sumar, args.filas_por_bloque)
+    print(agregados.sort_values('registros', ascending=False).to_string())
+    print(f"\n{estadisticas['puntos']:,} puntos ({estadisticas['sin_distrito']:,} fuera de los distritos) "
+          f"en {estadisticas['segundos']:.2f} s: {estadisticas['puntos_por_segundo']:,.0f} puntos/s")
+
+    if args.indicador:
+        motor = MotorRiesgo.desde_datos(poblacion, area, peligrosidad_suelos, material_precario, damnificados_2000, viviendas_destruidas_2000)
+        motor = aplicar_a_motor(motor, agregados, dict(par.split('=', 1) for par in args.indicador))
+        riesgo = pd.Series(motor.indice(), index=pd.Index(motor.distritos, name='distrito'), name='riesgo_combinado')
+        print("\nRiesgo Combinado con el inventario:")
+        print(riesgo.sort_values(ascending=False).head(10).round(2).to_string())
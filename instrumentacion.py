@@ -0,0 +1,98 @@
+# ==============================================================================
+# INSTRUMENTACIÓN: TIEMPO Y MEMORIA POR ETAPA
+# ==============================================================================
+# Para saber en qué se va el tiempo de una ejecución del script, cada etapa importante (carga de la
+# geometría, construcción del motor y normalización, unión de tablas, construcción y serialización
+# de la figura) se envuelve en:
+#     with instrumentacion.etapa('nombre de la etapa'):
+#         ...
+# Cada etapa guarda su duración y, si se activó la medición de memoria, el pico de memoria de Python
+# (tracemalloc) que usó por encima de lo que ya había al empezar. Las etapas pueden ir una dentro de otra.
+#
+# El registro es uno por hilo: Streamlit ejecuta cada sesión en su propio hilo, así que las etapas
+# de dos usuarios no se mezclan. Si no se llamó a iniciar(), etapa() no hace nada.
+# La memoria, en cambio, no se puede separar por hilo: tracemalloc cuenta todo el proceso y tiene un solo
+# pico, que reset_peak() reinicia para todos. Por eso, con la medición de memoria activada, las etapas de
+# primer nivel de distintos hilos se ejecutan una a la vez (_candado_memoria); sin ella no hay espera.
+# Aun así, lo que otros hilos reservan o liberan fuera de una etapa se cuenta en la etapa que esté abierta.
+
+import json
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import pandas as pd
+
+_local = threading.local()
+
+# Lo toma la etapa de primer nivel mientras mide memoria (reentrante, por las etapas anidadas del mismo hilo).
+_candado_memoria = threading.RLock()
+
+
+class RegistroEtapas:
+    """Lista de etapas medidas en una ejecución: nombre, segundos, pico de memoria y datos extra."""
+
+    def __init__(self, medir_memoria=False):
+        self.medir_memoria = medir_memoria
+        self.etapas = []
+        self._pila = []  # Picos de memoria de las etapas abiertas (para que una etapa anidada no borre el pico de la externa).
+        if medir_memoria and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def etapa(self, nombre, **extra):
+        registro = {'etapa': nombre, 'nivel': len(self._pila), **extra}
+        if self.medir_memoria:
+            _candado_memoria.acquire()
+            actual, pico = tracemalloc.get_traced_memory()
+            if self._pila:
+                self._pila[-1] = max(self._pila[-1], pico)
+            tracemalloc.reset_peak()
+            self._pila.append(actual)
+            registro['memoria_inicial'] = actual
+        else:
+            self._pila.append(0)
+        self.etapas.append(registro)
+        inicio = time.perf_counter()
+        try:
+            yield registro
+        finally:
+            registro['segundos'] = time.perf_counter() - inicio
+            pico_etapa = self._pila.pop()
+            if self.medir_memoria:
+                pico_etapa = max(pico_etapa, tracemalloc.get_traced_memory()[1])
+                registro['pico_memoria_bytes'] = pico_etapa - registro.pop('memoria_inicial')
+                if self._pila:
+                    self._pila[-1] = max(self._pila[-1], pico_etapa)
+                _candado_memoria.release()
+
+    def tabla(self):
+        """DataFrame con una fila por etapa, en el orden en que empezaron."""
+        return pd.DataFrame(self.etapas)
+
+    def a_json(self, **contexto):
+        """Texto JSON con las etapas (y datos de 'contexto', ej. la vista elegida), para guardar o comparar."""
+        return json.dumps({**contexto, 'memoria_medida': self.medir_memoria, 'etapas': self.etapas}, ensure_ascii=False, default=str)
+
+
+def iniciar(medir_memoria=False):
+    """Empieza un registro nuevo para este hilo y lo devuelve."""
+    _local.registro = RegistroEtapas(medir_memoria)
+    return _local.registro
+
+
+def registro_actual():
+    """Registro de este hilo, o None si no se llamó a iniciar()."""
+    return getattr(_local, 'registro', None)
+
+
+@contextmanager
+def etapa(nombre, **extra):
+    """Mide una etapa en el registro de este hilo (no hace nada si no hay registro)."""
+    registro = registro_actual()
+    if registro is None:
+        yield {}
+    else:
+        with registro.etapa(nombre, **extra) as medicion:
+            yield medicion
@@ -0,0 +1,161 @@
+# ==============================================================================
+# MOTOR DEL ÍNDICE DE RIESGO COMBINADO
+# ==============================================================================
+# Guarda todos los indicadores en una sola matriz de NumPy (distritos x indicadores), alineada a un
+# índice canónico de distritos. Así el índice de riesgo se calcula con una multiplicación de matrices
+# en vez de convertir diccionarios en DataFrames y unirlos con pd.merge() cada vez.
+#
+# Los pesos pueden ser un solo vector (un índice de riesgo) o un lote de K vectores (K índices a la vez).
+# La misma clase sirve para 50 distritos o para decenas de miles de manzanas: solo cambia el número de filas.
+
+import numpy as np                   # Para los cálculos vectorizados con matrices.
+import pandas as pd                  # Para entregar los resultados como DataFrame.
+
+# Indicadores que forman el Riesgo Combinado, en el orden de las columnas de la matriz.
+INDICADORES = ('peligrosidad', 'densidad', 'material_precario', 'damnificados', 'viviendas_destruidas')
+
+# El índice se multiplica por 10 para tener una escala más intuitiva (de 0 a 10).
+ESCALA_INDICE = 10
+
+
+def normalizar_min_max(matriz):
+    """Normaliza cada columna (última dimensión = indicadores) a la escala de 0 a 1.
+
+    Funciona con una matriz (distritos x indicadores) o con un lote (K x distritos x indicadores).
+    Los valores faltantes (NaN) se mantienen como NaN. Si una columna tiene todos sus valores
+    iguales, se normaliza a 0 para evitar la división por cero.
+    """
+    minimo = np.nanmin(matriz, axis=-2, keepdims=True)
+    maximo = np.nanmax(matriz, axis=-2, keepdims=True)
+    rango = maximo - minimo
+    rango_seguro = np.where(rango > 0, rango, 1.0)
+    return np.where(rango > 0, (matriz - minimo) / rango_seguro, np.where(np.isnan(matriz), np.nan, 0.0))
+
+
+def indice_ponderado(normalizada, pesos):
+    """Promedio ponderado de los indicadores normalizados, multiplicado por ESCALA_INDICE.
+
+    'pesos' tiene forma (indicadores,) o (K, indicadores). Si 'normalizada' es un lote de matrices
+    (K x distritos x indicadores), cada matriz se combina con su propio vector de pesos.
+    Si un distrito no tiene dato en algún indicador, ese indicador se ignora para ese distrito y
+    los demás pesos se reparten el total, igual que .mean(axis=1) de pandas ignora los NaN.
+    """
+    faltantes = np.isnan(normalizada)
+    valores = np.where(faltantes, 0.0, normalizada)
+    presentes = (~faltantes).astype(float)
+
+    pesos = np.asarray(pesos, dtype=float)
+    if normalizada.ndim == 3:
+        # Lote de matrices: la matriz k se combina con el vector de pesos k. Resultado (K, distritos).
+        numerador = np.einsum('kdi,ki->kd', valores, pesos)
+        denominador = np.einsum('kdi,ki->kd', presentes, pesos)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(denominador > 0, numerador / denominador, np.nan) * ESCALA_INDICE
+
+    numerador = valores @ pesos.T        # (distritos,) o (distritos, K)
+    denominador = presentes @ pesos.T
+    with np.errstate(invalid='ignore', divide='ignore'):
+        indice = np.where(denominador > 0, numerador / denominador, np.nan) * ESCALA_INDICE
+    # Para un lote de pesos se devuelve (K, distritos): una fila por cada vector de pesos.
+    return indice.T if pesos.ndim == 2 else indice
+
+
+class MotorRiesgo:
+    """Matriz de indicadores por distrito y cálculo vectorizado del índice de riesgo.
+
+    - distritos: nombres en mayúsculas y sin espacios; definen el orden de las filas.
+    - indicadores: nombres de las columnas de la matriz.
+    - matriz: arreglo (distritos x indicadores) con los valores brutos (NaN = sin dato).
+    """
+
+    def __init__(self, distritos, indicadores, matriz):
+        self.distritos = tuple(distritos)
+        self.indicadores = tuple(indicadores)
+        self.matriz = np.asarray(matriz, dtype=float)
+        if self.matriz.shape != (len(self.distritos), len(self.indicadores)):
+            raise ValueError(
+                f"La matriz tiene forma {self.matriz.shape}, pero se esperaba "
+                f"({len(self.distritos)}, {len(self.indicadores)})."
+            )
+        # La normalización no depende de los pesos, así que se calcula una sola vez.
+        self.normalizada = normalizar_min_max(self.matriz)
+
+    @classmethod
+    def desde_datos(cls, poblacion_data, area_data, peligrosidad_data, material_data, damnificados_data, viviendas_data):
+        """Construye el motor a partir de los diccionarios de datos.py (mismas entradas que antes usaba load_and_process_data)."""
+        fuentes = (poblacion_data, area_data, peligrosidad_data, material_data, damnificados_data, viviendas_data)
+        # Índice canónico: todos los distritos que aparecen en algún diccionario, estandarizados y ordenados.
+        distritos = sorted({str(distrito).upper().strip() for fuente in fuentes for distrito in fuente})
+
+        def columna(diccionario):
+            # Alinea un diccionario al índice canónico; los distritos que faltan quedan como NaN.
+            estandarizado = {str(distrito).upper().strip(): valor for distrito, valor in diccionario.items()}
+            return np.array([estandarizado.get(distrito, np.nan) for distrito in distritos], dtype=float)
+
+        # Densidad poblacional (Población / Área), redondeada; sin área válida no hay densidad.
+        area_valida = columna(area_data)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            densidad = np.where(area_valida > 0, np.round(columna(poblacion_data) / area_valida), np.nan)
+
+        matriz = np.column_stack([
+            columna(peligrosidad_data),
+            densidad,
+            columna(material_data),
+            columna(damnificados_data),
+            columna(viviendas_data),
+        ])
+        return cls(distritos, INDICADORES, matriz)
+
+    @classmethod
+    def desde_dataframe(cls, df, columna_distrito, indicadores=INDICADORES):
+        """Construye el motor desde una tabla con una fila por unidad (distrito, manzana, etc.)."""
+        distritos = df[columna_distrito].astype(str).str.upper().str.strip()
+        return cls(distritos, indicadores, df[list(indicadores)].to_numpy(dtype=float))
+
+    def pesos_validos(self, pesos=None):
+        """Devuelve los pesos como arreglo (indicadores,) o (K, indicadores); por defecto, pesos iguales.
+
+        Los pesos no pueden ser negativos ni estar todos en 0 (en ningún vector del lote).
+        """
+        if pesos is None:
+            return np.ones(len(self.indicadores))
+        pesos = np.asarray(pesos, dtype=float)
+        if pesos.ndim not in (1, 2) or pesos.shape[-1] != len(self.indicadores):
+            raise ValueError(f"Se esperaban {len(self.indicadores)} pesos por vector, se recibió la forma {pesos.shape}.")
+        if np.any(pesos < 0):
+            raise ValueError("Los pesos no pueden ser negativos.")
+        if np.any(pesos.sum(axis=-1) == 0):
+            raise ValueError("Al menos un peso debe ser mayor que 0 (con todos en 0 el índice no está definido).")
+        return pesos
+
+    def indice(self, pesos=None):
+        """Índice de riesgo de 0 a 10: (distritos,) para un vector de pesos o (K, distritos) para un lote."""
+        return indice_ponderado(self.normalizada, self.pesos_validos(pesos))
+
+    def con_indicador(self, nombre, valores):
+        """Devuelve un motor nuevo con el indicador 'nombre' reemplazado (o agregado) por 'valores'.
+
+        'valores' puede ser un arreglo en el orden de self.distritos o un diccionario/Serie por distrito.
+        """
+        if isinstance(valores, (dict, pd.Series)):
+            valores = pd.Series(valores, dtype=float)
+            valores.index = valores.index.astype(str).str.upper().str.strip()
+            valores = valores.reindex(list(self.distritos)).to_numpy()
+        valores = np.asarray(valores, dtype=float)
+
+        matriz = self.matriz.copy()
+        indicadores = list(self.indicadores)
+        if nombre in indicadores:
+            matriz[:, indicadores.index(nombre)] = valores
+        else:
+            indicadores.append(nombre)
+            matriz = np.column_stack([matriz, valores])
+        return MotorRiesgo(self.distritos, indicadores, matriz)
+
+    def tabla(self, pesos=None):
+        """DataFrame indexado por distrito con los indicadores brutos, los normalizados y el riesgo_combinado."""
+        df = pd.DataFrame(self.matriz, index=pd.Index(self.distritos, name='distrito_data'), columns=self.indicadores)
+        for posicion, indicador in enumerate(self.indicadores):
+            df[f'norm_{indicador}'] = self.normalizada[:, posicion]
+        df['riesgo_combinado'] = self.indice(pesos)
+        return df
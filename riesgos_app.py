@@ -4,9 +4,19 @@
 # Se importan las librerías necesarias para el funcionamiento de la aplicación.
 
 import streamlit as st               # Para crear y correr la aplicación web interactiva.
-import geopandas as gpd              # Para leer y manipular datos geográficos (el archivo GeoJSON).
-import plotly.express as px          # Para crear los gráficos y mapas interactivos de alta calidad.
 import pandas as pd                  # Para la manipulación y análisis de datos en estructuras llamadas DataFrames.
+from figuras import ZOOM_INICIAL, figura_vista, valores_en_orden  # Capa que construye y guarda en caché las figuras del mapa.
+from motor_riesgo import MotorRiesgo  # Motor vectorizado del índice de riesgo combinado.
+import sensibilidad                  # Análisis de sensibilidad Monte Carlo del índice.
+import escenarios                    # Escenarios sísmicos: sacudimiento y daños esperados por distrito.
+import cache_geometria               # Geometría de los distritos en formato binario, sin geopandas.
+import cache_resultados              # Caché de resultados en disco, compartida entre procesos.
+import historial                     # Historial de daños por evento, con consultas por rango de años.
+import os                            # Para revisar si existe el archivo del historial de eventos.
+import datetime                      # Fecha mínima de los eventos que se registran en el historial.
+import instrumentacion               # Tiempo y memoria de cada etapa de la ejecución (panel de depuración).
+import vecindad                      # Grafo de vecindad entre distritos y puntos calientes (I de Moran / LISA).
+import numpy as np                   # Para guardar los resultados como arreglos en la caché en disco.
 
 # ==============================================================================
 # 2. CONFIGURACIÓN DE LA PÁGINA
@@ -16,6 +26,15 @@ import pandas as pd                  # Para la manipulación y análisis de dato
 # layout="wide" hace que la aplicación ocupe todo el ancho de la pantalla para una mejor visualización del mapa.
 st.set_page_config(layout="wide", page_title="Análisis de Riesgo Sísmico en Lima y Callao")
 
+# --- Instrumentación (modo de depuración) ---
+# Con ?debug=1 en la dirección, o con la variable de entorno RIESGOS_INSTRUMENTACION=1, se muestra un panel con
+# el tiempo de cada etapa de esta ejecución. Con RIESGOS_INSTRUMENTACION=memoria también se mide la memoria
+# (tracemalloc hace más lento todo el proceso, por eso no se activa desde la dirección).
+# Con RIESGOS_INSTRUMENTACION_ARCHIVO=ruta.jsonl cada ejecución agrega una línea JSON con sus mediciones.
+modo_instrumentacion = os.environ.get('RIESGOS_INSTRUMENTACION', '')
+modo_depuracion = modo_instrumentacion in ('1', 'memoria') or st.query_params.get('debug') == '1'
+instrumentacion.iniciar(medir_memoria=modo_instrumentacion == 'memoria')
+
 # --- Títulos y Descripción Principal ---
 # st.title() y st.markdown() se usan para mostrar texto en la aplicación con diferente formato.
 st.title("Análisis de Riesgo Sísmico en Lima Metropolitana y Callao 🗺️")
@@ -24,158 +43,78 @@ st.markdown("Visualización interactiva de diferentes variables de riesgo por di
 # ==============================================================================
 # 3. DICCIONARIOS DE DATOS
 # ==============================================================================
-# Aquí se almacenan todos los datos brutos en diccionarios de Python.
-# Cada diccionario representa una variable diferente.
-# Las claves (nombres de los distritos) están en mayúsculas y sin tildes para estandarizar y facilitar la unión de datos.
-# Todos los diccionarios fueron filtrados con anterioridad para centrarse en Lima Metropolitana y Callao. Además nos hemos centrado desde los 2000 hasta la actualidad. Y con la información del último censo de INEI del 2017.
-
-poblacion = {
-    'ANCON': 43400, 'ATE': 594529, 'BARRANCO': 36721, 'BRENA': 80912, 'CARABAYLLO': 360718, 'CHACLACAYO': 46225, 'CHORRILLOS': 342505, 'CIENEGUILLA': 34090, 'COMAS': 510828, 'EL AGUSTINO': 193319, 'INDEPENDENCIA': 227136, 'JESUS MARIA': 75359, 'LA MOLINA': 140679, 'LA VICTORIA': 192721, 'LIMA': 241783, 'LINCE': 58077, 'LOS OLIVOS': 326604, 'LURIGANCHO': 232730, 'LURIN': 83620, 'MAGDALENA DEL MAR': 60296, 'MIRAFLORES': 85065, 'PACHACAMAC': 90007, 'PUCUSANA': 13619, 'PUEBLO LIBRE': 82355, 'PUENTE PIEDRA': 234341, 'PUNTA HERMOSA': 15684, 'PUNTA NEGRA': 7702, 'RIMAC': 174789, 'SAN BARTOLO': 7746, 'SAN BORJA': 118490, 'SAN ISIDRO': 68966, 'SAN JUAN DE LURIGANCHO': 1038495, 'SAN JUAN DE MIRAFLORES': 404000, 'SAN LUIS': 58001, 'SAN MARTIN DE PORRES': 699492, 'SAN MIGUEL': 150367, 'SANTA ANITA': 205816, 'SANTA MARIA DEL MAR': 1294, 'SANTA ROSA': 15113, 'SANTIAGO DE SURCO': 354270, 'SURQUILLO': 92100, 'VILLA EL SALVADOR': 378472, 'VILLA MARIA DEL TRIUNFO': 398423,
-    'CALLAO': 477743, 'BELLAVISTA': 78936, 'CARMEN DE LA LEGUA REYNOSO': 48331, 'LA PERLA': 61698, 'LA PUNTA': 4014, 'VENTANILLA': 424467, 'MI PERU': 51522
-}
-area = {
-    'ANCON': 299, 'ATE': 78, 'BARRANCO': 3, 'BRENA': 3, 'CARABAYLLO': 347, 'CHACLACAYO': 39, 'CHORRILLOS': 38, 'CIENEGUILLA': 241, 'COMAS': 48, 'EL AGUSTINO': 13, 'INDEPENDENCIA': 15, 'JESUS MARIA': 5, 'LA MOLINA': 66, 'LA VICTORIA': 9, 'LIMA': 22, 'LINCE': 3, 'LOS OLIVOS': 19, 'LURIGANCHO': 236, 'LURIN': 181, 'MAGDALENA DEL MAR': 4, 'MIRAFLORES': 10, 'PACHACAMAC': 160, 'PUEBLO LIBRE': 5, 'PUCUSANA': 38, 'PUENTE PIEDRA': 71, 'PUNTA HERMOSA': 13, 'PUNTA NEGRA': 13, 'RIMAC': 12, 'SAN BARTOLO': 45, 'SAN BORJA': 10, 'SAN ISIDRO': 12, 'SAN JUAN DE LURIGANCHO': 131, 'SAN JUAN DE MIRAFLORES': 26, 'SAN LUIS': 4, 'SAN MARTIN DE PORRES': 41, 'SAN MIGUEL': 10, 'SANTA ANITA': 11, 'SANTA MARIA DEL MAR': 1, 'SANTA ROSA': 21, 'SANTIAGO DE SURCO': 35, 'SURQUILLO': 3, 'VILLA EL SALVADOR': 36, 'VILLA MARIA DEL TRIUNFO': 71,
-    'CALLAO': 47, 'BELLAVISTA': 5, 'CARMEN DE LA LEGUA REYNOSO': 2, 'LA PERLA': 3, 'LA PUNTA': 0.75, 'VENTANILLA': 74, 'MI PERU': 3
-}
-suelos = {
-    'ANCON': 'Mixto: Roca (S1) en cerros y Suelo Arenoso (S3) en pampas',
-    'ATE': 'Mixto: Conglomerado (S2) en el oeste, transita a Roca (S1) al este',
-    'BARRANCO': 'Suelo Rígido (Conglomerado S2)',
-    'BRENA': 'Suelo Rígido (Conglomerado S2)',
-    'CARABAYLLO': 'Mixto: Roca (S1) en laderas y Suelo Aluvial/Arenoso (S2-S3) en zonas bajas',
-    'CHACLACAYO': 'Suelo Muy Rígido (Roca S1 y grava densa)',
-    'CHORRILLOS': 'Mixto: Roca (S1 Morro Solar), Suelo Blando (S4 Pantanos), Conglomerado (S2 zona alta)',
-    'CIENEGUILLA': 'Suelo Muy Rígido (Roca S1 y grava densa)',
-    'COMAS': 'Mixto: Roca (S1) en laderas y Conglomerado (S2) en zonas planas',
-    'EL AGUSTINO': 'Mixto: Roca (S1) en laderas y suelos de menor calidad en zonas bajas',
-    'INDEPENDENCIA': 'Mixto: Roca (S1) en cerros y Conglomerado (S2) en la base',
-    'JESUS MARIA': 'Suelo Rígido (Conglomerado S2)',
-    'LA MOLINA': 'Suelo Muy Rígido (Roca S1 en cerros y suelo firme S1-S2 en valle)',
-    'LA VICTORIA': 'Suelo Rígido (Conglomerado S2)',
-    'LIMA': 'Suelo Rígido (Conglomerado S2), posibles rellenos en zona histórica',
-    'LINCE': 'Suelo Rígido (Conglomerado S2)',
-    'LOS OLIVOS': 'Suelo Rígido (Conglomerado S2 y suelo aluvial denso)',
-    'LURIGANCHO': 'Suelo Muy Rígido (Roca S1 y conglomerados densos)',
-    'LURIN': 'Mixto: Suelo Arenoso (S3) y suelo aluvial en el valle',
-    'MAGDALENA DEL MAR': 'Suelo Rígido (Conglomerado S2)',
-    'MIRAFLORES': 'Suelo Rígido (Conglomerado S2)',
-    'PACHACAMAC': 'Mixto: Suelo aluvial en valle, zonas rocosas (S1) y arenosas (S3)',
-    'PUEBLO LIBRE': 'Suelo Rígido (Conglomerado S2)',
-    'PUCUSANA': 'Mixto: Roca (S1) en laderas y Suelo Arenoso (S3) en zonas bajas',
-    'PUENTE PIEDRA': 'Predominantemente Suelo Arenoso y gravoso (S3)',
-    'PUNTA HERMOSA': 'Mixto: Roca (S1) en laderas y Suelo Arenoso (S3)',
-    'PUNTA NEGRA': 'Mixto: Roca (S1) en laderas y Suelo Arenoso (S3)',
-    'RIMAC': 'Mixto: Roca (S1 Cerro San Cristóbal) y suelo aluvial (S2-S3) cerca al río',
-    'SAN BARTOLO': 'Mixto: Roca (S1) en laderas y Suelo Arenoso (S3)',
-    'SAN BORJA': 'Suelo Rígido (Conglomerado S2)',
-    'SAN ISIDRO': 'Suelo Rígido (Conglomerado S2)',
-    'SAN JUAN DE LURIGANCHO': 'Mixto: Roca (S1) en cerros y Conglomerado (S2) en zonas planas',
-    'SAN JUAN DE MIRAFLORES': 'Mixto: Suelo Arenoso (S3) en zonas bajas y Roca (S1) en laderas',
-    'SAN LUIS': 'Suelo Rígido (Conglomerado S2)',
-    'SAN MARTIN DE PORRES': 'Suelo Rígido (Conglomerado S2 y suelo aluvial denso)',
-    'SAN MIGUEL': 'Suelo Rígido (Conglomerado S2), con zonas arenosas hacia la costa',
-    'SANTA ANITA': 'Suelo Rígido (Conglomerado S2)',
-    'SANTA MARIA DEL MAR': 'Mixto: Roca (S1) en laderas y Suelo Arenoso (S3)',
-    'SANTA ROSA': 'Predominantemente Suelo Arenoso (S3)',
-    'SANTIAGO DE SURCO': 'Predominantemente Suelo Rígido (Conglomerado S2), con zonas de Roca (S1) al este',
-    'SURQUILLO': 'Suelo Rígido (Conglomerado S2)',
-    'VILLA EL SALVADOR': 'Predominantemente Suelo Arenoso de densidad media a suelta (S3/S4)',
-    'VILLA MARIA DEL TRIUNFO': 'Mixto: Suelo Arenoso (S3) en zonas bajas y Roca (S1) en laderas',
-    'CALLAO': 'Suelo Blando (S4) y rellenos artificiales',
-    'BELLAVISTA': 'Suelo Blando (S4) y rellenos artificiales',
-    'CARMEN DE LA LEGUA REYNOSO': 'Suelo Blando (S4) y rellenos artificiales',
-    'LA PERLA': 'Suelo Blando (S4) y rellenos artificiales',
-    'LA PUNTA': 'Suelo Arenoso y de grava (S3)',
-    'VENTANILLA': 'Predominantemente Suelo Arenoso (S3)',
-    'MI PERU': 'Predominantemente Suelo Arenoso (S3)'
-}
-# Se pidió a la IA determinar de una escala de 0 a 10 que tan riesgosa es el suelo predominante del distrito. Además se pidió agregar información de los distritos de CALLAO a la IA
-peligrosidad_suelos = {
-    'ANCON': 7, 'ATE': 3, 'BARRANCO': 3, 'BRENA': 3, 'CARABAYLLO': 7, 'CHACLACAYO': 2, 'CHORRILLOS': 9, 'CIENEGUILLA': 2, 'COMAS': 6, 'EL AGUSTINO': 6, 'INDEPENDENCIA': 6, 'JESUS MARIA': 3, 'LA MOLINA': 2, 'LA VICTORIA': 3, 'LIMA': 5, 'LINCE': 3, 'LOS OLIVOS': 4, 'LURIGANCHO': 2, 'LURIN': 7, 'MAGDALENA DEL MAR': 3, 'MIRAFLORES': 3, 'PACHACAMAC': 7, 'PUEBLO LIBRE': 3, 'PUCUSANA': 7, 'PUENTE PIEDRA': 8, 'PUNTA HERMOSA': 7, 'PUNTA NEGRA': 7, 'RIMAC': 7, 'SAN BARTOLO': 7, 'SAN BORJA': 3, 'SAN ISIDRO': 3, 'SAN JUAN DE LURIGANCHO': 6, 'SAN JUAN DE MIRAFLORES': 8, 'SAN LUIS': 3, 'SAN MARTIN DE PORRES': 4, 'SAN MIGUEL': 5, 'SANTA ANITA': 3, 'SANTA MARIA DEL MAR': 7, 'SANTA ROSA': 8, 'SANTIAGO DE SURCO': 4, 'SURQUILLO': 3, 'VILLA EL SALVADOR': 10, 'VILLA MARIA DEL TRIUNFO': 8,
-    'CALLAO': 9, 'BELLAVISTA': 8, 'CARMEN DE LA LEGUA REYNOSO': 9, 'LA PERLA': 8, 'LA PUNTA': 7, 'VENTANILLA': 9, 'MI PERU': 8
-}
-material_precario = {
-    'ANCON': 429, 'ATE': 4276, 'BARRANCO': 117, 'BRENA': 584, 'CARABAYLLO': 2118, 'CHACLACAYO': 84, 'CHORRILLOS': 2175, 'CIENEGUILLA': 475, 'COMAS': 2618, 'EL AGUSTINO': 564, 'INDEPENDENCIA': 1954, 'JESUS MARIA': 138, 'LA MOLINA': 101, 'LA VICTORIA': 869, 'LIMA': 3930, 'LINCE': 183, 'LOS OLIVOS': 389, 'LURIGANCHO': 1890, 'LURIN': 1212, 'MAGDALENA DEL MAR': 114, 'MIRAFLORES': 99, 'PACHACAMAC': 1254, 'PUEBLO LIBRE': 99, 'PUCUSANA': 1022, 'PUENTE PIEDRA': 2703, 'PUNTA HERMOSA': 982, 'PUNTA NEGRA': 76, 'RIMAC': 2442, 'SAN BARTOLO': 66, 'SAN BORJA': 27, 'SAN ISIDRO': 11, 'SAN JUAN DE LURIGANCHO': 11906, 'SAN JUAN DE MIRAFLORES': 3590, 'SAN LUIS': 78, 'SAN MARTIN DE PORRES': 1297, 'SAN MIGUEL': 145, 'SANTA ANITA': 406, 'SANTA MARIA DEL MAR': 9, 'SANTA ROSA': 188, 'SANTIAGO DE SURCO': 461, 'SURQUILLO': 176, 'VILLA EL SALVADOR': 3166, 'VILLA MARIA DEL TRIUNFO': 9506,
-    'CALLAO': 8500, 'BELLAVISTA': 1500, 'CARMEN DE LA LEGUA REYNOSO': 1200, 'LA PERLA': 900, 'LA PUNTA': 50, 'VENTANILLA': 15000, 'MI PERU': 2500
-}
-damnificados_2000 = {
-    'ANCON': 0, 'ATE': 117, 'BARRANCO': 8, 'BRENA': 0, 'CARABAYLLO': 4, 'CHACLACAYO': 0, 'CHORRILLOS': 0, 'CIENEGUILLA': 0, 'COMAS': 30, 'EL AGUSTINO': 68, 'INDEPENDENCIA': 10, 'JESUS MARIA': 0, 'LA MOLINA': 0, 'LA VICTORIA': 8, 'LIMA': 56, 'LINCE': 0, 'LOS OLIVOS': 0, 'LURIGANCHO': 0, 'LURIN': 0, 'MAGDALENA DEL MAR': 0, 'MIRAFLORES': 0, 'PACHACAMAC': 0, 'PUEBLO LIBRE': 0, 'PUCUSANA': 0, 'PUENTE PIEDRA': 5, 'PUNTA HERMOSA': 55, 'PUNTA NEGRA': 0, 'RIMAC': 4, 'SAN BARTOLO': 0, 'SAN BORJA': 0, 'SAN ISIDRO': 0, 'SAN JUAN DE LURIGANCHO': 4, 'SAN JUAN DE MIRAFLORES': 88, 'SAN LUIS': 0, 'SAN MARTIN DE PORRES': 0, 'SAN MIGUEL': 0, 'SANTA ANITA': 0, 'SANTA MARIA DEL MAR': 0, 'SANTA ROSA': 0, 'SANTIAGO DE SURCO': 0, 'SURQUILLO': 0, 'VILLA EL SALVADOR': 94, 'VILLA MARIA DEL TRIUNFO': 0,
-    'CALLAO': 0, 'BELLAVISTA': 0, 'CARMEN DE LA LEGUA REYNOSO': 0, 'LA PERLA': 0, 'LA PUNTA': 0, 'VENTANILLA': 0, 'MI PERU': 0
-}
-viviendas_destruidas_2000 = {
-    'ANCON': 0, 'ATE': 27, 'BARRANCO': 1, 'BRENA': 0, 'CARABAYLLO': 1, 'CHACLACAYO': 0, 'CHORRILLOS': 0, 'CIENEGUILLA': 0, 'COMAS': 4, 'EL AGUSTINO': 9, 'INDEPENDENCIA': 1, 'JESUS MARIA': 0, 'LA MOLINA': 0, 'LA VICTORIA': 1, 'LIMA': 9, 'LINCE': 0, 'LOS OLIVOS': 0, 'LURIGANCHO': 0, 'LURIN': 0, 'MAGDALENA DEL MAR': 0, 'MIRAFLORES': 0, 'PACHACAMAC': 0, 'PUEBLO LIBRE': 0, 'PUCUSANA': 0, 'PUENTE PIEDRA': 1, 'PUNTA HERMOSA': 18, 'PUNTA NEGRA': 0, 'RIMAC': 1, 'SAN BARTOLO': 0, 'SAN BORJA': 0, 'SAN ISIDRO': 0, 'SAN JUAN DE LURIGANCHO': 1, 'SAN JUAN DE MIRAFLORES': 22, 'SAN LUIS': 0, 'SAN MARTIN DE PORRES': 0, 'SAN MIGUEL': 0, 'SANTA ANITA': 0, 'SANTA MARIA DEL MAR': 0, 'SANTA ROSA': 0, 'SANTIAGO DE SURCO': 0, 'SURQUILLO': 0, 'VILLA EL SALVADOR': 52, 'VILLA MARIA DEL TRIUNFO': 0,
-    'CALLAO': 0, 'BELLAVISTA': 0, 'CARMEN DE LA LEGUA REYNOSO': 0, 'LA PERLA': 0, 'LA PUNTA': 0, 'VENTANILLA': 0, 'MI PERU': 0
-}
+# Los diccionarios se encuentran en el módulo datos.py para que puedan ser reutilizados por otros scripts.
+from datos import poblacion, area, suelos, peligrosidad_suelos, material_precario, damnificados_2000, viviendas_destruidas_2000
 
 # ==============================================================================
 # 4. FUNCIÓN DE PROCESAMIENTO DE DATOS
 # ==============================================================================
 
-# El decorador @st.cache_data le dice a Streamlit que "memorice" el resultado de esta función.
-# La función solo se volverá a ejecutar si los datos de entrada (los diccionarios) cambian.
-# Esto hace que la aplicación sea mucho más rápida, ya que no tiene que recargar y procesar los archivos cada vez.
-@st.cache_data
-def load_and_process_data(poblacion_data, area_data, peligrosidad_data, material_data, damnificados_data, viviendas_data):
-    # Calcula la densidad poblacional (Población / Área) para cada distrito.
-    densidad_poblacional = {distrito: round(poblacion_data[distrito] / area_data[distrito]) for distrito in poblacion_data if distrito in area_data and area_data[distrito] > 0}
-    
-    # Carga el archivo GeoJSON que contiene las formas (polígonos) de los distritos.
+# La versión de los datos es un hash de los diccionarios y del GeoJSON. El historial de eventos no entra en la versión:
+# se sigue por separado (sección 5) y sus eventos nuevos se suman sin volver a calcular lo demás.
+# Con @st.cache_resource se calcula una sola vez por proceso, en vez de volver a revisar los diccionarios en cada ejecución del script.
+@st.cache_resource
+def obtener_version_datos():
+    return cache_resultados.version_datos(
+        [poblacion, area, suelos, peligrosidad_suelos, material_precario, damnificados_2000, viviendas_destruidas_2000],
+        archivos=['lima_callao_distritos_simple.geojson'],
+    )
+
+# El decorador @st.cache_resource guarda el resultado dentro del proceso, usando solo la versión como llave
+# (Streamlit no revisa los parámetros que empiezan con guion bajo, así que los diccionarios no se vuelven a recorrer).
+# Además, la matriz del motor se guarda en la caché en disco (cache_resultados.py): los demás procesos del
+# servidor la leen desde ahí (en memoria mapeada, de solo lectura) en vez de volver a calcularla.
+@st.cache_resource
+def load_and_process_data(version, _poblacion_data, _area_data, _peligrosidad_data, _material_data, _damnificados_data, _viviendas_data):
+    # Carga las formas (polígonos) de los distritos desde la caché binaria (cache_geometria.py).
+    # La primera vez se construye a partir del GeoJSON; después solo se abren los arreglos ya preparados, sin geopandas.
     try:
-        mapa_gdf = gpd.read_file('lima_callao_distritos_simple.geojson')
+        with instrumentacion.etapa('carga de geometría'):
+            geometria = cache_geometria.cargar('lima_callao_distritos_simple.geojson')
     except Exception as e:
         # Si el archivo no se encuentra, muestra un error claro y detiene la ejecución.
         st.error(f"🚨 **Error al cargar el archivo GeoJSON:** `{e}`")
         st.warning("Asegúrate de que el archivo `lima_callao_distritos_simple.geojson` esté en la misma carpeta que tu script.")
         st.stop()
-    
-    # Convierte cada diccionario de datos en un DataFrame de Pandas para poder unirlos.
-    df_peligrosidad = pd.DataFrame(list(peligrosidad_data.items()), columns=['distrito_data', 'peligrosidad'])
-    df_densidad = pd.DataFrame(list(densidad_poblacional.items()), columns=['distrito_data', 'densidad'])
-    df_material = pd.DataFrame(list(material_data.items()), columns=['distrito_data', 'material_precario'])
-    df_damnificados = pd.DataFrame(list(damnificados_data.items()), columns=['distrito_data', 'damnificados'])
-    df_viviendas = pd.DataFrame(list(viviendas_data.items()), columns=['distrito_data', 'viviendas_destruidas'])
-
-    # Une todos los DataFrames en uno solo usando el nombre del distrito como clave común.
-    df = pd.merge(df_peligrosidad, df_densidad, on='distrito_data', how='outer')
-    df = pd.merge(df, df_material, on='distrito_data', how='outer')
-    df = pd.merge(df, df_damnificados, on='distrito_data', how='outer')
-    df = pd.merge(df, df_viviendas, on='distrito_data', how='outer')
 
     # --- Cálculo del Índice de Riesgo Combinado ---
-    # Para poder combinar variables con diferentes unidades (ej. personas vs. número de viviendas),
-    # primero se normalizan. Esto convierte todos los valores a una escala común de 0 a 1.
-    for column in ['peligrosidad', 'densidad', 'material_precario', 'damnificados', 'viviendas_destruidas']:
-        min_val = df[column].min()
-        max_val = df[column].max()
-        if (max_val - min_val) > 0: # Evita la división por cero si todos los valores son iguales.
-            df[f'norm_{column}'] = (df[column] - min_val) / (max_val - min_val)
-        else:
-            df[f'norm_{column}'] = 0
-
-    # El índice de riesgo se calcula como el promedio de todas las variables normalizadas,
-    # y se multiplica por 10 para tener una escala más intuitiva (de 0 a 10).
-    df['riesgo_combinado'] = df[['norm_peligrosidad', 'norm_densidad', 'norm_material_precario', 'norm_damnificados', 'norm_viviendas_destruidas']].mean(axis=1) * 10
-    
+    # El motor (motor_riesgo.py) guarda todos los indicadores en una sola matriz (distritos x indicadores),
+    # calcula la densidad poblacional y normaliza cada indicador a la escala de 0 a 1 de una sola vez.
+    # Con los pesos por defecto (todos iguales) el índice es el promedio de las variables normalizadas, de 0 a 10.
+    def calcular_motor():
+        motor = MotorRiesgo.desde_datos(_poblacion_data, _area_data, _peligrosidad_data, _material_data, _damnificados_data, _viviendas_data)
+        return {'distritos': np.array(motor.distritos), 'indicadores': np.array(motor.indicadores), 'matriz': motor.matriz}
+
+    with instrumentacion.etapa('motor y normalización'):
+        arreglos = cache_resultados.cache_por_defecto().obtener_o_calcular(f'motor-{version}', calcular_motor)
+        motor = MotorRiesgo(arreglos['distritos'].tolist(), arreglos['indicadores'].tolist(), arreglos['matriz'])
+        df = motor.tabla().reset_index()
+
     # --- Fusionar Datos Geográficos y de Riesgo ---
-    # Se define el nombre de la columna en el GeoJSON que contiene los nombres de los distritos.
+    # Se define el nombre de la columna con los nombres de los distritos del mapa.
     NOMBRE_COLUMNA_GEOJSON = 'distrito' 
 
-    # Se estandarizan los nombres en ambos DataFrames (mayúsculas, sin espacios) para asegurar una unión correcta.
-    mapa_gdf[NOMBRE_COLUMNA_GEOJSON] = mapa_gdf[NOMBRE_COLUMNA_GEOJSON].str.upper().str.strip()
-    df['distrito_data'] = df['distrito_data'].str.upper().str.strip()
+    # Tabla con un distrito del mapa por fila, en el mismo orden que los polígonos.
+    # La caché ya entrega los nombres estandarizados (mayúsculas, sin espacios) igual que el motor, para asegurar una unión correcta.
+    mapa_df = pd.DataFrame({NOMBRE_COLUMNA_GEOJSON: geometria.nombres})
 
-    # Se unen los datos geográficos (mapa_gdf) con los datos de riesgo (df).
+    # Se unen los distritos del mapa (mapa_df) con los datos de riesgo (df).
     # 'how="left"' asegura que todos los distritos del mapa se conserven, incluso si no tienen datos de riesgo.
-    merged_gdf = mapa_gdf.merge(df, left_on=NOMBRE_COLUMNA_GEOJSON, right_on='distrito_data', how="left")
+    with instrumentacion.etapa('unión con el mapa'):
+        merged_df = mapa_df.merge(df, left_on=NOMBRE_COLUMNA_GEOJSON, right_on='distrito_data', how="left")
     
-    # Para los distritos que no tenían datos (ej. del Callao en algunas variables), se rellenan los valores nulos con 0.
-    for col in ['peligrosidad', 'densidad', 'material_precario', 'damnificados', 'viviendas_destruidas', 'riesgo_combinado']:
-        merged_gdf[col] = merged_gdf[col].fillna(0)
-        
-    return merged_gdf
+        # Para los distritos que no tenían datos (ej. del Callao en algunas variables), se rellenan los valores nulos con 0.
+        for col in ['peligrosidad', 'densidad', 'material_precario', 'damnificados', 'viviendas_destruidas', 'riesgo_combinado']:
+            merged_df[col] = merged_df[col].fillna(0)
 
-# Se llama a la función para cargar y procesar todos los datos. El resultado se guarda en 'merged_gdf'.
-merged_gdf = load_and_process_data(poblacion, area, peligrosidad_suelos, material_precario, damnificados_2000, viviendas_destruidas_2000)
+    # Se devuelve también el motor para poder recalcular el índice con otros pesos sin volver a unir nada.
+    return merged_df, motor
+
+# Se llama a la función para cargar y procesar todos los datos. El resultado se guarda en 'merged_df' y 'motor'.
+# Si ya estaban en la caché, las etapas internas (geometría, motor, unión) no aparecen en la instrumentación.
+with instrumentacion.etapa('procesamiento de datos'):
+    version_datos = obtener_version_datos()
+    merged_df, motor = load_and_process_data(version_datos, poblacion, area, peligrosidad_suelos, material_precario, damnificados_2000, viviendas_destruidas_2000)
 
 # ==============================================================================
 # 5. INTERFAZ DE USUARIO (BOTONES)
@@ -194,21 +133,89 @@ vistas = {
     "Material Precario": "material_precario",
     "Damnificados": "damnificados",
     "Viviendas Destruidas": "viviendas_destruidas",
+    "Escenario Sísmico": "escenario_viviendas_danadas",
+    "Pérdida Anual Esperada": "perdida_anual_viviendas",
+    "Puntos Calientes": "puntos_calientes",
     "Riesgo Combinado": "riesgo_combinado"
 }
 
-# st.columns(6) crea 6 columnas de igual ancho para colocar los botones horizontalmente.
-cols = st.columns(6)
+# st.columns() crea una columna de igual ancho por vista para colocar los botones horizontalmente.
+cols = st.columns(len(vistas))
 
-# Itera sobre los primeros 5 botones para crearlos con el estilo estándar.
+# Itera sobre todos los botones menos el último para crearlos con el estilo estándar.
 for i, (nombre_vista, _) in enumerate(list(vistas.items())[:-1]):
     if cols[i].button(nombre_vista, use_container_width=True, key=f"btn_{i}"):
         st.session_state['vista_seleccionada'] = nombre_vista
 
 # Crea el último botón ("Riesgo Combinado") con un estilo primario para destacarlo.
-if cols[5].button("Riesgo Combinado", use_container_width=True, type="primary", key="btn_riesgo"):
+if cols[-1].button("Riesgo Combinado", use_container_width=True, type="primary", key="btn_riesgo"):
     st.session_state['vista_seleccionada'] = "Riesgo Combinado"
 
+# --- Pesos del Riesgo Combinado ---
+# Cada deslizador define cuánto aporta una variable al índice. Con todos los pesos iguales se obtiene el promedio simple.
+# El motor recalcula el índice con una multiplicación de matrices, sin volver a cargar ni unir los datos.
+nombres_indicadores = {columna: nombre for nombre, columna in vistas.items()}
+with st.expander("⚖️ Ajustar pesos del Riesgo Combinado"):
+    cols_pesos = st.columns(len(motor.indicadores))
+    pesos = [
+        cols_pesos[i].slider(nombres_indicadores[indicador], min_value=0.0, max_value=1.0, value=1.0, step=0.05, key=f"peso_{indicador}")
+        for i, indicador in enumerate(motor.indicadores)
+    ]
+if sum(pesos) == 0:
+    st.warning("Todos los pesos están en 0; se usarán pesos iguales para el Riesgo Combinado.")
+    pesos = None
+
+# --- Periodo del historial de daños ---
+# Si existe el archivo con el historial de eventos (historial.py), los damnificados y las viviendas destruidas
+# se suman solo en el periodo elegido. Las sumas acumuladas por año se preparan una vez por proceso; en cada ejecución
+# solo se revisa si el archivo cambió y se suman las filas nuevas (las que agregó este u otro proceso del servidor).
+# Cada cambio del periodo es una resta por distrito, y el motor recalcula el Riesgo Combinado con esos totales.
+# Un historial incompleto (que en algún distrito suma menos que los totales de datos.py) no reemplaza esos totales.
+@st.cache_resource
+def obtener_historial(version, existe_archivo, _distritos):
+    return historial.cargar_historial(_distritos)
+
+historial_danos = obtener_historial(version_datos, os.path.exists(historial.RUTA_HISTORIAL), motor.distritos)
+periodo = None
+if historial_danos is None:
+    st.caption(f"Los damnificados y las viviendas destruidas son los totales desde el año 2000. "
+               f"Para filtrarlos por periodo, agregue el historial de eventos en `{historial.RUTA_HISTORIAL}`.")
+else:
+    historial_danos.actualizar()
+    if historial_danos.descartados:
+        st.warning(f"{historial_danos.descartados} filas de `{historial.RUTA_HISTORIAL}` se ignoraron "
+                   f"(distrito desconocido, fecha inválida o anterior a {historial_danos.anio_inicio}).")
+    totales_datos = {
+        'damnificados': [damnificados_2000.get(distrito, 0) for distrito in historial_danos.distritos],
+        'viviendas_destruidas': [viviendas_destruidas_2000.get(distrito, 0) for distrito in historial_danos.distritos],
+    }
+    if not historial_danos.totales_cubren(totales_datos):
+        st.caption(f"El historial de `{historial.RUTA_HISTORIAL}` está incompleto (suma menos daños que los totales desde el año 2000 "
+                   f"en algún distrito), así que se muestran esos totales sin filtrar por periodo.")
+        historial_danos = None
+if historial_danos is not None:
+    periodo = st.slider("Periodo de los daños históricos", min_value=historial_danos.anio_inicio, max_value=historial_danos.anio_fin,
+                        value=(historial_danos.anio_inicio, historial_danos.anio_fin), key="periodo_historial")
+    totales_periodo = historial_danos.consultar(*periodo)
+    for metrica in historial.METRICAS:
+        motor = motor.con_indicador(metrica, totales_periodo[metrica])
+
+# Registro de un evento nuevo: se agrega al final del archivo y la siguiente ejecución lo suma al historial en memoria.
+# Escribe en el servidor y cambia los datos de todas las personas que usan la aplicación, así que solo aparece si
+# quien administra el servidor lo activa con la variable de entorno RIESGOS_EDITAR_HISTORIAL=1 (no desde la dirección).
+# Si no, los eventos se agregan con: python historial.py agregar DISTRITO AAAA-MM-DD DAMNIFICADOS VIVIENDAS
+if os.environ.get('RIESGOS_EDITAR_HISTORIAL') == '1':
+    with st.expander("Registrar un evento sísmico en el historial"):
+        with st.form("form_evento", clear_on_submit=True):
+            cols_evento = st.columns(4)
+            distrito_evento = cols_evento[0].selectbox("Distrito", motor.distritos)
+            fecha_evento = cols_evento[1].date_input("Fecha", min_value=datetime.date(historial.ANIO_INICIO, 1, 1), max_value=datetime.date.today())
+            damnificados_evento = cols_evento[2].number_input("Damnificados", min_value=0, step=1)
+            viviendas_evento = cols_evento[3].number_input("Viviendas destruidas", min_value=0, step=1)
+            if st.form_submit_button("Registrar evento"):
+                historial.guardar_evento(historial.RUTA_HISTORIAL, distrito_evento, fecha_evento, int(damnificados_evento), int(viviendas_evento))
+                st.rerun()
+
 # ==============================================================================
 # 6. CREACIÓN Y VISUALIZACIÓN DEL MAPA
 # ==============================================================================
@@ -218,26 +225,108 @@ columna_color = vistas[vista_actual]
 
 st.subheader(f"Mapa de Calor: {vista_actual}")
 
-# Se crea la figura del mapa de calor con Plotly Express.
-fig = px.choropleth_mapbox(
-    merged_gdf,
-    geojson=merged_gdf.geometry,          # Las formas de los distritos.
-    locations=merged_gdf.index,           # Identificador único para cada forma.
-    color=columna_color,                  # La columna de datos que definirá el color.
-    mapbox_style="carto-positron",        # Estilo del mapa base (minimalista).
-    center={"lat": -12.0464, "lon": -77.0428}, # Coordenadas para centrar el mapa en Lima.
-    zoom=8.5,                             # Nivel de zoom inicial.
-    opacity=0.7,                          # Transparencia de los colores.
-    color_continuous_scale="YlOrRd",      # Escala de colores (Amarillo -> Naranja -> Rojo).
-    labels={columna_color: vista_actual}, # Etiqueta para la leyenda de colores.
-    hover_name='distrito',                # Columna que se mostrará como título al pasar el mouse.
-    hover_data={columna_color: ':.2f'}    # Datos adicionales a mostrar en el hover, con formato de 2 decimales.
-)
-# Ajusta los márgenes para que el mapa ocupe todo el espacio posible.
-fig.update_layout(margin={"r":0,"t":40,"l":0,"b":0})
+# --- Escenarios sísmicos ---
+# El modelo de escenarios (escenarios.py) guarda los polígonos en km y la exposición de cada distrito.
+# Se crea una sola vez por proceso; cada sismo se evalúa en milisegundos.
+@st.cache_resource
+def obtener_modelo_escenarios():
+    return escenarios.ModeloEscenarios.desde_datos(suelos, poblacion, material_precario)
+
+# La pérdida anual esperada suma miles de sismos sintéticos por lotes. Se guarda en la caché en disco con una clave
+# que incluye la versión de los datos, el tamaño del catálogo y los parámetros del modelo, y se comparte entre procesos.
+@st.cache_resource
+def calcular_perdida_anual(version, n_eventos):
+    def calcular():
+        perdida = obtener_modelo_escenarios().perdida_anual(escenarios.catalogo_sintetico(n_eventos))
+        return {'distritos': perdida.index.to_numpy(dtype=str), 'viviendas_danadas_anual': perdida['viviendas_danadas_anual'].to_numpy()}
+
+    clave = f'perdida-anual-{version}-{n_eventos}-{escenarios.firma_modelo()}'
+    arreglos = cache_resultados.cache_por_defecto().obtener_o_calcular(clave, calcular)
+    return pd.DataFrame({'viviendas_danadas_anual': arreglos['viviendas_danadas_anual']}, index=arreglos['distritos'].tolist())
+
+if vista_actual == "Escenario Sísmico":
+    # Por defecto se muestra el sismo de Lima del 3 de octubre de 1974 (Mw 8.1).
+    referencia = escenarios.SISMO_REFERENCIA
+    cols_sismo = st.columns(4)
+    latitud_sismo = cols_sismo[0].number_input("Latitud del epicentro", value=referencia['latitud'], min_value=-16.0, max_value=-8.0, step=0.05, format="%.2f")
+    longitud_sismo = cols_sismo[1].number_input("Longitud del epicentro", value=referencia['longitud'], min_value=-80.0, max_value=-75.0, step=0.05, format="%.2f")
+    profundidad_sismo = cols_sismo[2].number_input("Profundidad (km)", value=referencia['profundidad'], min_value=0.0, max_value=200.0, step=5.0)
+    magnitud_sismo = cols_sismo[3].number_input("Magnitud (Mw)", value=referencia['magnitud'], min_value=5.0, max_value=9.5, step=0.1, format="%.1f")
+    escenario = obtener_modelo_escenarios().escenario(latitud_sismo, longitud_sismo, profundidad_sismo, magnitud_sismo)
+elif vista_actual == "Pérdida Anual Esperada":
+    perdida_anual = calcular_perdida_anual(version_datos, 10_000)
+
+# --- Puntos calientes (autocorrelación espacial) ---
+# El grafo de vecindad (vecindad.py) se construye una vez por versión de la geometría y se guarda en la caché en disco.
+# Con él se buscan grupos de distritos vecinos con valores altos (o bajos) de la variable elegida; la significancia
+# se estima con 999 permutaciones procesadas por lotes. Se guarda en caché por valores de la variable.
+@st.cache_data
+def calcular_puntos_calientes(valores, permutaciones=vecindad.PERMUTACIONES):
+    grafo = vecindad.vecindad_por_defecto()
+    return grafo.moran_global(valores, permutaciones), grafo.lisa(valores, permutaciones)
+
+if vista_actual == "Puntos Calientes":
+    variables_puntos = {"Riesgo Combinado": "riesgo_combinado", **{nombres_indicadores[i]: i for i in motor.indicadores}}
+    variable_puntos = st.selectbox("Variable analizada", list(variables_puntos), key="variable_puntos_calientes")
+
+# Se obtiene la figura desde la capa de figuras (figuras.py).
+# La geometría de los distritos se prepara una sola vez por proceso; al cambiar de vista solo cambian
+# los colores, los valores del hover y la barra de colores. Las figuras ya construidas se reutilizan desde la caché.
+with instrumentacion.etapa('valores de la vista'):
+    tabla_vista = merged_df.set_index('distrito')
+    # El Riesgo Combinado se toma del motor con los pesos elegidos por el usuario (y el periodo del historial, si hay).
+    tabla_vista['riesgo_combinado'] = pd.Series(motor.indice(pesos), index=motor.distritos)
+    if periodo is not None:
+        for metrica in historial.METRICAS:
+            tabla_vista[metrica] = pd.Series(totales_periodo[metrica], index=historial_danos.distritos)
+    if vista_actual == "Escenario Sísmico":
+        tabla_vista['escenario_viviendas_danadas'] = escenario['viviendas_danadas']
+    elif vista_actual == "Pérdida Anual Esperada":
+        tabla_vista['perdida_anual_viviendas'] = perdida_anual['viviendas_danadas_anual']
+    elif vista_actual == "Puntos Calientes":
+        # La variable se toma en el orden del GeoJSON, el mismo del grafo de vecindad.
+        moran_global, puntos_calientes = calcular_puntos_calientes(valores_en_orden(tabla_vista, variables_puntos[variable_puntos]))
+        tabla_vista['puntos_calientes'] = puntos_calientes['categoria']
+    valores_vista = valores_en_orden(tabla_vista, columna_color)
+
+# --- Nivel de detalle según el zoom ---
+# Con el mapa alejado se envían polígonos simplificados (los bordes compartidos se simplifican juntos, sin huecos);
+# al acercarse a un distrito se envía la geometría con todo su detalle.
+zoom_mapa = st.select_slider("Zoom del mapa", options=[7.0, 8.0, ZOOM_INICIAL, 9.0, 10.0, 11.0, 12.0], value=ZOOM_INICIAL, key="zoom_mapa")
+with instrumentacion.etapa('construcción de figura'):
+    categorias_vista = vecindad.CATEGORIAS_LISA if vista_actual == "Puntos Calientes" else None
+    fig = figura_vista(vista_actual, valores_vista, zoom_mapa, categorias=categorias_vista)
+if modo_depuracion:
+    # Tamaño del JSON de la figura, que es lo que viaja al navegador (solo se mide en modo de depuración).
+    with instrumentacion.etapa('serialización de figura') as medicion:
+        medicion['bytes'] = len(fig.to_json())
 
 # Muestra la figura de Plotly en la aplicación de Streamlit.
-st.plotly_chart(fig, use_container_width=True)
+with instrumentacion.etapa('envío de figura'):
+    st.plotly_chart(fig, use_container_width=True)
+if vista_actual == "Puntos Calientes" and np.isnan(moran_global['I']):
+    # Variable constante (ej. un periodo sin eventos): no hay agrupamiento que medir y todos los distritos salen sin color.
+    st.info(f"{variable_puntos} tiene el mismo valor en todos los distritos, así que no hay puntos calientes ni fríos que buscar.")
+elif vista_actual == "Puntos Calientes":
+    st.caption(f"I de Moran global de {variable_puntos}: {moran_global['I']:.3f} (sin agrupamiento se esperaría {moran_global['esperado']:.3f}), "
+               f"p = {moran_global['p_valor']:.3f}. Los distritos coloreados son significativos al {vecindad.ALFA:.0%}.")
+
+# --- Estabilidad del ranking (análisis de sensibilidad) ---
+# Los puntajes de peligrosidad y los pesos tienen incertidumbre. Este análisis (sensibilidad.py) los perturba miles
+# de veces y muestra en qué rango de posiciones puede caer cada distrito. Se guarda en caché por combinación de pesos y periodo
+# (y número de eventos del historial, para que un evento nuevo no devuelva el resultado anterior).
+@st.cache_data
+def calcular_sensibilidad(_motor, pesos_elegidos, n_simulaciones, periodo_elegido, eventos_historial):
+    agregado = sensibilidad.ejecutar(_motor, n_simulaciones, pesos=pesos_elegidos, procesos=1)
+    return sensibilidad.resumen(_motor, agregado, pesos=pesos_elegidos)
+
+with st.expander("🎲 Estabilidad del ranking del Riesgo Combinado (análisis de sensibilidad)"):
+    n_simulaciones = st.select_slider("Número de simulaciones", options=[1_000, 5_000, 20_000], value=5_000)
+    if st.button("Calcular estabilidad del ranking", key="btn_sensibilidad"):
+        eventos_historial = 0 if historial_danos is None else len(historial_danos.eventos)
+        tabla_sensibilidad = calcular_sensibilidad(motor, None if pesos is None else tuple(pesos), n_simulaciones, periodo, eventos_historial)
+        st.caption("Intervalos al 90%: posición 1 = mayor riesgo. 'prob_top1' es la probabilidad de ser el distrito más riesgoso.")
+        st.dataframe(tabla_sensibilidad[['riesgo_base', 'riesgo_ic_inf', 'riesgo_ic_sup', 'rango_base', 'rango_mediana', 'rango_ic_inf', 'rango_ic_sup', 'prob_top1', 'prob_top5']], use_container_width=True)
 
 # ==============================================================================
 # 7. SECCIONES DE TEXTO INFORMATIVO
@@ -247,12 +336,15 @@ st.subheader(f"Descripción de la variable: {vista_actual}")
 
 # Diccionario con los textos explicativos para cada vista.
 descripciones = {
-    "Riesgo Combinado": "Este índice es un promedio normalizado de todas las variables, ofreciendo una visión general del riesgo sísmico. Un valor más alto indica una mayor vulnerabilidad combinada.",
+    "Riesgo Combinado": "Este índice es un promedio normalizado (ponderado según los pesos elegidos) de todas las variables, ofreciendo una visión general del riesgo sísmico. Un valor más alto indica una mayor vulnerabilidad combinada.",
     "Peligrosidad Suelos": "Mide la probabilidad de que el suelo predominante del distrito amplifique las ondas sísmicas. Los valores más altos (suelos arenosos o blandos) son más peligrosos que los valores bajos (roca o conglomerado).",
     "Densidad Poblacional": "Representa la cantidad de habitantes por kilómetro cuadrado. Una mayor densidad puede complicar la evacuación y aumentar el número de personas afectadas.",
     "Material Precario": "Indica el número de viviendas construidas con materiales vulnerables (como adobe o quincha). A mayor número, mayor es el riesgo de colapso.",
     "Damnificados": "Muestra el número histórico de personas damnificadas por eventos sísmicos desde el año 2000 hasta 2025. Sirve como un indicador de vulnerabilidad pasada.",
-    "Viviendas Destruidas": "Indica el número histórico de viviendas destruidas por eventos sísmicos desde el año 2000 hasta 2025, reflejando la fragilidad de las construcciones en esa zona años pasados."
+    "Viviendas Destruidas": "Indica el número histórico de viviendas destruidas por eventos sísmicos desde el año 2000 hasta 2025, reflejando la fragilidad de las construcciones en esa zona años pasados.",
+    "Escenario Sísmico": "Estima cuántas viviendas sufrirían daño severo con el sismo elegido. Combina la distancia al epicentro, la amplificación del tipo de suelo (S1 a S4), las viviendas de material precario y la población de cada distrito. Por defecto se simula el sismo de Lima de 1974 (Mw 8.1). Los parámetros del modelo son referenciales.",
+    "Pérdida Anual Esperada": "Promedio de viviendas con daño severo por año, calculado con un catálogo de 10 000 sismos sintéticos frente a la costa central y su frecuencia anual. Permite comparar qué distritos acumulan más daño esperado a largo plazo. Los parámetros del modelo son referenciales.",
+    "Puntos Calientes": "Muestra dónde el riesgo se agrupa en el espacio. Un punto caliente (Alto-Alto) es un distrito con valor alto rodeado de vecinos con valores altos; un punto frío (Bajo-Bajo), lo contrario. Los distritos atípicos tienen un valor muy distinto al de sus vecinos. Solo se colorean los resultados estadísticamente significativos (I de Moran local con 999 permutaciones)."
 }
 
 descripcion_actual = descripciones.get(vista_actual, "No hay descripción disponible para esta vista.")
@@ -294,6 +386,31 @@ with st.expander("Ver Conclusiones Detalladas"):
     st.markdown(f"<p style='text-align: justify;'>{conclusion_actual}", unsafe_allow_html=True) # Se usa HTML para justificar el texto y mejorar la legibilidad.
 
 
+# --- Estado de la caché de resultados ---
+# Muestra cuántas veces este proceso encontró un resultado ya calculado (aciertos) o tuvo que calcularlo (fallos).
+with st.sidebar.expander("🗄️ Caché de resultados"):
+    estado_cache = cache_resultados.cache_por_defecto().estado()
+    st.caption(f"Versión de los datos: `{version_datos}`")
+    cols_cache = st.columns(2)
+    cols_cache[0].metric("Aciertos", estado_cache['aciertos'])
+    cols_cache[1].metric("Fallos", estado_cache['fallos'])
+    st.caption(f"{estado_cache['entradas']} resultados en disco, {estado_cache['bytes'] / 1024:.1f} KB de {estado_cache['limite_bytes'] / 1024 ** 2:.0f} MB.")
+
+# --- Panel de instrumentación ---
+# Tiempo (y memoria, si se activó) de cada etapa de esta ejecución, en tabla y en JSON para comparar entre versiones.
+if modo_depuracion:
+    registro_etapas = instrumentacion.registro_actual()
+    json_etapas = registro_etapas.a_json(vista=vista_actual, zoom=zoom_mapa, version_datos=version_datos)
+    with st.sidebar.expander("⏱️ Instrumentación", expanded=True):
+        tabla_etapas = registro_etapas.tabla()
+        tabla_etapas['ms'] = 1000 * tabla_etapas['segundos']
+        tabla_etapas['etapa'] = ['· ' * nivel + etapa for etapa, nivel in zip(tabla_etapas['etapa'], tabla_etapas['nivel'])]
+        st.dataframe(tabla_etapas.drop(columns=['segundos', 'nivel']).round(1), use_container_width=True, hide_index=True)
+        st.download_button("Descargar mediciones (JSON)", json_etapas, file_name="instrumentacion.json", mime="application/json")
+    if os.environ.get('RIESGOS_INSTRUMENTACION_ARCHIVO'):
+        with open(os.environ['RIESGOS_INSTRUMENTACION_ARCHIVO'], 'a', encoding='utf-8') as archivo:
+            archivo.write(json_etapas + '\n')
+
 # ==============================================================================
 # 8. FOOTER
 # ==============================================================================
@@ -0,0 +1,265 @@
+# ==============================================================================
+# ANÁLISIS DE SENSIBILIDAD E INCERTIDUMBRE DEL RIESGO COMBINADO (MONTE CARLO)
+# ==============================================================================
+# El Riesgo Combinado depende de puntajes asignados por IA (peligrosidad de suelos) y de pesos elegidos
+# a criterio. Antes de afirmar que un distrito es "el #1", conviene ver qué tan estable es su posición.
+#
+# En cada simulación:
+#   1. Se perturba cada valor de los indicadores con un ruido multiplicativo (log-normal).
+#   2. Se sortean pesos alrededor de los pesos base (distribución de Dirichlet).
+#   3. Se vuelve a normalizar (min-max) y se recalcula el índice y el ranking de todos los distritos.
+# Las simulaciones se procesan por lotes con NumPy y los resultados se acumulan en contadores
+# (histogramas de rangos y de valores del índice), así que la memoria no crece con el número de simulaciones.
+# Para corridas grandes el trabajo se reparte entre varios procesos.
+#
+# Uso desde la terminal (desde la carpeta principal del repositorio):
+#     python sensibilidad.py --simulaciones 100000 --procesos 4
+
+import argparse
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+
+from motor_riesgo import ESCALA_INDICE, MotorRiesgo, indice_ponderado, normalizar_min_max
+
+# Desviación estándar (en escala logarítmica) del ruido de cada indicador. 0.20 equivale a ~±20%.
+# La peligrosidad de suelos tiene la mayor incertidumbre porque sus puntajes fueron asignados por IA.
+INCERTIDUMBRE_INDICADORES = {
+    'peligrosidad': 0.25,
+    'densidad': 0.05,
+    'material_precario': 0.15,
+    'damnificados': 0.20,
+    'viviendas_destruidas': 0.20,
+}
+INCERTIDUMBRE_POR_DEFECTO = 0.10
+
+# Concentración de la distribución de Dirichlet de los pesos: mientras más alta, más cerca de los pesos base.
+CONCENTRACION_PESOS = 20.0
+
+# Número de intervalos del histograma del índice (escala 0 a 10): 1000 intervalos = resolución de 0.01.
+INTERVALOS_INDICE = 1000
+
+# Límite de celdas (unidades x intervalos) de cada histograma, para que la memoria no crezca con el cuadrado del
+# número de unidades (ej. 50 000 manzanas x 50 000 posiciones serían ~20 GB). Con los 50 distritos no se llega al
+# límite y el histograma de rangos es exacto (un intervalo por posición); con más unidades, cada intervalo agrupa
+# varias posiciones consecutivas. 10 millones de celdas int64 = ~80 MB por histograma.
+CELDAS_POR_HISTOGRAMA = 10_000_000
+
+# Posiciones del ranking que siempre se cuentan una por una (para prob_top1 y prob_top5).
+PRIMEROS_RANGOS = 5
+
+# Valores de celdas (simulaciones x distritos x indicadores) que se procesan a la vez en un lote (~16 MB).
+CELDAS_POR_LOTE = 2_000_000
+
+# Simulaciones por tarea cuando se usan varios procesos, y a partir de cuántas simulaciones conviene usarlos.
+SIMULACIONES_POR_TAREA = 20_000
+UMBRAL_PROCESOS = 50_000
+
+
+class AgregadoSensibilidad:
+    """Acumula los resultados de las simulaciones sin guardarlas una por una.
+
+    - rangos: conteo[d, b] = cuántas veces el distrito d quedó en el intervalo de posiciones b, que va de la
+      posición b * ancho_rango + 1 a la (b + 1) * ancho_rango (1 = mayor riesgo). Con pocos distritos ancho_rango = 1.
+    - primeros: conteo[d, r] = cuántas veces el distrito d quedó exactamente en la posición r + 1 (r < PRIMEROS_RANGOS).
+    - histograma: conteo[d, b] = cuántas veces el índice del distrito d cayó en el intervalo b.
+    - media y m2: media y suma de cuadrados de desviaciones del índice (para la desviación estándar).
+    La memoria es O(distritos x intervalos), con a lo sumo CELDAS_POR_HISTOGRAMA celdas por histograma.
+    """
+
+    def __init__(self, n_distritos):
+        self.n = 0
+        intervalos_rango = max(1, min(n_distritos, CELDAS_POR_HISTOGRAMA // max(n_distritos, 1)))
+        self.ancho_rango = -(-n_distritos // intervalos_rango)  # División hacia arriba.
+        self.rangos = np.zeros((n_distritos, -(-n_distritos // self.ancho_rango)), dtype=np.int64)
+        self.primeros = np.zeros((n_distritos, min(PRIMEROS_RANGOS, n_distritos)), dtype=np.int64)
+        intervalos_indice = max(1, min(INTERVALOS_INDICE, CELDAS_POR_HISTOGRAMA // max(n_distritos, 1)))
+        self.histograma = np.zeros((n_distritos, intervalos_indice), dtype=np.int64)
+        self.media = np.zeros(n_distritos)
+        self.m2 = np.zeros(n_distritos)
+
+    def agregar(self, indices, rangos):
+        # 'indices' y 'rangos' tienen forma (simulaciones, distritos).
+        n_lote, n_distritos = indices.shape
+        filas = np.broadcast_to(np.arange(n_distritos), indices.shape)
+
+        columnas_rango = self.rangos.shape[1]
+        self.rangos += np.bincount(
+            (filas * columnas_rango + (rangos - 1) // self.ancho_rango).ravel(), minlength=n_distritos * columnas_rango
+        ).reshape(n_distritos, columnas_rango)
+
+        primeros = self.primeros.shape[1]
+        en_primeros = rangos <= primeros
+        self.primeros += np.bincount(
+            (filas[en_primeros] * primeros + rangos[en_primeros] - 1), minlength=n_distritos * primeros
+        ).reshape(n_distritos, primeros)
+
+        intervalos_indice = self.histograma.shape[1]
+        intervalo = np.clip((indices / ESCALA_INDICE * intervalos_indice).astype(np.int64), 0, intervalos_indice - 1)
+        self.histograma += np.bincount(
+            (filas * intervalos_indice + intervalo).ravel(), minlength=n_distritos * intervalos_indice
+        ).reshape(n_distritos, intervalos_indice)
+
+        otro = AgregadoSensibilidad.__new__(AgregadoSensibilidad)
+        otro.n = n_lote
+        otro.media = indices.mean(axis=0)
+        otro.m2 = ((indices - otro.media) ** 2).sum(axis=0)
+        self._combinar_momentos(otro)
+
+    def combinar(self, otro):
+        # Une los resultados de otro proceso (o de otro lote) con los de este.
+        self.rangos += otro.rangos
+        self.primeros += otro.primeros
+        self.histograma += otro.histograma
+        self._combinar_momentos(otro)
+
+    def _combinar_momentos(self, otro):
+        # Fórmula de Chan et al. para combinar medias y varianzas de dos grupos sin perder precisión.
+        total = self.n + otro.n
+        if total == 0:
+            return
+        delta = otro.media - self.media
+        self.media = self.media + delta * otro.n / total
+        self.m2 = self.m2 + otro.m2 + delta ** 2 * self.n * otro.n / total
+        self.n = total
+
+    def cuantiles_indice(self, probabilidad):
+        # Cuantil del índice por distrito a partir del histograma (centro del intervalo).
+        acumulado = np.cumsum(self.histograma, axis=1)
+        intervalo = np.argmax(acumulado >= probabilidad * self.n, axis=1)
+        return (intervalo + 0.5) * ESCALA_INDICE / self.histograma.shape[1]
+
+    def cuantiles_rango(self, probabilidad):
+        # Posición exacta si ancho_rango = 1; si no, la posición central del intervalo (redondeada hacia arriba).
+        acumulado = np.cumsum(self.rangos, axis=1)
+        intervalo = np.argmax(acumulado >= probabilidad * self.n, axis=1)
+        return np.minimum(intervalo * self.ancho_rango + (self.ancho_rango + 1) // 2, len(self.rangos))
+
+
+def _rangos(indices):
+    # Posición de cada distrito en cada simulación (1 = mayor riesgo). Los NaN quedan al final.
+    orden = np.argsort(-np.nan_to_num(indices, nan=-np.inf), axis=1, kind='stable')
+    rangos = np.empty_like(orden)
+    np.put_along_axis(rangos, orden, np.arange(1, indices.shape[1] + 1), axis=1)
+    return rangos
+
+
+def _sortear_pesos(rng, pesos_base, n):
+    # Dirichlet alrededor de los pesos base; los indicadores con peso 0 se quedan en 0.
+    if not pesos_base.sum() > 0:
+        raise ValueError("Al menos un peso base debe ser mayor que 0 para sortear pesos alrededor de él.")
+    activos = pesos_base > 0
+    forma = np.where(activos, CONCENTRACION_PESOS * pesos_base / pesos_base.sum(), 1.0)
+    gamma = rng.gamma(forma, size=(n, len(pesos_base))) * activos
+    total = gamma.sum(axis=1, keepdims=True)
+    # Con pesos base muy pequeños el sorteo puede dar todo 0 (por redondeo): esa fila usa los pesos base.
+    return np.where(total > 0, gamma / np.where(total > 0, total, 1.0), pesos_base / pesos_base.sum())
+
+
+def _simular(matriz, pesos_base, sigmas, n_simulaciones, semilla):
+    """Corre 'n_simulaciones' por lotes y devuelve un AgregadoSensibilidad. Se ejecuta en cada proceso."""
+    rng = np.random.default_rng(semilla)
+    n_distritos, n_indicadores = matriz.shape
+    agregado = AgregadoSensibilidad(n_distritos)
+    tam_lote = max(1, CELDAS_POR_LOTE // (n_distritos * n_indicadores))
+
+    restantes = n_simulaciones
+    while restantes > 0:
+        n = min(tam_lote, restantes)
+        ruido = np.exp(rng.standard_normal((n, n_distritos, n_indicadores)) * sigmas)
+        perturbada = matriz * ruido                          # (n, distritos, indicadores); los NaN se mantienen.
+        pesos = _sortear_pesos(rng, pesos_base, n)           # (n, indicadores)
+        indices = indice_ponderado(normalizar_min_max(perturbada), pesos)
+        agregado.agregar(indices, _rangos(indices))
+        restantes -= n
+    return agregado
+
+
+def ejecutar(motor, n_simulaciones=10_000, pesos=None, semilla=0, procesos=None):
+    """Corre el análisis de sensibilidad y devuelve el AgregadoSensibilidad con todos los resultados.
+
+    Las simulaciones se dividen en tareas con semillas independientes (derivadas de 'semilla'), así que
+    el resultado es el mismo con uno o con varios procesos. procesos=None usa todos los núcleos solo si
+    n_simulaciones supera UMBRAL_PROCESOS; procesos=1 fuerza la ejecución en el proceso actual.
+    """
+    if n_simulaciones <= 0:
+        raise ValueError(f"El número de simulaciones debe ser mayor que 0 (se recibió {n_simulaciones}).")
+    pesos_base = motor.pesos_validos(pesos).astype(float)
+    sigmas = np.array([INCERTIDUMBRE_INDICADORES.get(i, INCERTIDUMBRE_POR_DEFECTO) for i in motor.indicadores])
+
+    tareas = [min(SIMULACIONES_POR_TAREA, n_simulaciones - inicio) for inicio in range(0, n_simulaciones, SIMULACIONES_POR_TAREA)]
+    semillas = np.random.SeedSequence(semilla).spawn(len(tareas))
+    agregado = AgregadoSensibilidad(len(motor.distritos))
+
+    if procesos is None:
+        procesos = os.cpu_count() if n_simulaciones > UMBRAL_PROCESOS else 1
+    if procesos <= 1 or len(tareas) == 1:
+        for n, semilla_tarea in zip(tareas, semillas):
+            agregado.combinar(_simular(motor.matriz, pesos_base, sigmas, n, semilla_tarea))
+        return agregado
+
+    # Se mantienen a lo sumo 2 tareas por proceso en vuelo: así la memoria no depende del total de simulaciones.
+    pendientes_por_enviar = iter(zip(tareas, semillas))
+    with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+        en_vuelo = set()
+        for n, semilla_tarea in pendientes_por_enviar:
+            en_vuelo.add(ejecutor.submit(_simular, motor.matriz, pesos_base, sigmas, n, semilla_tarea))
+            if len(en_vuelo) >= 2 * procesos:
+                terminadas, en_vuelo = wait(en_vuelo, return_when=FIRST_COMPLETED)
+                for futuro in terminadas:
+                    agregado.combinar(futuro.result())
+        for futuro in en_vuelo:
+            agregado.combinar(futuro.result())
+    return agregado
+
+
+def resumen(motor, agregado, pesos=None, nivel=0.90):
+    """Tabla por distrito con el índice base, su intervalo de confianza y la distribución de su ranking."""
+    cola = (1 - nivel) / 2
+    indice_base = motor.indice(pesos)
+    df = pd.DataFrame({
+        'riesgo_base': indice_base,
+        'rango_base': _rangos(indice_base[np.newaxis, :])[0],
+        'riesgo_media': agregado.media,
+        'riesgo_desv': np.sqrt(agregado.m2 / max(agregado.n - 1, 1)),
+        'riesgo_ic_inf': agregado.cuantiles_indice(cola),
+        'riesgo_ic_sup': agregado.cuantiles_indice(1 - cola),
+        'rango_mediana': agregado.cuantiles_rango(0.5),
+        'rango_ic_inf': agregado.cuantiles_rango(cola),
+        'rango_ic_sup': agregado.cuantiles_rango(1 - cola),
+        'prob_top1': agregado.primeros[:, 0] / agregado.n,
+        'prob_top5': agregado.primeros[:, :5].sum(axis=1) / agregado.n,
+    }, index=pd.Index(motor.distritos, name='distrito'))
+    return df.sort_values(['rango_base', 'rango_mediana'])
+
+
+def distribucion_rangos(motor, agregado):
+    """Probabilidad de que cada distrito (filas) ocupe cada posición del ranking (columnas, 1 = mayor riesgo).
+
+    Con muchas unidades, cada columna es un intervalo de posiciones y se etiqueta con la primera posición del intervalo.
+    """
+    columnas = pd.RangeIndex(1, len(motor.distritos) + 1, agregado.ancho_rango, name='rango')
+    return pd.DataFrame(agregado.rangos / agregado.n, index=pd.Index(motor.distritos, name='distrito'), columns=columnas)
+
+
+if __name__ == '__main__':
+    from datos import poblacion, area, peligrosidad_suelos, material_precario, damnificados_2000, viviendas_destruidas_2000
+    import time
+
+    parser = argparse.ArgumentParser(description="Análisis de sensibilidad Monte Carlo del Riesgo Combinado.")
+    parser.add_argument('--simulaciones', type=int, default=100_000)
+    parser.add_argument('--procesos', type=int, default=None)
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--nivel', type=float, default=0.90, help="Nivel de confianza de los intervalos.")
+    args = parser.parse_args()
+
+    motor = MotorRiesgo.desde_datos(poblacion, area, peligrosidad_suelos, material_precario, damnificados_2000, viviendas_destruidas_2000)
+    inicio = time.perf_counter()
+    agregado = ejecutar(motor, args.simulaciones, semilla=args.semilla, procesos=args.procesos)
+    duracion = time.perf_counter() - inicio
+
+    with pd.option_context('display.max_rows', None, 'display.max_columns', None, 'display.width', 200, 'display.precision', 2):
+        print(resumen(motor, agregado, nivel=args.nivel))
+    print(f"\n{agregado.n} simulaciones en {duracion:.1f} s ({agregado.n / duracion:,.0f} simulaciones/s)")
@@ -0,0 +1,304 @@
+# ==============================================================================
+# TESELAS VECTORIALES ESTÁTICAS DE LAS CAPAS DE RIESGO
+# ==============================================================================
+# Cada sesión de Streamlit vuelve a ejecutar el script y arma su propia figura. Con miles de personas
+# abriendo el mapa a la vez (simulacros, campañas), eso es un proceso de Python trabajando por cada visita.
+# Este módulo exporta una sola vez todas las capas del mapa a archivos estáticos:
+#     teselas/{z}/{x}/{y}.geojson   polígonos de los distritos recortados a la tesela (esquema XYZ de los
+#                                   mapas web), con el nivel de detalle del zoom z y TODAS las capas como
+#                                   propiedades de cada distrito (el visor elige qué capa pintar).
+#     teselas/metadatos.json        capas, rangos de valores de cada capa, categorías de las capas por
+#                                   clases (puntos calientes), zooms y límites del área.
+#     teselas/index.html            visor mínimo (Leaflet) que pide las teselas visibles y las colorea.
+# Después, cada visita cuesta leer unos archivos: los puede servir cualquier servidor web o CDN, o el
+# servidor incluido (python teselas.py servir), sin ejecutar el script de la aplicación.
+#
+# Uso desde la terminal (desde la carpeta principal del repositorio):
+#     python teselas.py exportar [--zooms 8 9 10 11 12] [--destino teselas]
+#     python teselas.py servir [--puerto 8000] [--destino teselas]
+
+import argparse
+import json
+import math
+import os
+import shutil
+import tempfile
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import shapely
+
+import cache_geometria
+import vecindad
+from cache_geometria import RUTA_GEOJSON, CENTRO_MAPA, DECIMALES_COORDENADAS
+
+# Carpeta de las teselas; se puede cambiar con la variable de entorno RIESGOS_TESELAS.
+DIRECTORIO_TESELAS = os.environ.get('RIESGOS_TESELAS', 'teselas')
+
+# Zooms exportados: 8 muestra toda Lima y Callao en una tesela; 12 alcanza para ver un distrito con detalle.
+ZOOMS = (8, 9, 10, 11, 12)
+
+# Capas exportadas (columna: título), las mismas vistas que los botones de la aplicación.
+CAPAS = {
+    'peligrosidad': "Peligrosidad Suelos",
+    'densidad': "Densidad Poblacional",
+    'material_precario': "Material Precario",
+    'damnificados': "Damnificados",
+    'viviendas_destruidas': "Viviendas Destruidas",
+    'escenario_viviendas_danadas': "Escenario Sísmico",
+    'perdida_anual_viviendas': "Pérdida Anual Esperada",
+    'puntos_calientes': "Puntos Calientes",
+    'riesgo_combinado': "Riesgo Combinado",
+}
+
+# Capas por clases: el valor es la posición en la lista de (etiqueta, color), no un número en una escala.
+CATEGORIAS_CAPAS = {'puntos_calientes': vecindad.CATEGORIAS_LISA}
+
+# Número de sismos del catálogo sintético para la pérdida anual esperada (el mismo que usa la aplicación).
+EVENTOS_PERDIDA_ANUAL = 10_000
+
+# Los navegadores y las CDN pueden guardar las teselas; se vuelven a pedir después de este tiempo (segundos).
+SEGUNDOS_CACHE_HTTP = 300
+
+
+def atributos_capas(ruta=RUTA_GEOJSON, pesos=None):
+    """DataFrame con una columna por capa y una fila por distrito, en el orden del GeoJSON."""
+    import escenarios
+    from datos import poblacion, area, suelos, peligrosidad_suelos, material_precario, damnificados_2000, viviendas_destruidas_2000
+    from motor_riesgo import MotorRiesgo
+
+    motor = MotorRiesgo.desde_datos(poblacion, area, peligrosidad_suelos, material_precario, damnificados_2000, viviendas_destruidas_2000)
+    tabla = motor.tabla(pesos)
+    modelo = escenarios.ModeloEscenarios.desde_datos(suelos, poblacion, material_precario, ruta)
+    tabla['escenario_viviendas_danadas'] = modelo.escenario(**escenarios.SISMO_REFERENCIA)['viviendas_danadas']
+    perdida = modelo.perdida_anual(escenarios.catalogo_sintetico(EVENTOS_PERDIDA_ANUAL))
+    tabla['perdida_anual_viviendas'] = perdida['viviendas_danadas_anual']
+    # Igual que en la aplicación, los distritos sin dato quedan en 0.
+    tabla = tabla.reindex(list(cache_geometria.cargar(ruta).nombres)).fillna(0)
+    # Puntos calientes del Riesgo Combinado (la variable por defecto de esa vista), con el grafo de esta geometría.
+    grafo = vecindad.Vecindad.desde_geojson(ruta)
+    tabla['puntos_calientes'] = grafo.lisa(tabla['riesgo_combinado'].to_numpy())['categoria'].to_numpy()
+    return tabla[list(CAPAS)]
+
+
+def tesela_de(longitud, latitud, zoom):
+    """Índices (x, y) de la tesela XYZ (Web Mercator) que contiene el punto."""
+    n = 2 ** zoom
+    x = int((longitud + 180) / 360 * n)
+    y = int((1 - math.asinh(math.tan(math.radians(latitud))) / math.pi) / 2 * n)
+    return x, y
+
+
+def limites_tesela(x, y, zoom):
+    """(lon_min, lat_min, lon_max, lat_max) de la tesela. En grados es un rectángulo, como en Mercator."""
+    n = 2 ** zoom
+    def latitud(fila):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * fila / n))))
+    return x / n * 360 - 180, latitud(y + 1), (x + 1) / n * 360 - 180, latitud(y)
+
+
+def _features_tesela(poligonos, arbol, propiedades, limites):
+    # Distritos cuyo rectángulo toca la tesela, recortados al borde de la tesela.
+    candidatos = arbol.query(shapely.box(*limites))
+    recortados = shapely.clip_by_rect(poligonos[candidatos], *limites)
+    features = []
+    for posicion, geometria in zip(candidatos, recortados):
+        if shapely.is_empty(geometria):
+            continue
+        features.append(
+            f'{{"type":"Feature","properties":{propiedades[posicion]},"geometry":{shapely.to_geojson(geometria)}}}'
+        )
+    return features
+
+
+def exportar(destino=DIRECTORIO_TESELAS, zooms=ZOOMS, ruta=RUTA_GEOJSON, pesos=None):
+    """Escribe todas las teselas, los metadatos y el visor en 'destino'. Devuelve el número de teselas escritas."""
+    atributos = atributos_capas(ruta, pesos)
+    nombres = atributos.index
+    # Propiedades de cada distrito ya convertidas a JSON: se repiten tal cual en todas sus teselas.
+    propiedades = [
+        json.dumps({'distrito': nombre, **{columna: round(float(valor), 4) for columna, valor in fila.items()}},
+                   ensure_ascii=False, separators=(',', ':'))
+        for nombre, fila in zip(nombres, atributos.to_dict('records'))
+    ]
+
+    coordenadas = np.asarray(cache_geometria.cargar(ruta).coordenadas)
+    (lon_min, lat_min), (lon_max, lat_max) = coordenadas.min(axis=0), coordenadas.max(axis=0)
+
+    # Se escribe en una carpeta temporal y se reemplaza la anterior al final, así nunca se sirven teselas a medias.
+    padre = os.path.dirname(os.path.abspath(destino))
+    temporal = tempfile.mkdtemp(dir=padre, prefix='.teselas-')
+    escritas = 0
+    try:
+        for zoom in zooms:
+            # Nivel de detalle según el zoom, igual que en el mapa de la aplicación.
+            geometria = cache_geometria.cargar(ruta, cache_geometria.tolerancia_para_zoom(zoom))
+            poligonos = shapely.transform(geometria.poligonos_shapely(), partial(np.round, decimals=DECIMALES_COORDENADAS))
+            arbol = shapely.STRtree(poligonos)
+            x_min, y_min = tesela_de(lon_min, lat_max, zoom)
+            x_max, y_max = tesela_de(lon_max, lat_min, zoom)
+            for x in range(x_min, x_max + 1):
+                for y in range(y_min, y_max + 1):
+                    features = _features_tesela(poligonos, arbol, propiedades, limites_tesela(x, y, zoom))
+                    if not features:
+                        continue  # Teselas en el mar o fuera del área: el visor las ignora (404).
+                    os.makedirs(os.path.join(temporal, str(zoom), str(x)), exist_ok=True)
+                    with open(os.path.join(temporal, str(zoom), str(x), f'{y}.geojson'), 'w', encoding='utf-8') as archivo:
+                        archivo.write('{"type":"FeatureCollection","features":[' + ','.join(features) + ']}')
+                    escritas += 1
+
+        metadatos = {
+            'capas': CAPAS,
+            'rangos': {columna: [float(atributos[columna].min()), float(atributos[columna].max())] for columna in CAPAS},
+            'categorias': CATEGORIAS_CAPAS,
+            'zooms': list(zooms),
+            'limites': [float(lon_min), float(lat_min), float(lon_max), float(lat_max)],
+            'centro': CENTRO_MAPA,
+            'teselas': escritas,
+        }
+        with open(os.path.join(temporal, 'metadatos.json'), 'w', encoding='utf-8') as archivo:
+            json.dump(metadatos, archivo, ensure_ascii=False, indent=2)
+        with open(os.path.join(temporal, 'index.html'), 'w', encoding='utf-8') as archivo:
+            archivo.write(VISOR_HTML)
+
+        anterior = None
+        if os.path.isdir(destino):
+            anterior = destino.rstrip(os.sep) + '.anterior'
+            shutil.rmtree(anterior, ignore_errors=True)
+            os.rename(destino, anterior)
+        os.rename(temporal, destino)
+        if anterior is not None:
+            shutil.rmtree(anterior, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(temporal, ignore_errors=True)
+        raise
+    return escritas
+
+
+class ManejadorTeselas(SimpleHTTPRequestHandler):
+    """Sirve la carpeta de teselas como archivos estáticos, con el tipo de contenido y la caché HTTP correctos."""
+
+    extensions_map = {**SimpleHTTPRequestHandler.extensions_map, '.geojson': 'application/geo+json', '.json': 'application/json'}
+
+    def end_headers(self):
+        self.send_header('Cache-Control', f'public, max-age={SEGUNDOS_CACHE_HTTP}')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        super().end_headers()
+
+    def log_message(self, formato, *args):
+        pass  # Sin una línea por petición: con miles de peticiones por segundo la consola sería el cuello de botella.
+
+
+def crear_servidor(destino=DIRECTORIO_TESELAS, puerto=8000, host='127.0.0.1'):
+    """Servidor HTTP con un hilo por conexión que sirve la carpeta de teselas (aún sin arrancar)."""
+    return ThreadingHTTPServer((host, puerto), partial(ManejadorTeselas, directory=destino))
+
+
+# Visor mínimo: pide las teselas visibles al mover el mapa y pinta cada distrito con la capa elegida
+# (escala amarilla -> roja, como en la aplicación; las capas por clases con el color de cada clase).
+# Las teselas ya pedidas se guardan en memoria del navegador.
+VISOR_HTML = '''<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<title>Riesgo Sísmico en Lima y Callao</title>
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<link rel="stylesheet" href="https://unpkg.com/leaflet@1.9.4/dist/leaflet.css">
+<script src="https://unpkg.com/leaflet@1.9.4/dist/leaflet.js"></script>
+<style>html, body, #mapa { height: 100%; margin: 0; } #capa { position: absolute; top: 10px; right: 10px; z-index: 1000; font-size: 14px; }</style>
+</head>
+<body>
+<select id="capa"></select>
+<div id="mapa"></div>
+<script>
+const COLORES = ['#ffffb2', '#fecc5c', '#fd8d3c', '#f03b20', '#bd0026'];
+const teselas = new Map();
+let metadatos, capa, mapa, grupo;
+
+function color(valor) {
+  if (metadatos.categorias[capa]) return metadatos.categorias[capa][valor][1];
+  const [minimo, maximo] = metadatos.rangos[capa];
+  const t = maximo > minimo ? (valor - minimo) / (maximo - minimo) : 0;
+  return COLORES[Math.min(COLORES.length - 1, Math.floor(t * COLORES.length))];
+}
+
+function texto(valor) {
+  return metadatos.categorias[capa] ? metadatos.categorias[capa][valor][0] : valor.toFixed(2);
+}
+
+function estilo(feature) {
+  return { fillColor: color(feature.properties[capa]), fillOpacity: 0.7, color: '#666', weight: 0.3 };
+}
+
+async function pedir(z, x, y) {
+  const clave = `${z}/${x}/${y}`;
+  if (!teselas.has(clave)) {
+    teselas.set(clave, fetch(`${clave}.geojson`).then(r => r.ok ? r.json() : null).catch(() => null));
+  }
+  return teselas.get(clave);
+}
+
+async function dibujar() {
+  const zooms = metadatos.zooms;
+  const z = Math.max(zooms[0], Math.min(zooms[zooms.length - 1], Math.round(mapa.getZoom())));
+  const limites = mapa.getPixelBounds();
+  const escala = Math.pow(2, z - mapa.getZoom()) / 256;
+  const pedidas = [];
+  for (let x = Math.floor(limites.min.x * escala); x <= Math.floor(limites.max.x * escala); x++) {
+    for (let y = Math.floor(limites.min.y * escala); y <= Math.floor(limites.max.y * escala); y++) {
+      pedidas.push(pedir(z, x, y));
+    }
+  }
+  const colecciones = (await Promise.all(pedidas)).filter(Boolean);
+  grupo.clearLayers();
+  for (const coleccion of colecciones) {
+    grupo.addLayer(L.geoJSON(coleccion, { style: estilo, onEachFeature: (f, l) =>
+      l.bindTooltip(`<b>${f.properties.distrito}</b><br>${metadatos.capas[capa]}: ${texto(f.properties[capa])}`) }));
+  }
+}
+
+fetch('metadatos.json').then(r => r.json()).then(m => {
+  metadatos = m;
+  const selector = document.getElementById('capa');
+  for (const [columna, titulo] of Object.entries(m.capas)) selector.add(new Option(titulo, columna));
+  capa = selector.value = 'riesgo_combinado';
+  selector.onchange = () => { capa = selector.value; grupo.eachLayer(l => l.setStyle(estilo)); };
+  mapa = L.map('mapa').setView([m.centro.lat, m.centro.lon], 10);
+  L.tileLayer('https://{s}.basemaps.cartocdn.com/light_all/{z}/{x}/{y}.png', { attribution: '&copy; OpenStreetMap, &copy; CARTO' }).addTo(mapa);
+  grupo = L.layerGroup().addTo(mapa);
+  mapa.on('moveend', dibujar);
+  dibujar();
+});
+</script>
+</body>
+</html>
+'''
+
+
+if __name__ == '__main__':
+    import time
+
+    parser = argparse.ArgumentParser(description="Teselas vectoriales estáticas de las capas de riesgo.")
+    parser.add_argument('--destino', default=DIRECTORIO_TESELAS)
+    subcomandos = parser.add_subparsers(dest='comando', required=True)
+    exportacion = subcomandos.add_parser('exportar', help="Genera las teselas de todas las capas.")
+    exportacion.add_argument('--zooms', type=int, nargs='+', default=list(ZOOMS))
+    servicio = subcomandos.add_parser('servir', help="Sirve la carpeta de teselas por HTTP.")
+    servicio.add_argument('--puerto', type=int, default=8000)
+    servicio.add_argument('--host', default='127.0.0.1')
+    args = parser.parse_args()
+
+    if args.comando == 'exportar':
+        inicio = time.perf_counter()
+        escritas = exportar(args.destino, args.zooms)
+        print(f"{escritas} teselas en {args.destino}/ ({time.perf_counter() - inicio:.1f} s).")
+    else:
+        if not os.path.isdir(args.destino):
+            parser.error(f"No existe la carpeta {args.destino}; primero ejecute: python teselas.py exportar")
+        servidor = crear_servidor(args.destino, args.puerto, args.host)
+        print(f"Sirviendo {args.destino}/ en http://{args.host}:{args.puerto}/ (Ctrl+C para terminar)")
+        try:
+            servidor.serve_forever()
+        except KeyboardInterrupt:
+            servidor.server_close()
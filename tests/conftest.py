@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Los módulos de la aplicación y el GeoJSON están en la carpeta principal del repositorio.
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+os.chdir(RAIZ)
@@ -0,0 +1,15 @@
+import numpy as np
+
+import cache_geometria
+from cache_geometria import RUTA_GEOJSON
+
+
+def test_carpeta_sin_permiso_de_escritura_construye_en_memoria(tmp_path):
+    # Un archivo en lugar de la carpeta: os.makedirs() falla con NotADirectoryError, como en /dev/null/geo.
+    archivo = tmp_path / 'no-es-carpeta'
+    archivo.write_text('')
+    en_memoria = cache_geometria.construir_nivel(RUTA_GEOJSON, 0.002, str(archivo / 'geo'))
+    en_disco = cache_geometria.construir_nivel(RUTA_GEOJSON, 0.002, str(tmp_path / 'geo'))
+    assert en_memoria.carpeta is None and en_disco.carpeta is not None
+    assert en_memoria.nombres == en_disco.nombres
+    np.testing.assert_array_equal(en_memoria.coordenadas, en_disco.coordenadas)
@@ -0,0 +1,44 @@
+import os
+
+import numpy as np
+
+import cache_resultados
+
+
+def test_recorta_el_resultado_menos_usado(tmp_path):
+    arreglo = np.arange(1_000, dtype=float)
+    cache = cache_resultados.CacheDisco(str(tmp_path), limite_bytes=1)
+    cache.guardar('a', {'x': arreglo})
+    tamano = cache.estado()['bytes']
+    cache.limite_bytes = int(2.5 * tamano)  # Caben dos resultados.
+
+    cache.guardar('b', {'x': arreglo})
+    os.utime(cache._carpeta('a'), (1, 1))
+    os.utime(cache._carpeta('b'), (2, 2))
+    assert cache.obtener('a') is not None  # Leer 'a' lo marca como recién usado: ahora el más antiguo es 'b'.
+
+    cache.guardar('c', {'x': arreglo})
+    assert cache.obtener('b') is None
+    assert cache.obtener('a') is not None and cache.obtener('c') is not None
+    assert cache.estado()['bytes'] <= cache.limite_bytes
+
+
+def test_cache_de_solo_lectura_sigue_acertando(tmp_path, monkeypatch):
+    cache = cache_resultados.CacheDisco(str(tmp_path))
+    cache.guardar('a', {'x': np.arange(3)})
+
+    def sin_permiso(*args, **kwargs):
+        raise PermissionError("solo lectura")
+
+    monkeypatch.setattr(os, 'utime', sin_permiso)
+    np.testing.assert_array_equal(cache.obtener('a')['x'], [0, 1, 2])
+    assert cache.aciertos == 1 and cache.fallos == 0
+
+
+def test_directorio_sin_escritura_devuelve_lo_calculado(tmp_path):
+    archivo = tmp_path / 'no-es-carpeta'
+    archivo.write_text('')
+    cache = cache_resultados.CacheDisco(str(archivo / 'resultados'))
+    arreglos = cache.obtener_o_calcular('a', lambda: {'x': np.arange(3)})
+    np.testing.assert_array_equal(arreglos['x'], [0, 1, 2])
+    assert cache.obtener('a') is None
@@ -0,0 +1,113 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import historial
+
+DISTRITOS = ['ANCON', 'LIMA', 'SURCO']
+
+
+def historial_de_prueba(anio_fin=2010):
+    eventos = pd.DataFrame({
+        'distrito': ['lima', 'SURCO', 'LIMA', 'DESCONOCIDO', 'ANCON'],
+        'fecha': ['2001-03-10', '2005-06-01', '2008-12-31', '2004-01-01', '1995-05-05'],
+        'damnificados': [10, 5, 7, 100, 100],
+        'viviendas_destruidas': [1, 0, 2, 100, 100],
+    })
+    return historial.HistorialDanos.desde_eventos(eventos, DISTRITOS, anio_fin=anio_fin)
+
+
+def test_consultar_suma_solo_el_periodo():
+    danos = historial_de_prueba()
+    assert danos.descartados == 2  # Distrito desconocido y evento anterior a 2000.
+    np.testing.assert_array_equal(danos.consultar(2000, 2010)['damnificados'], [0, 17, 5])
+    np.testing.assert_array_equal(danos.consultar(2002, 2006)['damnificados'], [0, 0, 5])
+    np.testing.assert_array_equal(danos.consultar(2008, 2008)['viviendas_destruidas'], [0, 2, 0])
+
+
+def test_agregar_evento_igual_a_reconstruir():
+    danos = historial_de_prueba()
+    danos.agregar_evento('Ancon', '2003-07-15', damnificados=4, viviendas_destruidas=1)
+    esperado = historial.HistorialDanos.desde_eventos(pd.DataFrame(danos.eventos), DISTRITOS, anio_fin=2010)
+    for metrica in historial.METRICAS:
+        np.testing.assert_array_equal(danos.acumulado[metrica], esperado.acumulado[metrica])
+    np.testing.assert_array_equal(danos.consultar(2003, 2003)['damnificados'], [4, 0, 0])
+
+
+def test_agregar_evento_rechaza_distrito_y_anio_invalidos():
+    danos = historial_de_prueba()
+    with pytest.raises(ValueError):
+        danos.agregar_evento('DESCONOCIDO', '2003-01-01', 1, 1)
+    with pytest.raises(ValueError):
+        danos.agregar_evento('LIMA', '1999-12-31', 1, 1)
+
+
+def test_agregar_evento_de_un_anio_nuevo_agrega_columnas():
+    danos = historial_de_prueba(anio_fin=2010)
+    danos.agregar_evento('SURCO', '2013-02-02', damnificados=3)
+    assert danos.anio_fin == 2013
+    assert danos.acumulado['damnificados'].shape == (len(DISTRITOS), 2013 - 2000 + 2)  # Con la columna inicial en cero.
+    # Los años agregados repiten el total acumulado anterior: el periodo viejo no cambia.
+    np.testing.assert_array_equal(danos.consultar(2000, 2012)['damnificados'], [0, 17, 5])
+    np.testing.assert_array_equal(danos.consultar(2011, 2013)['damnificados'], [0, 0, 3])
+    np.testing.assert_array_equal(danos.consultar(2000, 2013)['damnificados'], [0, 17, 8])
+
+
+def test_desde_eventos_descarta_eventos_posteriores_a_anio_fin():
+    danos = historial_de_prueba(anio_fin=2006)
+    # El evento de LIMA de 2008 no cae en la fila de SURCO.
+    np.testing.assert_array_equal(danos.consultar(2000, 2006)['damnificados'], [0, 10, 5])
+    assert danos.descartados == 3
+
+
+def _forzar_cambio(ruta):
+    # Por si el sistema de archivos tiene poca resolución en la fecha de modificación.
+    os.utime(ruta, ns=(0, os.stat(ruta).st_mtime_ns + 1_000_000))
+
+
+def test_actualizar_lee_solo_las_filas_nuevas(tmp_path):
+    ruta = str(tmp_path / 'historial.csv')
+    historial.guardar_evento(ruta, 'LIMA', '2001-01-01', 10, 1)
+    danos = historial.cargar_historial(DISTRITOS, ruta)
+    assert danos.actualizar() == 0
+
+    historial.guardar_evento(ruta, 'SURCO', '2002-01-01', 5, 0)
+    historial.guardar_evento(ruta, 'OTRO', '2002-01-01', 5, 0)
+    _forzar_cambio(ruta)
+    assert danos.actualizar() == 1
+    assert danos.descartados == 1
+    np.testing.assert_array_equal(danos.consultar(2000, danos.anio_fin)['damnificados'], [0, 10, 5])
+
+
+def test_actualizar_reconstruye_si_se_corrige_una_fila(tmp_path):
+    ruta = str(tmp_path / 'historial.csv')
+    historial.guardar_evento(ruta, 'LIMA', '2001-01-01', 10, 1)
+    historial.guardar_evento(ruta, 'SURCO', '2002-01-01', 5, 0)
+    danos = historial.cargar_historial(DISTRITOS, ruta)
+
+    # Misma cantidad de filas (y de bytes), con un valor corregido.
+    with open(ruta, encoding='utf-8') as archivo:
+        texto = archivo.read()
+    with open(ruta, 'w', encoding='utf-8', newline='') as archivo:
+        archivo.write(texto.replace('LIMA,2001-01-01,10', 'LIMA,2001-01-01,90'))
+    _forzar_cambio(ruta)
+    assert danos.actualizar() == 2
+    np.testing.assert_array_equal(danos.consultar(2000, danos.anio_fin)['damnificados'], [0, 90, 5])
+
+
+def test_archivo_vacio_o_sin_encabezado(tmp_path):
+    ruta = str(tmp_path / 'historial.csv')
+    open(ruta, 'w').close()
+    danos = historial.cargar_historial(DISTRITOS, ruta)
+    assert danos.eventos == [] and danos.descartados == 0
+
+    historial.guardar_evento(ruta, 'LIMA', '2001-01-01', 10, 1)  # Escribe el encabezado en el archivo vacío.
+    _forzar_cambio(ruta)
+    assert danos.actualizar() == 1
+
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        archivo.write('LIMA,2001-01-01,10,1\nSURCO,2002-01-01,5,0\n')
+    sin_encabezado = historial.cargar_historial(DISTRITOS, ruta)
+    assert sin_encabezado.eventos == [] and sin_encabezado.descartados == 2
@@ -0,0 +1,24 @@
+import numpy as np
+import shapely
+
+import ingesta
+
+
+def indice_dos_cuadrados():
+    # Dos cuadrados de lado 1 que comparten el borde x = 1; el de la derecha va primero en el orden.
+    derecha = shapely.box(1, 0, 2, 1)
+    izquierda = shapely.box(0, 0, 1, 1)
+    return ingesta.IndiceDistritos(['DERECHA', 'IZQUIERDA'], np.array([derecha, izquierda]))
+
+
+def test_punto_en_borde_compartido_va_al_distrito_de_menor_posicion():
+    indice = indice_dos_cuadrados()
+    asignacion = indice.asignar([1.0, 1.0, 0.5, 1.5], [0.5, 1.0, 0.5, 0.5])
+    np.testing.assert_array_equal(asignacion, [0, 0, 1, 0])
+
+
+def test_puntos_fuera_de_todo_distrito():
+    indice = indice_dos_cuadrados()
+    asignacion = indice.asignar([-1.0, 2.5, 0.5, 1.5], [0.5, 0.5, 1.5, -0.001])
+    np.testing.assert_array_equal(asignacion, [ingesta.SIN_DISTRITO] * 4)
+    assert len(indice.asignar([], [])) == 0
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from datos import poblacion, area, peligrosidad_suelos, material_precario, damnificados_2000, viviendas_destruidas_2000
+from motor_riesgo import INDICADORES, MotorRiesgo
+
+
+def motor_de_datos():
+    return MotorRiesgo.desde_datos(poblacion, area, peligrosidad_suelos, material_precario, damnificados_2000, viviendas_destruidas_2000)
+
+
+def riesgo_con_pandas():
+    # El cálculo anterior de load_and_process_data(): DataFrames unidos con pd.merge, normalización min-max por columna
+    # y promedio con .mean(axis=1) (que ignora los NaN de los distritos sin dato).
+    densidad = {d: round(poblacion[d] / area[d]) for d in poblacion if d in area and area[d] > 0}
+    fuentes = {'peligrosidad': peligrosidad_suelos, 'densidad': densidad, 'material_precario': material_precario,
+               'damnificados': damnificados_2000, 'viviendas_destruidas': viviendas_destruidas_2000}
+    df = None
+    for columna, datos in fuentes.items():
+        parte = pd.DataFrame(list(datos.items()), columns=['distrito_data', columna])
+        df = parte if df is None else pd.merge(df, parte, on='distrito_data', how='outer')
+    for columna in fuentes:
+        minimo, maximo = df[columna].min(), df[columna].max()
+        df[f'norm_{columna}'] = (df[columna] - minimo) / (maximo - minimo) if maximo - minimo > 0 else 0
+    df['riesgo_combinado'] = df[[f'norm_{c}' for c in fuentes]].mean(axis=1) * 10
+    df['distrito_data'] = df['distrito_data'].str.upper().str.strip()
+    return df.set_index('distrito_data')['riesgo_combinado']
+
+
+def test_indice_igual_al_calculo_con_pandas():
+    motor = motor_de_datos()
+    esperado = riesgo_con_pandas().reindex(list(motor.distritos))
+    np.testing.assert_allclose(motor.indice(), esperado.to_numpy(), rtol=0, atol=1e-12)
+
+
+def test_lote_de_pesos_devuelve_una_fila_por_vector():
+    motor = motor_de_datos()
+    pesos = np.random.default_rng(0).uniform(0.1, 1.0, (7, len(INDICADORES)))
+    lote = motor.indice(pesos)
+    assert lote.shape == (7, len(motor.distritos))
+    np.testing.assert_allclose(lote[3], motor.indice(pesos[3]))
+
+
+def test_pesos_validos_rechaza_pesos_en_cero_o_negativos():
+    motor = motor_de_datos()
+    with pytest.raises(ValueError):
+        motor.pesos_validos(np.zeros(len(INDICADORES)))
+    with pytest.raises(ValueError):
+        motor.pesos_validos(np.array([[1.0] * len(INDICADORES), [0.0] * len(INDICADORES)]))
+    with pytest.raises(ValueError):
+        motor.pesos_validos([-1.0] + [1.0] * (len(INDICADORES) - 1))
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+import sensibilidad
+from datos import poblacion, area, peligrosidad_suelos, material_precario, damnificados_2000, viviendas_destruidas_2000
+from motor_riesgo import MotorRiesgo
+
+
+def motor_de_datos():
+    return MotorRiesgo.desde_datos(poblacion, area, peligrosidad_suelos, material_precario, damnificados_2000, viviendas_destruidas_2000)
+
+
+def test_combinar_agregados_igual_a_una_sola_pasada():
+    indices = np.random.default_rng(0).uniform(0, 10, (300, 12))
+    rangos = sensibilidad._rangos(indices)
+
+    una_pasada = sensibilidad.AgregadoSensibilidad(12)
+    una_pasada.agregar(indices, rangos)
+    por_partes = sensibilidad.AgregadoSensibilidad(12)
+    for inicio, fin in ((0, 70), (70, 71), (71, 300)):
+        parte = sensibilidad.AgregadoSensibilidad(12)
+        parte.agregar(indices[inicio:fin], rangos[inicio:fin])
+        por_partes.combinar(parte)
+
+    assert por_partes.n == una_pasada.n == 300
+    for nombre in ('rangos', 'primeros', 'histograma'):
+        np.testing.assert_array_equal(getattr(por_partes, nombre), getattr(una_pasada, nombre))
+    np.testing.assert_allclose(por_partes.media, indices.mean(axis=0))
+    np.testing.assert_allclose(por_partes.m2, ((indices - indices.mean(axis=0)) ** 2).sum(axis=0))
+
+
+def test_mismo_resultado_con_uno_o_varios_procesos(monkeypatch):
+    monkeypatch.setattr(sensibilidad, 'SIMULACIONES_POR_TAREA', 500)
+    motor = motor_de_datos()
+    un_proceso = sensibilidad.ejecutar(motor, 1_500, procesos=1)
+    dos_procesos = sensibilidad.ejecutar(motor, 1_500, procesos=2)
+    np.testing.assert_array_equal(un_proceso.rangos, dos_procesos.rangos)
+    np.testing.assert_allclose(un_proceso.media, dos_procesos.media)
+
+
+def test_entradas_invalidas():
+    motor = motor_de_datos()
+    with pytest.raises(ValueError):
+        sensibilidad.ejecutar(motor, 0)
+    with pytest.raises(ValueError):
+        sensibilidad.ejecutar(motor, 100, pesos=[0.0] * len(motor.indicadores))
+    with pytest.raises(ValueError):
+        sensibilidad._sortear_pesos(np.random.default_rng(0), np.zeros(len(motor.indicadores)), 10)
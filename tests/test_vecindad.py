@@ -0,0 +1,35 @@
+import itertools
+
+import numpy as np
+
+import vecindad
+
+# Cadena de 5 distritos: 0 - 1 - 2 - 3 - 4.
+NOMBRES = [f'D{i}' for i in range(5)]
+FILAS = np.array([0, 1, 1, 2, 2, 3, 3, 4])
+COLUMNAS = np.array([1, 0, 2, 1, 3, 2, 4, 3])
+
+
+def test_variable_constante_no_es_significativa():
+    grafo = vecindad.Vecindad(NOMBRES, FILAS, COLUMNAS)
+    global_ = grafo.moran_global(np.full(5, 3.0), permutaciones=99)
+    assert np.isnan(global_['I']) and np.isnan(global_['p_valor'])
+    locales = grafo.lisa(np.full(5, 3.0), permutaciones=99)
+    assert (locales['categoria'] == vecindad.NO_SIGNIFICATIVO).all()
+    assert locales['I_local'].isna().all()
+
+
+def test_lisa_coincide_con_la_distribucion_exacta():
+    # Con 5 distritos se pueden recorrer todos los conjuntos de vecinos posibles de cada uno: la proporción exacta
+    # de rezagos >= al observado debe coincidir con la estimada por permutaciones.
+    valores = np.array([1.0, 4.0, 2.0, 8.0, 5.0])
+    grafo = vecindad.Vecindad(NOMBRES, FILAS, COLUMNAS)
+    permutaciones = 4999
+    locales = grafo.lisa(valores, permutaciones=permutaciones)
+    z = valores - valores.mean()
+    for i in range(5):
+        otros = [j for j in range(5) if j != i]
+        rezagos = [z[list(conjunto)].mean() for conjunto in itertools.combinations(otros, grafo.vecinos[i])]
+        mayores = np.mean(np.asarray(rezagos) * z[i] >= z[i] * locales['rezago'].iloc[i] - 1e-12)
+        exacto = min(mayores, 1 - mayores)
+        assert abs(locales['p_valor'].iloc[i] - exacto) < 0.03
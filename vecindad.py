@@ -0,0 +1,237 @@
+# ==============================================================================
+# GRAFO DE VECINDAD Y PUNTOS CALIENTES (I DE MORAN GLOBAL Y LOCAL / LISA)
+# ==============================================================================
+# El índice de riesgo califica a cada distrito por separado, pero el riesgo se agrupa en el espacio
+# (los distritos del Callao, el cinturón arenoso del sur: Villa El Salvador, Lurín, Pachacámac).
+# Este módulo:
+#   1. Construye el grafo de contigüidad tipo "reina" (dos distritos son vecinos si sus límites comparten
+#      al menos un punto) con una sola consulta al índice espacial STRtree, y lo guarda como matriz
+#      dispersa de pesos (scipy.sparse), estandarizada por filas (los pesos de cada distrito suman 1).
+#   2. Guarda el grafo en la caché en disco (cache_resultados.py) con el hash del GeoJSON en la clave:
+#      se construye una sola vez por versión de la geometría.
+#   3. Calcula la autocorrelación espacial global (I de Moran) y local (LISA) de cualquier variable.
+#      La significancia se estima con permutaciones, procesadas por lotes como operaciones de matrices:
+#        - Global: cada fila de un lote es una permutación completa de los valores (orden de claves aleatorias).
+#        - Local (condicional): para cada distrito se dejan fijo su valor y se sortean los de sus vecinos entre
+#          los demás distritos: k índices distintos de los otros n - 1, uno a la vez, volviendo a sortear los
+#          repetidos. El costo crece con n por el número de vecinos, no con n² como un orden completo de los otros.
+#
+# Uso desde la terminal (desde la carpeta principal del repositorio):
+#     python vecindad.py [--variable riesgo_combinado] [--permutaciones 999]
+
+import argparse
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import shapely
+from scipy import sparse
+
+import cache_geometria
+import cache_resultados
+from cache_geometria import RUTA_GEOJSON
+
+# Número de permutaciones por defecto de las pruebas de significancia (p mínimo = 1 / 1000).
+PERMUTACIONES = 999
+
+# Nivel de significancia para marcar un distrito como punto caliente o frío.
+ALFA = 0.05
+
+# Valores (permutaciones x distritos x vecinos sorteados) que se procesan a la vez en un lote (~16 MB por arreglo).
+CELDAS_POR_LOTE = 2_000_000
+
+# Categorías de LISA: (etiqueta, color). El código de cada distrito es la posición en esta tupla.
+CATEGORIAS_LISA = (
+    ("No significativo", "#eeeeee"),
+    ("Alto-Alto (punto caliente)", "#d7191c"),
+    ("Bajo-Bajo (punto frío)", "#2c7bb6"),
+    ("Alto-Bajo (atípico)", "#fdae61"),
+    ("Bajo-Alto (atípico)", "#abd9e9"),
+)
+NO_SIGNIFICATIVO, ALTO_ALTO, BAJO_BAJO, ALTO_BAJO, BAJO_ALTO = range(len(CATEGORIAS_LISA))
+
+
+def _pares_contiguos(poligonos, distancia=0.0):
+    # Pares (i, j), i != j, de polígonos que se tocan (o están a menos de 'distancia', para límites con huecos pequeños).
+    arbol = shapely.STRtree(poligonos)
+    if distancia > 0:
+        i, j = arbol.query(poligonos, predicate='dwithin', distance=distancia)
+    else:
+        i, j = arbol.query(poligonos, predicate='intersects')
+    distintos = i != j
+    return i[distintos], j[distintos]
+
+
+class Vecindad:
+    """Matriz dispersa de pesos espaciales (estandarizada por filas) de los distritos, en el orden del GeoJSON."""
+
+    def __init__(self, nombres, filas, columnas):
+        self.nombres = tuple(nombres)
+        n = len(self.nombres)
+        binaria = sparse.csr_matrix((np.ones(len(filas)), (filas, columnas)), shape=(n, n))
+        self.vecinos = np.asarray(binaria.sum(axis=1)).ravel().astype(np.int64)
+        # Cada fila suma 1; un distrito sin vecinos (isla) queda con una fila de ceros.
+        inversa = np.divide(1.0, self.vecinos, out=np.zeros(n), where=self.vecinos > 0)
+        self.pesos = sparse.diags(inversa) @ binaria
+
+    @classmethod
+    def desde_geojson(cls, ruta=RUTA_GEOJSON, distancia=0.0, cache=None):
+        """Grafo de los polígonos del GeoJSON, leído de la caché en disco si ya se construyó para esta geometría."""
+        geometria = cache_geometria.cargar(ruta)
+
+        def calcular():
+            filas, columnas = _pares_contiguos(geometria.poligonos_shapely(), distancia)
+            return {'filas': filas, 'columnas': columnas}
+
+        cache = cache if cache is not None else cache_resultados.cache_por_defecto()
+        clave = f'vecindad-{cache_geometria.hash_archivo(ruta)}-{distancia:g}'
+        arreglos = cache.obtener_o_calcular(clave, calcular)
+        return cls(geometria.nombres, np.asarray(arreglos['filas']), np.asarray(arreglos['columnas']))
+
+    def __len__(self):
+        return len(self.nombres)
+
+    def _desvios(self, valores):
+        valores = np.asarray(valores, dtype=float)
+        if valores.shape != (len(self),):
+            raise ValueError(f"Se esperaban {len(self)} valores (uno por distrito), se recibieron {valores.shape}.")
+        return valores - valores.mean()
+
+    def moran_global(self, valores, permutaciones=PERMUTACIONES, semilla=0):
+        """I de Moran global y su significancia por permutaciones.
+
+        Devuelve un diccionario con I, el valor esperado sin autocorrelación (-1 / (n - 1)), la media y la
+        desviación de las permutaciones, el puntaje z y el p-valor (una cola, en la dirección observada).
+        Si la variable es constante la autocorrelación no está definida: todo es NaN salvo el valor esperado.
+        """
+        z = self._desvios(valores)
+        n, s0 = len(z), self.pesos.sum()
+        denominador = z @ z
+        if denominador == 0:
+            indefinido = float('nan')
+            return {'I': indefinido, 'esperado': -1.0 / (n - 1), 'media_permutaciones': indefinido,
+                    'desviacion_permutaciones': indefinido, 'z': indefinido, 'p_valor': indefinido}
+        factor = n / (s0 * denominador)  # La suma de cuadrados no cambia al permutar.
+        observado = factor * (z @ (self.pesos @ z))
+
+        rng = np.random.default_rng(semilla)
+        simulados = np.empty(permutaciones)
+        por_lote = max(1, CELDAS_POR_LOTE // n)
+        for inicio in range(0, permutaciones, por_lote):
+            k = min(por_lote, permutaciones - inicio)
+            # Cada fila es una permutación: el orden de n claves aleatorias.
+            permutados = z[np.argsort(rng.random((k, n)), axis=1)]           # (k, n)
+            rezago = (self.pesos @ permutados.T).T                            # Promedio de los vecinos, (k, n)
+            simulados[inicio:inicio + k] = factor * np.einsum('kn,kn->k', permutados, rezago)
+
+        mas_extremos = (simulados >= observado).sum() if observado >= simulados.mean() else (simulados <= observado).sum()
+        return {
+            'I': float(observado),
+            'esperado': -1.0 / (n - 1),
+            'media_permutaciones': float(simulados.mean()),
+            'desviacion_permutaciones': float(simulados.std()),
+            'z': float((observado - simulados.mean()) / simulados.std()) if simulados.std() > 0 else float('nan'),
+            'p_valor': float((mas_extremos + 1) / (permutaciones + 1)),
+        }
+
+    def lisa(self, valores, permutaciones=PERMUTACIONES, semilla=0, alfa=ALFA):
+        """I de Moran local de cada distrito con permutaciones condicionales.
+
+        DataFrame indexado por distrito con: valor, z (desvío de la media), rezago (promedio de los vecinos),
+        I_local, p_valor y categoria (código de CATEGORIAS_LISA). Si la variable es constante, I_local y p_valor
+        son NaN y ningún distrito es significativo.
+        """
+        z = self._desvios(valores)
+        n = len(z)
+        m2 = (z @ z) / n
+        rezago = self.pesos @ z
+        if m2 == 0:
+            indefinido = np.full(n, np.nan)
+            return self._tabla_lisa(valores, z, rezago, indefinido, indefinido, np.full(n, NO_SIGNIFICATIVO))
+        observado = z * rezago / m2
+
+        # Pesos de cada distrito como filas de largo k_max (rellenas con 0): en cada permutación se sortean k_max
+        # distritos por fila y cada uno toma el peso de su posición (los que pasan del número de vecinos pesan 0).
+        k_max = int(self.vecinos.max()) if n else 0
+        pesos_filas = np.zeros((n, k_max))
+        for i in range(n):
+            fila = self.pesos.getrow(i).data
+            pesos_filas[i, :len(fila)] = np.sort(fila)[::-1]
+
+        rng = np.random.default_rng(semilla)
+        mayores = np.zeros(n, dtype=np.int64)
+        por_lote = max(1, CELDAS_POR_LOTE // max(1, n * k_max))
+        for inicio in range(0, permutaciones, por_lote):
+            k = min(por_lote, permutaciones - inicio)
+            # Muestra sin reemplazo de los otros n - 1 distritos, una posición a la vez: cada índice nuevo que ya
+            # salió en esa fila se vuelve a sortear. Al sacarlos en orden, los primeros 'vecinos' de cada fila
+            # son una muestra uniforme sin importar cuántos vecinos tenga el distrito.
+            sorteo = np.empty((k, n, k_max), dtype=np.int64)
+            for posicion in range(k_max):
+                nuevos = rng.integers(0, n - 1, size=(k, n))
+                repetidos = (sorteo[:, :, :posicion] == nuevos[:, :, None]).any(axis=2)
+                while repetidos.any():
+                    cuales = np.nonzero(repetidos)
+                    nuevos[cuales] = rng.integers(0, n - 1, size=len(cuales[0]))
+                    repetidos[cuales] = (sorteo[cuales][:, :posicion] == nuevos[cuales][:, None]).any(axis=1)
+                sorteo[:, :, posicion] = nuevos
+            # Índices 0 .. n - 2 de los otros distritos -> índices del grafo (se salta al propio distrito).
+            vecinos_sorteados = sorteo + (sorteo >= np.arange(n)[None, :, None])                # (k, n, k_max)
+            rezago_simulado = np.einsum('knv,nv->kn', z[vecinos_sorteados], pesos_filas)
+            mayores += (z * rezago_simulado / m2 >= observado).sum(axis=0)
+
+        # p-valor de una cola, en la dirección observada (como en PySAL).
+        mas_extremos = np.minimum(mayores, permutaciones - mayores)
+        p_valor = (mas_extremos + 1) / (permutaciones + 1)
+
+        categoria = np.full(n, NO_SIGNIFICATIVO)
+        significativo = (p_valor <= alfa) & (self.vecinos > 0)
+        alto, vecinos_altos = z > 0, rezago > 0
+        categoria[significativo & alto & vecinos_altos] = ALTO_ALTO
+        categoria[significativo & ~alto & ~vecinos_altos] = BAJO_BAJO
+        categoria[significativo & alto & ~vecinos_altos] = ALTO_BAJO
+        categoria[significativo & ~alto & vecinos_altos] = BAJO_ALTO
+
+        return self._tabla_lisa(valores, z, rezago, observado, p_valor, categoria)
+
+    def _tabla_lisa(self, valores, z, rezago, observado, p_valor, categoria):
+        return pd.DataFrame({
+            'valor': np.asarray(valores, dtype=float),
+            'z': z,
+            'rezago': rezago,
+            'I_local': observado,
+            'p_valor': p_valor,
+            'categoria': categoria,
+        }, index=pd.Index(self.nombres, name='distrito'))
+
+
+@lru_cache(maxsize=4)
+def vecindad_por_defecto(ruta=RUTA_GEOJSON):
+    """Grafo de vecindad compartido dentro del proceso."""
+    return Vecindad.desde_geojson(ruta)
+
+
+if __name__ == '__main__':
+    from datos import poblacion, area, peligrosidad_suelos, material_precario, damnificados_2000, viviendas_destruidas_2000
+    from motor_riesgo import MotorRiesgo
+
+    parser = argparse.ArgumentParser(description="Autocorrelación espacial (I de Moran global y LISA) por distrito.")
+    parser.add_argument('--variable', default='riesgo_combinado', help="riesgo_combinado o un indicador del motor.")
+    parser.add_argument('--permutaciones', type=int, default=PERMUTACIONES)
+    parser.add_argument('--semilla', type=int, default=0)
+    args = parser.parse_args()
+
+    vecindad = vecindad_por_defecto()
+    motor = MotorRiesgo.desde_datos(poblacion, area, peligrosidad_suelos, material_precario, damnificados_2000, viviendas_destruidas_2000)
+    tabla = motor.tabla()
+    if args.variable not in tabla.columns:
+        parser.error(f"Variable desconocida: {args.variable}")
+    valores = tabla[args.variable].reindex(list(vecindad.nombres)).fillna(0).to_numpy()
+
+    print(f"{len(vecindad)} distritos, {int(vecindad.vecinos.sum()) // 2} pares de vecinos.")
+    global_ = vecindad.moran_global(valores, args.permutaciones, args.semilla)
+    print(f"I de Moran ({args.variable}) = {global_['I']:.3f} (esperado {global_['esperado']:.3f}), "
+          f"z = {global_['z']:.2f}, p = {global_['p_valor']:.3f}")
+    locales = vecindad.lisa(valores, args.permutaciones, args.semilla)
+    locales['categoria'] = [CATEGORIAS_LISA[c][0] for c in locales['categoria']]
+    print(locales[locales['p_valor'] <= ALFA].sort_values('I_local', ascending=False).round(3).to_string())